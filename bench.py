@@ -0,0 +1,494 @@
+"""Замеры производительности на синтетических профилях.
+
+    python bench.py all --json before.json       # всё сразу, Qt — на платформе offscreen
+    python bench.py io --sizes 10,1000,10000
+    python bench.py cards --sizes 10,1000
+    python bench.py theme --sizes 1000
+    python bench.py launch --apps 8 --urls 12
+    python bench.py search --sizes 1000,10000
+    python bench.py startup --profiles 1000
+    python bench.py urls --urls 60
+    python bench.py depends --delay 1.0
+    python bench.py prefetch --mb 64 --dir ~/bench-tmp   # каталог на диске, не tmpfs
+    python bench.py compare before.json after.json
+
+Каждая строка — медиана, минимум и максимум по --repeat повторам; с --json результаты
+дописываются в файл, и два таких файла сравнивает ``compare``.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import webbrowser
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SIZES = "10,1000,10000"
+RESULTS: List[Dict] = []
+
+
+def synthetic_state(n: int, apps: int = 8, urls: int = 12, root: Optional[Path] = None) -> Dict:
+    """n профилей; с root программы и браузер — настоящие файлы в этом каталоге (см. make_files)."""
+    app = (lambda j: str(root / f"app{j}.exe")) if root else (lambda j: rf"C:\Program Files\App{j}\app{j}.exe")
+    browser = str(root / "browser.exe") if root else r"C:\Program Files\Browser\browser.exe"
+    return {"profiles": {
+        f"profile-{i:05d}": {
+            "apps": [app(j) for j in range(apps)],
+            "urls": [f"https://site{j}.example.com/p/{i}" for j in range(urls)],
+            "browser_path": browser,
+        } for i in range(n)}}
+
+
+def make_files(root: Path, apps: int):
+    for name in [f"app{j}.exe" for j in range(apps)] + ["browser.exe"]:
+        (root / name).write_bytes(b"MZ")
+
+
+def measure(fn: Callable[[], object], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def report(name: str, times: List[float], **params):
+    extra = " ".join(f"{k}={v}" for k, v in params.items())
+    print(f"{name:<24} {extra:<28} median={statistics.median(times) * 1000:9.3f} ms  "
+          f"min={min(times) * 1000:9.3f} ms  max={max(times) * 1000:9.3f} ms  n={len(times)}")
+    RESULTS.append({"name": name, "params": params, "median_ms": statistics.median(times) * 1000,
+                    "min_ms": min(times) * 1000, "max_ms": max(times) * 1000, "n": len(times)})
+
+
+def _sizes(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def _write_profiles(workdir: Path, n: int) -> Path:
+    path = workdir / "profiles.json"
+    path.write_text(json.dumps(synthetic_state(n), ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def bench_io(args):
+    """load_state/save_state целиком и точечная правка через ProfileStore/SqliteProfileStore."""
+    import launcher
+    from store import ProfileStore, SqliteProfileStore
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as d:
+            path = _write_profiles(Path(d), n)
+            launcher.CONFIG_PATH, saved = path, launcher.CONFIG_PATH
+            try:
+                state = launcher.load_state()
+                size = f"{path.stat().st_size // 1024}KiB"
+                report("load_state", measure(launcher.load_state, args.repeat), profiles=n, file=size)
+                report("save_state", measure(lambda: launcher.save_state(state), args.repeat), profiles=n, file=size)
+            finally:
+                launcher.CONFIG_PATH = saved
+            prof = state["profiles"]["profile-00000"]
+            store = ProfileStore(path, delay=3600)
+            report("store_put_flush", measure(lambda: (store.put("profile-00000", prof), store.flush()), args.repeat), profiles=n)
+            report("store_summaries", measure(store.summaries, args.repeat), profiles=n)
+            db = SqliteProfileStore(Path(d) / "profiles.db")
+            db.import_json(path)
+            report("sqlite_put", measure(lambda: db.put("profile-00000", prof), args.repeat), profiles=n)
+            report("sqlite_summaries", measure(db.summaries, args.repeat), profiles=n)
+            db.close()
+
+
+SEARCH_QUERIES = ("profile-0042", "app3", "site1.example", "pr", "browser.exe app7")
+
+
+def bench_search(args):
+    """Построение индекса поиска, запросы и точечное обновление профиля."""
+    from search import SearchIndex
+    for n in args.sizes:
+        profiles = synthetic_state(n)["profiles"]
+
+        def build():
+            idx = SearchIndex(); idx.load(profiles.items); idx.query("x")
+            return idx
+        idx = build()
+        report("search_build", measure(build, max(1, args.repeat // 10)), profiles=n)
+        for q in SEARCH_QUERIES:
+            report("search_query", measure(lambda: idx.query(q), args.repeat), profiles=n, q=q.replace(" ", "+"))
+        variants = [dict(profiles["profile-00000"], apps=[rf"D:\Tools\new{i}.exe"]) for i in range(2)]
+        flip = iter(range(10 ** 9))
+        report("search_update", measure(lambda: idx.set("profile-00000", variants[next(flip) % 2]), args.repeat), profiles=n)
+
+
+def _qt_window(workdir: Path, n: int):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import gui
+    from store import ProfileStore
+    app = gui.QtWidgets.QApplication.instance() or gui.QtWidgets.QApplication(sys.argv[:1])
+    w = gui.MainWindow(ProfileStore(_write_profiles(workdir, n)))
+    w.show(); app.processEvents()
+    return app, w
+
+
+def bench_theme(args):
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as d:
+            app, w = _qt_window(Path(d), n)
+
+            def switch():
+                w.toggle_theme(); app.processEvents()
+            switch()  # первая сборка палитры и стилей
+            report("theme_switch", measure(switch, args.repeat), profiles=n)
+            w.close()
+
+
+def bench_cards(args):
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as d:
+            app, w = _qt_window(Path(d), n)
+
+            def refresh():
+                w.refresh_cards(); app.processEvents()
+            report("refresh_cards", measure(refresh, args.repeat), profiles=n)
+            w.close()
+
+
+class StubPopen:
+    """Вместо subprocess.Popen: ничего не запускает, только считает вызовы."""
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        StubPopen.calls += 1
+        self.args = args[0] if args else kwargs.get("args")
+        self.pid = 0
+        self.returncode = 0
+
+    def wait(self, timeout=None):
+        return 0
+
+    def poll(self):
+        return 0
+
+
+@contextmanager
+def stubbed_spawn():
+    """subprocess.Popen и webbrowser.open_new_tab заменены заглушками; os.startfile не вызывается."""
+    saved = subprocess.Popen, webbrowser.open_new_tab
+    subprocess.Popen = StubPopen
+    webbrowser.open_new_tab = lambda url: True
+    StubPopen.calls = 0
+    try:
+        yield StubPopen
+    finally:
+        subprocess.Popen, webbrowser.open_new_tab = saved
+
+
+def bench_launch(args):
+    """launch_profile целиком (разрешение, проверка файлов, «запуск», замеры) без настоящих процессов."""
+    import launcher
+    with tempfile.TemporaryDirectory() as d, stubbed_spawn() as popen:
+        root = Path(d)
+        make_files(root, args.apps)
+        state = synthetic_state(1, args.apps, args.urls, root)
+        saved = launcher.LAUNCH_METRICS.path, launcher.PROCESSES.path
+        launcher.LAUNCH_METRICS.path, launcher.PROCESSES.path = root / "launch_metrics.json", root / "processes.json"
+        try:
+            res = launcher.launch_profile("profile-00000", state)
+            if res.failed:
+                print(f"{'launch_profile':<24} ошибка: {res.failed[0].target}: {res.failed[0].error}")
+                return
+            popen.calls = 0
+            times = measure(lambda: launcher.launch_profile("profile-00000", state), args.repeat)
+            report("launch_profile", times, apps=args.apps, urls=args.urls, popen=popen.calls // args.repeat)
+        finally:
+            launcher.LAUNCH_METRICS.path, launcher.PROCESSES.path = saved
+
+
+GUI_STARTUP = """
+import sys
+from pathlib import Path
+import gui
+from store import ProfileStore
+app = gui.QtWidgets.QApplication(sys.argv[:1])
+w = gui.MainWindow(ProfileStore(Path(sys.argv[1]))); w.show(); app.processEvents()
+"""
+
+
+def bench_startup(args):
+    """Время от старта интерпретатора до результата: `main.py list` без Qt против построения окна."""
+    here = Path(__file__).resolve().parent
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    with tempfile.TemporaryDirectory() as d:
+        path = _write_profiles(Path(d), args.profiles)
+        paths = {
+            "startup_cli_list": [sys.executable, str(here / "main.py"), "--config", str(path), "list"],
+            "startup_gui_window": [sys.executable, "-c", GUI_STARTUP, str(path)],
+        }
+        for name, cmd in paths.items():
+            def once():
+                subprocess.run(cmd, cwd=here, env=env, check=True, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True)
+            try:
+                once()
+            except subprocess.CalledProcessError as e:
+                lines = (e.stderr or "").strip().splitlines()
+                print(f"{name:<24} пропущено: {lines[-1] if lines else e}")
+                continue
+            report(name, measure(once, args.repeat), profiles=args.profiles)
+
+
+STUB_BROWSER = """#!{python}
+import sys
+with open({log!r}, "a", encoding="utf-8") as f:
+    f.write("%d\\n" % (len(sys.argv) - 1))
+"""
+
+
+def stub_browser(workdir: Path) -> tuple:
+    """Исполняемый «браузер», который только записывает число полученных URL; (путь, лог)."""
+    log = workdir / "browser.log"
+    exe = workdir / "stub-browser"
+    exe.write_text(STUB_BROWSER.format(python=sys.executable, log=str(log)), encoding="utf-8")
+    exe.chmod(0o755)
+    return exe, log
+
+
+def bench_urls(args):
+    import urldispatch
+    urls = [f"site{i % max(1, args.urls - args.duplicates)}.example.com/page" for i in range(args.urls)]
+    with tempfile.TemporaryDirectory() as d:
+        exe, log = stub_browser(Path(d))
+        for limit in (urldispatch.CMDLINE_LIMIT, args.small_limit):
+            log.write_text("", encoding="utf-8")
+            procs = []
+
+            def popen(cmd, **kw):
+                p = subprocess.Popen(cmd, **kw); procs.append(p); return p
+            t0 = time.perf_counter()
+            calls = urldispatch.open_urls(urls, str(exe), popen=popen, limit=limit)
+            spawn = time.perf_counter() - t0
+            for p in procs:
+                p.wait()
+            counts = [int(x) for x in log.read_text(encoding="utf-8").split()]
+            print(f"{'open_urls':<24} urls={len(urls)} unique={sum(counts)} limit={limit:<7} "
+                  f"invocations={calls} (stub saw {len(counts)})  spawn={spawn * 1000:.1f} ms")
+
+
+STANDIN_SERVER = """#!{python}
+import socket, time
+time.sleep({delay})
+s = socket.socket(); s.bind(("127.0.0.1", {port})); s.listen()
+time.sleep(30)
+"""
+
+
+def bench_depends(args):
+    """Профиль со «стендом»: сервер поднимается за --delay с, сайт на нём ждёт порт, остальные программы — нет."""
+    import socket
+    import launcher
+    from processes import ProcessTracker
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        browser, _ = stub_browser(root)
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = root / "server.exe"
+        server.write_text(STANDIN_SERVER.format(python=sys.executable, delay=args.delay, port=port), encoding="utf-8")
+        apps = [root / f"app{j}.exe" for j in range(args.apps)]
+        for app in apps:
+            app.write_text("#!/bin/sh\n", encoding="utf-8")
+        for exe in [server, *apps]:
+            exe.chmod(0o755)
+        url = f"http://127.0.0.1:{port}/"
+        prof = {"apps": [str(server), *map(str, apps)], "urls": ["https://docs.example.com/", url],
+                "browser_path": str(browser), "if_running": "start",
+                "depends": {str(server): {"ready": {"tcp": port}, "timeout": args.delay + 10},
+                            url: {"after": [str(server)]}}}
+        at: Dict[str, float] = {}
+        engine = launcher.LaunchEngine(tracker=ProcessTracker(root / "processes.json"))
+        t0 = time.perf_counter()
+        res = engine.run("dev", {"profiles": {"dev": prof}}, lambda item, done, total: at.setdefault(item.target, time.perf_counter() - t0))
+        engine.tracker.close("dev", 1.0)
+        ready = next(i.stages.get("ready", 0.0) for i in res.items if i.target == str(server))
+        print(f"{'depends':<24} delay={args.delay} apps={args.apps}  apps started by "
+              f"{max(at.get(str(a), 0.0) for a in apps) * 1000:.1f} ms, server ready after {ready * 1000:.0f} ms, "
+              f"{url} opened at {at.get(url, float('nan')) * 1000:.0f} ms, failed={len(res.failed)}")
+
+
+def _habits(days: int, seed: int = 1) -> Dict[str, List[float]]:
+    """Время запусков за days суток: «work» по будням около 9:00, «evening» почти каждый вечер около 20:00, «misc» когда придётся."""
+    import random
+    rnd = random.Random(seed)
+    start = time.mktime(time.strptime("2024-01-01", "%Y-%m-%d"))  # понедельник
+    runs: Dict[str, List[float]] = {"work": [], "evening": [], "misc": []}
+    for day in range(days):
+        base = start + day * 86400
+        if day % 7 < 5:
+            runs["work"].append(base + 9 * 3600 + rnd.gauss(0, 1200))
+        if rnd.random() < 0.7:
+            runs["evening"].append(base + 20 * 3600 + rnd.gauss(0, 2400))
+        if rnd.random() < 0.3:
+            runs["misc"].append(base + rnd.uniform(8, 23) * 3600)
+    return runs
+
+
+def bench_prefetch(args):
+    """Чтение файлов «программ» из холодного кэша и после warm(); точность прогноза на синтетической истории."""
+    import prefetch
+    with tempfile.TemporaryDirectory(dir=args.dir) as d:
+        files = []
+        for i in range(args.files):
+            path = Path(d) / f"app{i}.exe"
+            with open(path, "wb") as f:
+                for _ in range(args.mb):
+                    f.write(os.urandom(2**20))
+            files.append(str(path))
+
+        def read_all():
+            for path in files:
+                with open(path, "rb", buffering=0) as f:
+                    while f.read(prefetch.CHUNK):
+                        pass
+
+        def resident() -> str:
+            fr = [prefetch.resident_fraction(p) for p in files]
+            return "?" if None in fr else f"{sum(fr) / len(fr):.0%}"
+        cold, warm = [], []
+        for _ in range(args.repeat):
+            if not all(prefetch.drop(p) for p in files):
+                print(f"{'prefetch_read':<24} пропущено: нет posix_fadvise — кэш не сбросить")
+                break
+            before = resident()
+            cold.extend(measure(read_all, 1))
+            for p in files:
+                prefetch.drop(p)
+            t0 = time.perf_counter()
+            for p in files:
+                prefetch.warm(p)
+            advise = time.perf_counter() - t0
+            time.sleep(args.settle)  # WILLNEED читает асинхронно — даём ядру дочитать, как это было бы в простое
+            after = resident()
+            warm.extend(measure(read_all, 1))
+        if cold:
+            size = dict(files=args.files, mb=args.mb)
+            report("prefetch_read_cold", cold, **size, resident=before)
+            report("prefetch_read_warm", warm, **size, resident=after)
+            print(f"{'':<24} warm() {advise * 1000:.1f} ms; если «resident» до сброса не 0% — каталог в tmpfs, укажите --dir на диске")
+
+    history = {name: [[t, 0.0] for t in runs] for name, runs in _habits(args.days).items()}
+    train = time.mktime(time.strptime("2024-01-01", "%Y-%m-%d")) + (args.days - 7) * 86400
+    with tempfile.TemporaryDirectory() as d:
+        clock = [train]
+        pf = prefetch.Prefetcher(Path(d) / "prefetch.json",
+                                 lambda: {n: [r for r in runs if r[0] <= clock[0]] for n, runs in history.items()},
+                                 lambda name: [], probe=lambda: (0.0, 0.0), clock=lambda: clock[0])
+        while clock[0] < train + 7 * 86400:
+            pf.run_once()
+            clock[0] += prefetch.INTERVAL
+        st = pf.stats()
+    print(f"{'prefetch_predict':<24} days={args.days} last 7 replayed: prefetches={st['prefetches']} "
+          f"precision={st['precision']} hit_rate={st['hit_rate']} ({st['prefetched_launches']}/{st['launches']} launches)")
+
+
+def bench_all(args):
+    for fn, sizes in ((bench_io, args.sizes), (bench_launch, args.sizes), (bench_search, args.sizes), (bench_cards, args.gui_sizes), (bench_theme, args.gui_sizes)):
+        run = argparse.Namespace(**{**vars(args), "sizes": sizes})
+        try:
+            fn(run)
+        except ImportError as e:  # нет PyQt — пропускаем замеры окна
+            print(f"{fn.__name__[6:]:<24} пропущено: {e}")
+
+
+def compare(args):
+    """Медианы второго прогона относительно первого; строки сопоставляются по имени и параметрам."""
+    def load(path: str) -> Dict[tuple, Dict]:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return {(r["name"], json.dumps(r["params"], sort_keys=True)): r for r in data["results"]}
+    base, new = load(args.base), load(args.new)
+    for key, r in new.items():
+        b = base.get(key)
+        params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+        if b is None:
+            print(f"{r['name']:<24} {params:<28} {r['median_ms']:9.3f} ms  (нет в {args.base})")
+            continue
+        delta = (r["median_ms"] - b["median_ms"]) / b["median_ms"] * 100 if b["median_ms"] else 0.0
+        print(f"{r['name']:<24} {params:<28} {b['median_ms']:9.3f} -> {r['median_ms']:9.3f} ms  {delta:+7.1f}%")
+
+
+def save_results(path: Path):
+    path.write_text(json.dumps({"python": platform.python_version(), "platform": platform.platform(),
+                                "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": RESULTS},
+                               ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def cli():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--json", type=Path, help="сохранить результаты для bench.py compare")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    al = sub.add_parser("all", help="io, launch, search, cards и theme подряд")
+    al.add_argument("--sizes", type=_sizes, default=_sizes(SIZES))
+    al.add_argument("--gui-sizes", type=_sizes, default=_sizes("10,1000"), help="размеры для замеров окна")
+    al.add_argument("--apps", type=int, default=8)
+    al.add_argument("--urls", type=int, default=12)
+    al.add_argument("--repeat", type=int, default=10)
+    al.set_defaults(func=bench_all)
+    io = sub.add_parser("io", help="чтение и запись profiles.json / profiles.db при N профилях")
+    io.add_argument("--sizes", type=_sizes, default=_sizes(SIZES))
+    io.add_argument("--repeat", type=int, default=10)
+    io.set_defaults(func=bench_io)
+    ca = sub.add_parser("cards", help="перестроение списка карточек при N профилях")
+    ca.add_argument("--sizes", "--profiles", type=_sizes, default=_sizes("10,1000"))
+    ca.add_argument("--repeat", type=int, default=20)
+    ca.set_defaults(func=bench_cards)
+    th = sub.add_parser("theme", help="время переключения темы при N профилях")
+    th.add_argument("--sizes", "--profiles", type=_sizes, default=_sizes("1000"))
+    th.add_argument("--repeat", type=int, default=20)
+    th.set_defaults(func=bench_theme)
+    se = sub.add_parser("search", help="индекс поиска: построение, запросы, обновление при N профилях")
+    se.add_argument("--sizes", type=_sizes, default=_sizes(SIZES))
+    se.add_argument("--repeat", type=int, default=50)
+    se.set_defaults(func=bench_search)
+    la = sub.add_parser("launch", help="launch_profile с заглушками вместо процессов и браузера")
+    la.add_argument("--apps", type=int, default=8)
+    la.add_argument("--urls", type=int, default=12)
+    la.add_argument("--repeat", type=int, default=50)
+    la.set_defaults(func=bench_launch)
+    su = sub.add_parser("startup", help="время запуска: командная строка против окна")
+    su.add_argument("--profiles", type=int, default=100)
+    su.add_argument("--repeat", type=int, default=5)
+    su.set_defaults(func=bench_startup)
+    ur = sub.add_parser("urls", help="число запусков браузера для N URL (браузер-заглушка считает вызовы)")
+    ur.add_argument("--urls", type=int, default=60)
+    ur.add_argument("--duplicates", type=int, default=10)
+    ur.add_argument("--small-limit", type=int, default=400, help="искусственно малый лимит командной строки")
+    ur.set_defaults(func=bench_urls)
+    de = sub.add_parser("depends", help="граф зависимостей: сайт ждёт порт сервера-заглушки, остальное стартует сразу")
+    de.add_argument("--delay", type=float, default=1.0, help="через сколько секунд сервер откроет порт")
+    de.add_argument("--apps", type=int, default=8)
+    de.set_defaults(func=bench_depends)
+    pf = sub.add_parser("prefetch", help="холодное и прогретое чтение файлов; точность прогноза запусков")
+    pf.add_argument("--files", type=int, default=4)
+    pf.add_argument("--mb", type=int, default=32, help="размер каждого файла, МБ")
+    pf.add_argument("--dir", help="где создать файлы (tmpfs не годится: его страницы не вытесняются)")
+    pf.add_argument("--settle", type=float, default=0.5, help="пауза после warm(), с")
+    pf.add_argument("--days", type=int, default=42, help="длина синтетической истории, дней")
+    pf.add_argument("--repeat", type=int, default=5)
+    pf.set_defaults(func=bench_prefetch)
+    cm = sub.add_parser("compare", help="сравнить два файла --json")
+    cm.add_argument("base")
+    cm.add_argument("new")
+    cm.set_defaults(func=compare)
+    args = ap.parse_args()
+    args.func(args)
+    if args.json and RESULTS:
+        save_results(args.json)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,174 @@
+"""Зависимости между элементами профиля и проверки их готовности.
+
+Настройки лежат в самом профиле, в ключе ``depends``::
+
+    "depends": {
+        "C:\\\\Dev\\\\postgres.lnk": {"ready": {"tcp": 5432}, "timeout": 60},
+        "C:\\\\Dev\\\\api.exe": {"after": ["C:\\\\Dev\\\\postgres.lnk"], "ready": [{"tcp": "127.0.0.1:8000"}]},
+        "http://localhost:8000/docs": {"after": ["C:\\\\Dev\\\\api.exe"]}
+    }
+
+Ключ — путь программы из ``apps``, адрес из ``urls`` (такой сайт открывается отдельно от остальных) или ``"urls"``
+для всей пачки сайтов. ``after`` — элементы, которые должны запуститься и пройти свои проверки ``ready`` раньше.
+Проверки: ``{"tcp": порт или "хост:порт"}``, ``{"file": путь}``, ``{"process": имя или путь программы}``;
+все должны пройти не позже ``timeout`` секунд после запуска элемента.
+"""
+from __future__ import annotations
+import os
+import socket
+import threading
+from typing import Dict, List, Optional
+
+from processes import exe_key, list_processes
+
+TIMEOUT = 30.0
+CONNECT_TIMEOUT = 0.5
+POLL = 0.1
+URLS = "urls"
+
+
+class Snapshot:
+    """Список процессов, снятый один раз на опрос и общий для всех проверок "process" этого опроса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes: Optional[Dict[int, str]] = None
+
+    def processes(self) -> Dict[int, str]:
+        with self._lock:
+            if self._processes is None:
+                self._processes = list_processes()
+            return self._processes
+
+
+class Probe:
+    """Одна проверка готовности: "tcp", "file" или "process"."""
+
+    KINDS = ("tcp", "file", "process")
+
+    def __init__(self, kind: str, arg: str):
+        self.kind = kind
+        self.arg = arg
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.arg}"
+
+    def check(self, snapshot: Optional[Snapshot] = None) -> bool:
+        if self.kind == "tcp":
+            host, _, port = self.arg.rpartition(":")
+            try:
+                with socket.create_connection((host.strip("[]"), int(port)), timeout=CONNECT_TIMEOUT):
+                    return True
+            except OSError:
+                return False
+        if self.kind == "file":
+            return os.path.exists(os.path.expandvars(self.arg))
+        exes = (snapshot or Snapshot()).processes().values()
+        want = self.arg.casefold()
+        if os.sep in self.arg or "/" in self.arg:
+            return exe_key(os.path.expandvars(self.arg)) in {exe_key(exe) for exe in exes}
+        names = {want, want + ".exe"}
+        return any(os.path.basename(exe).casefold() in names for exe in exes)
+
+
+def parse_probe(spec) -> Probe:
+    """{"tcp": 8080} -> Probe; ValueError с понятным текстом, если проверка записана неверно."""
+    if not isinstance(spec, dict) or len(spec) != 1:
+        raise ValueError(f"неверная проверка: {spec!r}")
+    (kind, arg), = spec.items()
+    if kind not in Probe.KINDS or arg in (None, ""):
+        raise ValueError(f"неверная проверка: {spec!r}")
+    if kind == "tcp":
+        arg = str(arg)
+        if ":" not in arg:
+            arg = f"127.0.0.1:{arg}"
+        if not arg.rpartition(":")[2].isdigit():
+            raise ValueError(f"неверный порт: {spec!r}")
+    return Probe(kind, str(arg))
+
+
+class Node:
+    def __init__(self, key: str, after: List[str], probes: List[Probe], timeout: float, error: str = ""):
+        self.key = key
+        self.after = after
+        self.probes = probes
+        self.timeout = timeout
+        self.error = error  # ошибка в настройке: элемент не запускается, зависимые от него — тоже
+
+    def pending(self, snapshot: Optional[Snapshot] = None) -> List[Probe]:
+        """Проверки, которые ещё не проходят."""
+        return [p for p in self.probes if not p.check(snapshot)]
+
+
+def depends_config(prof: Dict) -> Dict[str, Node]:
+    """Ключ элемента -> Node; пустой словарь, если зависимостей у профиля нет."""
+    nodes = {}
+    for key, cfg in (prof.get("depends") or {}).items():
+        cfg = cfg if isinstance(cfg, dict) else {}
+        after = cfg.get("after") or []
+        after = [after] if isinstance(after, str) else [str(a) for a in after]
+        ready = cfg.get("ready") or []
+        probes, error = [], ""
+        try:
+            probes = [parse_probe(r) for r in (ready if isinstance(ready, list) else [ready])]
+            timeout = float(cfg.get("timeout", TIMEOUT))
+        except (TypeError, ValueError) as e:
+            error, timeout = str(e), TIMEOUT
+        nodes[key] = Node(key, after, probes, timeout, error)
+    return nodes
+
+
+def task_key(kind: str, target: str, nodes: Dict[str, Node]) -> str:
+    """Ключ задачи из profile_tasks: путь программы, отдельный адрес или "urls" для пачки сайтов."""
+    return URLS if kind == "urls" and target not in nodes else target
+
+
+def cycle(keys: List[str], nodes: Dict[str, Node]) -> List[str]:
+    """Элементы, которые никогда не дождутся своих зависимостей из-за цикла (пусто — циклов нет)."""
+    left = {k: {d for d in nodes[k].after if d in keys} if k in nodes else set() for k in keys}
+    while True:
+        free = [k for k, deps in left.items() if not deps]
+        if not free:
+            return sorted(left)
+        for k in free:
+            del left[k]
+        for deps in left.values():
+            deps.difference_update(free)
+
+
+def profile_keys(prof: Dict, nodes: Dict[str, Node]) -> List[str]:
+    """Ключи всех элементов профиля в том же порядке, что и задачи profile_tasks."""
+    urls = prof.get("urls", [])
+    keys = [URLS] if any(u not in nodes for u in urls) else []
+    return keys + [u for u in urls if u in nodes] + [a for a in prof.get("apps", []) if a]
+
+
+def problems(prof: Dict) -> List[str]:
+    """Ошибки настройки для validate: неверные проверки, ссылки на несуществующие элементы, циклы."""
+    nodes = depends_config(prof)
+    keys = profile_keys(prof, nodes)
+    out = []
+    for key, node in nodes.items():
+        if key not in keys:
+            out.append(f"depends: нет элемента «{key}»")
+        if node.error:
+            out.append(f"depends: {key}: {node.error}")
+        out.extend(f"depends: {key}: нет элемента «{d}» в after" for d in node.after if d not in keys)
+    loop = cycle(keys, nodes)
+    if loop:
+        out.append("depends: цикл зависимостей: " + ", ".join(loop))
+    return out
+
+
+def blocked_reason(node: Optional[Node], keys: Dict[str, int], failed: Dict[str, str]) -> str:
+    """Почему элемент уже не запустится: ошибка настройки, нет зависимости или она не удалась; "" — можно ждать."""
+    if node is None:
+        return ""
+    if node.error:
+        return node.error
+    for d in node.after:
+        if d not in keys:
+            return f"нет элемента «{d}»"
+        if d in failed:
+            return f"не дождались «{d}»: {failed[d]}"
+    return ""
@@ -0,0 +1,1015 @@
+"""Графический интерфейс (PyQt6, иначе PyQt5). Импортируется только при запуске окна."""
+from __future__ import annotations
+import bisect
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# --- Qt imports: PyQt6 приоритетно, иначе PyQt5 ---
+try:
+    from PyQt6 import QtCore, QtGui, QtWidgets
+    PYQT6 = True
+except Exception:
+    from PyQt5 import QtCore, QtGui, QtWidgets 
+    PYQT6 = False
+
+import ipc
+from importers import DEFAULT_EXTENSIONS, iter_bookmarks, iter_folder, parse_extensions
+from launcher import (APP_NAME, CONFIG_PATH, LAUNCH_METRICS, PROCESSES, LaunchEngine, LaunchItemResult, LaunchResult,
+                      autostart_profile, disable_autostart, enable_autostart, is_autostart_enabled)
+from metrics import TOTAL, LaunchMetrics
+from pathindex import PathIndex
+from prefetch import for_store as prefetcher
+from search import SearchIndex
+from store import open_store
+from themes import DARK, LIGHT, Theme, ThemeRegistry
+from urldispatch import normalize_url
+
+THEMES_PATH = Path(__file__).with_name("themes.json")
+
+
+# Qt.UserRole + 1: кортеж (имя, программ, сайтов, браузер, отсутствует; -1 — не проверено,
+# запущено: None или (процессов, RSS в байтах, CPU %))
+ROW_ROLE = 0x0101
+CARD_HEIGHT = 84
+USAGE_INTERVAL = 3000  # мс между замерами памяти и CPU запущенных программ
+CARD_GAP = 12
+
+
+def _role(role) -> int:
+    return getattr(role, "value", role)
+
+
+def _rgba(s: str) -> QtGui.QColor:
+    try:
+        r, g, b, a = [float(x) for x in s.split(",")]
+        return QtGui.QColor(int(r), int(g), int(b), int(a * 255))
+    except Exception:
+        return QtGui.QColor(0, 0, 0, 120)
+
+
+class ProfileListModel(QtCore.QAbstractListModel):
+    """Сводки профилей, отсортированные по имени; изменения приходят построчно."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names: List[str] = []
+        self._rows: List[tuple] = []
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=0):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+        role = _role(role)
+        row = self._rows[index.row()]
+        if role == ROW_ROLE:
+            return row
+        if role in (0, 3):  # DisplayRole, ToolTipRole
+            return row[0]
+        return None
+
+    def name_at(self, row: int) -> str:
+        return self._names[row]
+
+    def row_of(self, name: str) -> int:
+        i = bisect.bisect_left(self._names, name)
+        return i if i < len(self._names) and self._names[i] == name else -1
+
+    def upsert(self, row: tuple) -> int:
+        row = tuple(row)
+        i = bisect.bisect_left(self._names, row[0])
+        if i < len(self._names) and self._names[i] == row[0]:
+            if self._rows[i] != row:
+                self._rows[i] = row
+                idx = self.index(i)
+                self.dataChanged.emit(idx, idx)
+            return i
+        self.beginInsertRows(QtCore.QModelIndex(), i, i)
+        self._names.insert(i, row[0]); self._rows.insert(i, row)
+        self.endInsertRows()
+        return i
+
+    def set_missing(self, name: str, missing: int):
+        i = self.row_of(name)
+        if i >= 0 and self._rows[i][4] != missing:
+            self.upsert(self._rows[i][:4] + (missing,) + self._rows[i][5:])
+
+    def set_usage(self, name: str, usage: Optional[tuple]):
+        i = self.row_of(name)
+        if i >= 0 and self._rows[i][5] != usage:
+            self.upsert(self._rows[i][:5] + (usage,))
+
+    def remove(self, name: str) -> bool:
+        i = self.row_of(name)
+        if i < 0:
+            return False
+        self.beginRemoveRows(QtCore.QModelIndex(), i, i)
+        del self._names[i]; del self._rows[i]
+        self.endRemoveRows()
+        return True
+
+    def set_rows(self, rows: List[tuple]):
+        rows = sorted(tuple(r) for r in rows)
+        if not self._rows:
+            self.beginResetModel()
+            self._rows = rows; self._names = [r[0] for r in rows]
+            self.endResetModel()
+            return
+        keep = {r[0] for r in rows}
+        for name in [n for n in self._names if n not in keep]:
+            self.remove(name)
+        for r in rows:
+            self.upsert(r)
+
+
+class ProfileFilterModel(QtCore.QSortFilterProxyModel):
+    """Показывает только найденные профили; при смене запроса Qt сам снимает и добавляет строки, без сброса модели."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._matches: Optional[Set[str]] = None
+
+    def set_matches(self, matches: Optional[Set[str]]):
+        if matches != self._matches:
+            self._matches = matches
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, row: int, parent) -> bool:
+        return self._matches is None or self.sourceModel().name_at(row) in self._matches
+
+
+class ProfileDelegate(QtWidgets.QStyledItemDelegate):
+    """Рисует карточку профиля; тень считается только для видимых строк."""
+
+    def __init__(self, theme: Theme, parent=None):
+        super().__init__(parent)
+        self.theme = theme
+
+    def sizeHint(self, option, index) -> QtCore.QSize:
+        return QtCore.QSize(option.rect.width(), CARD_HEIGHT + CARD_GAP)
+
+    def paint(self, painter: QtGui.QPainter, option, index):
+        row = index.data(ROW_ROLE)
+        if not row:
+            return
+        name, programs, sites, browser_path, missing, usage = row
+        t = self.theme
+        S = QtWidgets.QStyle.StateFlag if PYQT6 else QtWidgets.QStyle
+        A = QtCore.Qt.AlignmentFlag if PYQT6 else QtCore.Qt
+        hot = bool(option.state & (S.State_MouseOver | S.State_Selected))
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing if PYQT6 else QtGui.QPainter.Antialiasing)
+        r = QtCore.QRectF(option.rect).adjusted(8, 2, -8, -CARD_GAP)
+
+        shadow = _rgba(t.shadow)
+        painter.setPen(QtCore.Qt.PenStyle.NoPen if PYQT6 else QtCore.Qt.NoPen)
+        for k in (6, 4, 2):
+            c = QtGui.QColor(shadow); c.setAlpha(max(1, shadow.alpha() // k))
+            painter.setBrush(c)
+            painter.drawRoundedRect(r.adjusted(-k / 2, k / 2, k / 2, k), 12 + k / 2, 12 + k / 2)
+
+        painter.setPen(QtGui.QPen(QtGui.QColor(t.primary if hot else t.border), 1))
+        painter.setBrush(QtGui.QColor(t.card))
+        painter.drawRoundedRect(r, 12, 12)
+
+        content = r.adjusted(16, 14, -16, -14)
+        title_font = QtGui.QFont(option.font); title_font.setPixelSize(20); title_font.setWeight(QtGui.QFont.Weight.DemiBold if PYQT6 else QtGui.QFont.DemiBold)
+        painter.setFont(title_font)
+        painter.setPen(QtGui.QColor(t.text))
+        painter.drawText(QtCore.QRectF(content.left(), content.top(), 28, 28), A.AlignLeft | A.AlignVCenter, "💼")
+        title_rect = QtCore.QRectF(content.left() + 36, content.top(), content.width() - 36, 28)
+        if usage:
+            count, rss, cpu = usage
+            badge = f"● {count} · {rss / 2**20:.0f} MB · {cpu:.0f}% CPU"
+            painter.save(); painter.setFont(option.font); painter.setPen(QtGui.QColor(t.primary))
+            painter.drawText(title_rect, A.AlignRight | A.AlignVCenter, badge)
+            painter.restore()
+            title_rect.setWidth(title_rect.width() - QtGui.QFontMetrics(option.font).horizontalAdvance(badge) - 12)
+        title = QtGui.QFontMetrics(title_font).elidedText(
+            name, QtCore.Qt.TextElideMode.ElideRight if PYQT6 else QtCore.Qt.ElideRight, int(title_rect.width()))
+        painter.drawText(title_rect, A.AlignLeft | A.AlignVCenter, title)
+
+        painter.setFont(option.font)
+        painter.setPen(QtGui.QColor(t.subtext))
+        browser = Path(browser_path or "").name or ""
+        meta_rect = QtCore.QRectF(content.left() + 36, content.top() + 34, content.width() - 36, 20)
+        painter.drawText(meta_rect, A.AlignLeft | A.AlignVCenter, f"{programs} Programs · {sites} Websites    {browser}")
+        if missing > 0:
+            painter.setPen(QtGui.QColor(t.danger))
+            painter.drawText(meta_rect, A.AlignRight | A.AlignVCenter, f"⚠ {missing} missing item{'s' if missing > 1 else ''}")
+        painter.restore()
+
+
+class ThemeEngine:
+    """Переключает тему одной заменой таблицы стилей и палитры у QApplication, без пересоздания виджетов."""
+
+    def __init__(self, registry: ThemeRegistry):
+        self.registry = registry
+        self._palettes: Dict[str, QtGui.QPalette] = {}
+
+    def palette(self, theme: Theme) -> QtGui.QPalette:
+        pal = self._palettes.get(theme.name)
+        if pal is None:
+            R = QtGui.QPalette.ColorRole if PYQT6 else QtGui.QPalette
+            pal = QtGui.QPalette()
+            for role, color in ((R.Window, theme.base), (R.WindowText, theme.text), (R.Base, theme.card),
+                                (R.AlternateBase, theme.card), (R.Text, theme.text), (R.Button, theme.card),
+                                (R.ButtonText, theme.text), (R.Highlight, theme.primary), (R.HighlightedText, "#FFFFFF"),
+                                (R.ToolTipBase, theme.card), (R.ToolTipText, theme.text)):
+                pal.setColor(role, QtGui.QColor(color))
+            self._palettes[theme.name] = pal
+        return pal
+
+    def apply(self, theme: Theme):
+        app = QtWidgets.QApplication.instance()
+        app.setPalette(self.palette(theme))
+        app.setStyleSheet(self.registry.stylesheet(theme))
+
+
+def load_themes() -> ThemeRegistry:
+    registry = ThemeRegistry()
+    try:
+        registry.load(THEMES_PATH)
+    except Exception:
+        pass  # битый themes.json не должен мешать запуску — остаются встроенные темы
+    return registry
+
+
+class ProfileListView(QtWidgets.QListView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.placeholder = "Пока нет профилей"
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setFrameShape(QtWidgets.QFrame.Shape.NoFrame if PYQT6 else QtWidgets.QFrame.NoFrame)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel if PYQT6 else QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection if PYQT6 else QtWidgets.QAbstractItemView.SingleSelection)
+        self.setCursor(QtGui.QCursor(QtCore.Qt.CursorShape.PointingHandCursor))
+
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        if self.model() is not None and self.model().rowCount() == 0:
+            p = QtGui.QPainter(self.viewport())
+            theme = getattr(self.itemDelegate(), "theme", LIGHT)
+            p.setPen(QtGui.QColor(theme.subtext))
+            p.drawText(self.viewport().rect(), int((QtCore.Qt.AlignmentFlag if PYQT6 else QtCore.Qt).AlignCenter), self.placeholder)
+            p.end()
+
+
+class ProfileCombo(QtWidgets.QComboBox):
+    """Выбор профиля; список имён перечитывается при каждом открытии."""
+
+    def __init__(self, names: Callable[[], List[str]], empty: str, parent=None):
+        super().__init__(parent)
+        self._names = names
+        self._empty = empty
+        self.reload()
+
+    def reload(self):
+        current = self.current()
+        self.blockSignals(True)
+        self.clear(); self.addItem(self._empty, None)
+        for n in self._names():
+            self.addItem(n, n)
+        self.set_current(current)
+        self.blockSignals(False)
+
+    def current(self) -> Optional[str]:
+        return self.currentData()
+
+    def set_current(self, name: Optional[str]):
+        i = self.findData(name) if name else 0
+        self.setCurrentIndex(max(0, i))
+
+    def showPopup(self):
+        self.reload()
+        super().showPopup()
+
+
+class IpcBridge(QtCore.QObject):
+    """Команды от повторных запусков: проверяются в потоке сервера, выполняются в потоке GUI."""
+    received = QtCore.pyqtSignal(object)
+
+    def __init__(self, store, busy: Callable[[], bool], parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.busy = busy  # идёт запуск — новый встанет в очередь окна
+
+    def handle(self, req: Dict) -> Dict:
+        cmd = req.get("cmd")
+        if cmd == "run":
+            name = str(req.get("profile") or "")
+            if self.store.get(name) is None:
+                return {"ok": False, "message": f"Профиль «{name}» не найден"}
+            queued = self.busy()
+            self.received.emit({"cmd": "run", "profile": name})
+            return {"ok": True, "message": f"Профиль «{name}» запустится после текущего запуска" if queued
+                    else f"Запуск профиля: {name}"}
+        if cmd in ("show", "reload"):
+            self.received.emit({"cmd": cmd})
+            return {"ok": True, "message": "Окно открыто" if cmd == "show" else "Настройки перечитываются"}
+        return {"ok": False, "message": f"Неизвестная команда: {cmd}"}
+
+
+class IndexWatcher(QtCore.QObject):
+    """Связывает PathIndex с окном: следит за каталогами элементов и сообщает об изменениях в потоке GUI."""
+    changed = QtCore.pyqtSignal(object)
+
+    def __init__(self, index: PathIndex, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self._watched: Set[str] = set()
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(index.invalidate_dir)
+        index.listeners.append(self.changed.emit)
+        self.changed.connect(self._sync_dirs)
+
+    def _sync_dirs(self, names):
+        want = self.index.dirs()
+        new, gone = want - self._watched, self._watched - want
+        if gone:
+            self.watcher.removePaths(sorted(gone))
+        if new:
+            self.watcher.addPaths(sorted(new))
+        self._watched = want
+
+
+class LaunchThread(QtCore.QThread):
+    progress = QtCore.pyqtSignal(object, int, int)
+    completed = QtCore.pyqtSignal(object)
+
+    def __init__(self, name: str, state: Dict, parent=None, lookup: Optional[Callable] = None):
+        super().__init__(parent)
+        self.name = name
+        self.state = state
+        self.lookup = lookup
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        res = LaunchEngine(lookup=self.lookup, metrics=LAUNCH_METRICS, tracker=PROCESSES).run(self.name, self.state, self.progress.emit, self._cancel)
+        self.completed.emit(res)
+
+
+class CloseThread(QtCore.QThread):
+    """Закрывает программы профиля: ожидание вежливого завершения не блокирует окно."""
+    completed = QtCore.pyqtSignal(str, int, int)
+
+    def __init__(self, name: str, parent=None):
+        super().__init__(parent)
+        self.name = name
+
+    def run(self):
+        closed, killed = PROCESSES.close(self.name)
+        self.completed.emit(self.name, closed, killed)
+
+
+class LaunchReport(QtWidgets.QDialog):
+    """Время запуска по последним замерам: строка на элемент, медленные сверху; выгрузка в JSON/CSV."""
+    COLUMNS = ("Элемент", "p50, мс", "p95, мс", "макс, мс", "Замеров", "Ошибок", "Пропусков", "По этапам (p50, мс)", "Последняя ошибка")
+
+    def __init__(self, metrics: LaunchMetrics, profile: Optional[str] = None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Отчёт о запусках")
+        self.resize(980, 520)
+        self.metrics = metrics
+        self.profile_combo = ProfileCombo(metrics.profiles, "все профили")
+        self.profile_combo.set_current(profile)
+        self.profile_combo.currentIndexChanged.connect(self.reload)
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers if PYQT6 else QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.summary = QtWidgets.QLabel()
+
+        export_btn = QtWidgets.QPushButton("Экспорт…"); export_btn.setObjectName("Ghost")
+        export_btn.clicked.connect(self.export)
+        close_btn = QtWidgets.QPushButton("Закрыть"); close_btn.setObjectName("Primary")
+        close_btn.clicked.connect(self.accept)
+
+        top = QtWidgets.QHBoxLayout(); top.addWidget(QtWidgets.QLabel("Профиль:")); top.addWidget(self.profile_combo); top.addStretch(1); top.addWidget(self.summary)
+        bottom = QtWidgets.QHBoxLayout(); bottom.addWidget(export_btn); bottom.addStretch(1); bottom.addWidget(close_btn)
+        main = QtWidgets.QVBoxLayout(self)
+        main.addLayout(top); main.addWidget(self.table); main.addLayout(bottom)
+        self.reload()
+
+    def _cell(self, value) -> QtWidgets.QTableWidgetItem:
+        item = QtWidgets.QTableWidgetItem()
+        item.setData(_role(QtCore.Qt.ItemDataRole.DisplayRole if PYQT6 else QtCore.Qt.DisplayRole), value)  # числа сортируются как числа
+        return item
+
+    def reload(self):
+        profile = self.profile_combo.current()
+        rows = self.metrics.rows(profile)
+        stages: Dict[tuple, List[str]] = {}
+        for r in rows:
+            if r["stage"] != TOTAL:
+                stages.setdefault((r["profile"], r["target"]), []).append(f"{r['stage']} {r['p50_ms']:.1f}")
+        items = sorted((r for r in rows if r["stage"] == TOTAL and r["kind"] != "profile"), key=lambda r: -r["p95_ms"])
+        runs = [r for r in rows if r["kind"] == "profile" and r["count"]]
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(items))
+        for i, r in enumerate(items):
+            name = r["target"] if profile else f"{r['profile']}: {r['target']}"
+            values = (name, r["p50_ms"], r["p95_ms"], r["max_ms"], r["count"], r["failed"], r["skipped"],
+                      " · ".join(stages.get((r["profile"], r["target"]), [])), r["last_error"])
+            for col, v in enumerate(values):
+                self.table.setItem(i, col, self._cell(v))
+        self.table.setSortingEnabled(True)
+        self.table.resizeColumnsToContents()
+        if len(runs) == 1:
+            r = runs[0]; self.summary.setText(f"Запуск профиля: p50 {r['p50_ms']:.0f} мс, p95 {r['p95_ms']:.0f} мс ({r['count']} замеров)")
+        else:
+            self.summary.setText(f"Профилей с замерами: {len(runs)}" if runs else "Замеров пока нет")
+
+    def export(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Экспорт замеров", "launch_metrics.csv", "CSV (*.csv);;JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.metrics.export(Path(path), self.profile_combo.current())
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, APP_NAME, f"Не удалось сохранить отчёт: {e}")
+
+
+class ItemListModel(QtCore.QAbstractListModel):
+    """Строки редактора профиля: список хранит порядок, множество ключей — проверку повторов за O(1)."""
+
+    def __init__(self, items: Iterable[str] = (), key: Callable[[str], str] = str, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self._items: List[str] = []
+        self._keys: Set[str] = set()
+        self.add_many(items)
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index, role=0):
+        if index.isValid() and 0 <= index.row() < len(self._items) and _role(role) in (0, 3):  # Display, ToolTip
+            return self._items[index.row()]
+        return None
+
+    def __contains__(self, text: str) -> bool:
+        return self.key(text) in self._keys
+
+    def items(self) -> List[str]:
+        return list(self._items)
+
+    def add_many(self, items: Iterable[str]) -> int:
+        """Добавить новые строки одной вставкой в конец; повторы (по key) пропускаются. Возвращает, сколько добавлено."""
+        fresh = []
+        for text in items:
+            k = self.key(text) if text else ""
+            if k and k not in self._keys:
+                self._keys.add(k); fresh.append(text)
+        if fresh:
+            n = len(self._items)
+            self.beginInsertRows(QtCore.QModelIndex(), n, n + len(fresh) - 1)
+            self._items.extend(fresh)
+            self.endInsertRows()
+        return len(fresh)
+
+    def remove_rows(self, rows: Iterable[int]):
+        """Удалить строки; соседние удаляются одним диапазоном."""
+        rows = sorted(set(rows), reverse=True)
+        while rows:
+            last = first = rows.pop(0)
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            for text in self._items[first:last + 1]:
+                self._keys.discard(self.key(text))
+            del self._items[first:last + 1]
+            self.endRemoveRows()
+
+
+class ImportThread(QtCore.QThread):
+    """Гоняет импортёр в фоне и отдаёт найденное пачками, чтобы список обновлялся не на каждый элемент."""
+    batch = QtCore.pyqtSignal(object)
+    progress = QtCore.pyqtSignal(int, float)  # найдено, доля 0..1 (-1 — неизвестна)
+    BATCH = 500
+    INTERVAL = 0.1
+
+    def __init__(self, source: Callable[[Callable[[float], None]], Iterable[str]], parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.error = ""
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        fraction = [-1.0]
+        buf: List[str] = []
+        found, last = 0, time.monotonic()
+        try:
+            for item in self.source(lambda f: fraction.__setitem__(0, f)):
+                if self._cancel.is_set():
+                    break
+                buf.append(item); found += 1
+                if len(buf) >= self.BATCH or time.monotonic() - last >= self.INTERVAL:
+                    self.batch.emit(buf); self.progress.emit(found, fraction[0])
+                    buf, last = [], time.monotonic()
+        except OSError as e:
+            self.error = str(e)
+        if buf:
+            self.batch.emit(buf)
+        self.progress.emit(found, fraction[0])
+
+
+class ProfileEditor(QtWidgets.QDialog):
+    def __init__(self, parent=None, name: Optional[str]=None, state: Optional[Dict]=None):
+        super().__init__(parent)
+        self.setWindowTitle("Профиль")
+        self.resize(760, 560)
+        self.state = state or {"profiles": {}}
+        self.import_thread: Optional[ImportThread] = None
+        self.initial_name = name if (name and name in self.state.get("profiles", {})) else None
+        if self.initial_name:
+            prof = self.state["profiles"][self.initial_name]
+            apps = prof.get("apps", [])
+            urls = prof.get("urls", [])
+            browser_path = prof.get("browser_path", "")
+        else:
+            apps, urls, browser_path = [], [], ""
+
+        self.name_edit = QtWidgets.QLineEdit(self.initial_name or "")
+        self.browser_edit = QtWidgets.QLineEdit(browser_path)
+        self.browser_btn = QtWidgets.QPushButton("Обзор…")
+        self.browser_btn.clicked.connect(self.pick_browser)
+
+        self.apps_model = ItemListModel(apps, lambda p: os.path.normcase(os.path.normpath(p.strip())), self)
+        self.apps_list = self._list_view(self.apps_model)
+        self.apps_add_btn = QtWidgets.QPushButton("Добавить…")
+        self.apps_folder_btn = QtWidgets.QPushButton("Из папки…")
+        self.apps_del_btn = QtWidgets.QPushButton("Удалить выбранные")
+        self.apps_add_btn.clicked.connect(self.add_apps)
+        self.apps_folder_btn.clicked.connect(self.import_folder)
+        self.apps_del_btn.clicked.connect(self.del_apps)
+
+        self.urls_model = ItemListModel(urls, lambda u: normalize_url(u) or "", self)
+        self.urls_list = self._list_view(self.urls_model)
+        self.url_edit = QtWidgets.QLineEdit()
+        self.url_add_btn = QtWidgets.QPushButton("Добавить URL")
+        self.url_bookmarks_btn = QtWidgets.QPushButton("Из закладок…")
+        self.url_del_btn = QtWidgets.QPushButton("Удалить выбранные")
+        self.url_add_btn.clicked.connect(self.add_url)
+        self.url_bookmarks_btn.clicked.connect(self.import_bookmarks)
+        self.url_del_btn.clicked.connect(self.del_urls)
+
+        self.import_label = QtWidgets.QLabel()
+        self.import_bar = QtWidgets.QProgressBar(); self.import_bar.setTextVisible(False); self.import_bar.setMaximumHeight(8)
+        self.import_stop_btn = QtWidgets.QPushButton("Остановить"); self.import_stop_btn.setObjectName("Ghost")
+        self.import_stop_btn.clicked.connect(self.stop_import)
+        self.import_row = QtWidgets.QWidget()
+        ir = QtWidgets.QHBoxLayout(self.import_row); ir.setContentsMargins(0, 0, 0, 0)
+        ir.addWidget(self.import_label); ir.addWidget(self.import_bar, 1); ir.addWidget(self.import_stop_btn)
+        self.import_row.hide()
+
+        form = QtWidgets.QFormLayout()
+        form.addRow("Имя профиля:", self.name_edit)
+        hb = QtWidgets.QHBoxLayout(); hb.addWidget(self.browser_edit); hb.addWidget(self.browser_btn)
+        form.addRow("Браузер (.exe или .lnk):", hb)
+
+        apps_lbl = QtWidgets.QLabel("Программы/файлы (exe/lnk/docx/xlsx/pptx/и т.д.):")
+        urls_lbl = QtWidgets.QLabel("Сайты (URL):")
+
+        apps_btns = QtWidgets.QHBoxLayout(); apps_btns.addWidget(self.apps_add_btn); apps_btns.addWidget(self.apps_folder_btn); apps_btns.addWidget(self.apps_del_btn)
+        urls_btns = QtWidgets.QHBoxLayout(); urls_btns.addWidget(self.url_edit); urls_btns.addWidget(self.url_add_btn); urls_btns.addWidget(self.url_bookmarks_btn); urls_btns.addWidget(self.url_del_btn)
+
+        buttons = QtWidgets.QDialogButtonBox();
+        ok = buttons.addButton("Сохранить", QtWidgets.QDialogButtonBox.ButtonRole.AcceptRole)
+        cancel = buttons.addButton("Отмена", QtWidgets.QDialogButtonBox.ButtonRole.RejectRole)
+        ok.setObjectName("Primary"); cancel.setObjectName("Ghost")
+        buttons.accepted.connect(self.accept); buttons.rejected.connect(self.reject)
+
+        main = QtWidgets.QVBoxLayout(self)
+        main.addLayout(form)
+        main.addWidget(apps_lbl); main.addWidget(self.apps_list); main.addLayout(apps_btns)
+        main.addSpacing(8)
+        main.addWidget(urls_lbl); main.addWidget(self.urls_list); main.addLayout(urls_btns)
+        main.addWidget(self.import_row)
+        main.addStretch(1); main.addSpacing(8); main.addWidget(buttons)
+
+    def _list_view(self, model: ItemListModel) -> QtWidgets.QListView:
+        view = QtWidgets.QListView(); view.setModel(model); view.setUniformItemSizes(True)
+        view.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection if PYQT6 else QtWidgets.QAbstractItemView.ExtendedSelection)
+        return view
+
+    def pick_browser(self):
+        dlg = QtWidgets.QFileDialog(self, "Выберите браузер (.exe или .lnk)")
+        dlg.setFileMode(QtWidgets.QFileDialog.FileMode.ExistingFile if PYQT6 else QtWidgets.QFileDialog.ExistingFile)
+        dlg.setNameFilters(["Браузер (*.exe *.lnk)", "Все файлы (*.*)"])
+        if dlg.exec():
+            files = dlg.selectedFiles()
+            if files:
+                self.browser_edit.setText(files[0])
+
+    def add_apps(self):
+        dlg = QtWidgets.QFileDialog(self, "Выберите элементы (программы/файлы)")
+        dlg.setFileMode(QtWidgets.QFileDialog.FileMode.ExistingFiles if PYQT6 else QtWidgets.QFileDialog.ExistingFiles)
+        dlg.setNameFilters(["Все файлы (*.*)", "Программы (*.exe *.lnk)", "Документы/проекты (*.docx *.xlsx *.pptx *.pdf *.sln)"])
+        if dlg.exec():
+            self.apps_model.add_many(dlg.selectedFiles())
+
+    def del_apps(self):
+        self.apps_model.remove_rows(i.row() for i in self.apps_list.selectionModel().selectedRows())
+
+    def add_url(self):
+        u = self.url_edit.text().strip()
+        if u and self.urls_model.add_many([u]):
+            self.url_edit.clear()
+
+    def del_urls(self):
+        self.urls_model.remove_rows(i.row() for i in self.urls_list.selectionModel().selectedRows())
+
+    def import_folder(self):
+        folder = QtWidgets.QFileDialog.getExistingDirectory(self, "Папка с программами и документами")
+        if not folder:
+            return
+        exts, ok = QtWidgets.QInputDialog.getText(self, "Импорт из папки", "Расширения через запятую (пусто — все файлы):",
+                                                  text=", ".join(DEFAULT_EXTENSIONS))
+        if ok:
+            extensions = parse_extensions(exts)
+            self._start_import(lambda progress: iter_folder(folder, extensions), self.apps_model, Path(folder).name or folder)
+
+    def import_bookmarks(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Экспорт закладок браузера", "", "Закладки (*.html *.htm);;Все файлы (*.*)")
+        if path:
+            self._start_import(lambda progress: iter_bookmarks(path, progress), self.urls_model, Path(path).name)
+
+    def _start_import(self, source: Callable, model: ItemListModel, label: str):
+        if self.import_thread is not None:
+            return
+        th = ImportThread(source, self)
+        added = [0]
+
+        def on_batch(items):
+            added[0] += model.add_many(items)
+
+        def on_progress(found: int, fraction: float):
+            self.import_label.setText(f"{label}: найдено {found}, добавлено {added[0]}")
+            if fraction < 0:
+                self.import_bar.setRange(0, 0)  # сколько всего — неизвестно
+            else:
+                self.import_bar.setRange(0, 1000); self.import_bar.setValue(int(fraction * 1000))
+
+        def on_finished():
+            self.import_thread = None
+            self.import_bar.hide(); self.import_stop_btn.hide()
+            for b in (self.apps_folder_btn, self.url_bookmarks_btn):
+                b.setEnabled(True)
+            self.import_label.setText(f"{label}: ошибка чтения — {th.error}" if th.error else f"{label}: добавлено {added[0]}")
+
+        th.batch.connect(on_batch)
+        th.progress.connect(on_progress)
+        th.finished.connect(on_finished)
+        th.finished.connect(th.deleteLater)
+        self.import_thread = th
+        for b in (self.apps_folder_btn, self.url_bookmarks_btn):
+            b.setEnabled(False)
+        on_progress(0, -1.0)
+        self.import_bar.show(); self.import_stop_btn.show(); self.import_row.show()
+        th.start()
+
+    def stop_import(self):
+        if self.import_thread is not None:
+            self.import_thread.cancel()
+
+    def done(self, r):
+        if self.import_thread is not None:
+            self.import_thread.cancel(); self.import_thread.wait()
+        super().done(r)
+
+    def get_profile(self) -> Optional[Dict]:
+        name = self.name_edit.text().strip()
+        if not name:
+            return None
+        browser_path = self.browser_edit.text().strip()
+        return {"name": name, "apps": self.apps_model.items(), "urls": self.urls_model.items(), "browser_path": browser_path}
+
+
+
+class MainWindow(QtWidgets.QMainWindow):
+    def __init__(self, store=None):
+        super().__init__()
+        self.setWindowTitle(APP_NAME)
+        self.resize(900, 640)
+        self.themes = ThemeEngine(load_themes())
+        self.theme = DARK if self._prefer_dark() else LIGHT
+        self.store = store if store is not None else open_store(CONFIG_PATH)
+        self.selected_name: Optional[str] = None
+        self.launch_thread: Optional[LaunchThread] = None
+        self.queued: List[str] = []  # профили, присланные через ipc во время другого запуска
+        self.close_thread: Optional[CloseThread] = None
+        self.usage: Dict[str, tuple] = {}
+        self.ipc = IpcBridge(self.store, lambda: self.launch_thread is not None or bool(self.queued), self)
+        self.index = PathIndex()
+        self.index_watcher = IndexWatcher(self.index, self)
+        self.index_watcher.changed.connect(self.on_index_changed)
+        self.ipc.received.connect(self.on_ipc)
+
+
+        title = QtWidgets.QLabel("Windows Launcher Profiles"); title.setObjectName("Title")
+        self.theme_btn = QtWidgets.QToolButton(); self.theme_btn.setText("☀️" if self.theme.is_dark else "🌙")
+        self.theme_btn.clicked.connect(self.toggle_theme)
+
+        self.search = SearchIndex()
+        self.search_edit = QtWidgets.QLineEdit(); self.search_edit.setPlaceholderText("Поиск: профиль, программа или сайт  (Ctrl+F)")
+        self.search_edit.setClearButtonEnabled(True); self.search_edit.setMinimumWidth(280)
+        self.search_edit.textChanged.connect(self.apply_search)
+        find = QtGui.QShortcut(QtGui.QKeySequence("Ctrl+F"), self) if PYQT6 else QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+F"), self)
+        find.activated.connect(lambda: (self.search_edit.setFocus(), self.search_edit.selectAll()))
+
+        header = QtWidgets.QHBoxLayout(); header.addWidget(title); header.addStretch(1); header.addWidget(self.search_edit); header.addWidget(self.theme_btn)
+
+        self.cards_model = ProfileListModel(self)
+        self.cards_filter = ProfileFilterModel(self); self.cards_filter.setSourceModel(self.cards_model)
+        self.cards_delegate = ProfileDelegate(self.theme, self)
+        self.cards_view = ProfileListView()
+        self.cards_view.setModel(self.cards_filter); self.cards_view.setItemDelegate(self.cards_delegate)
+        self.cards_view.clicked.connect(lambda idx: self.on_card_clicked(idx.data(ROW_ROLE)[0]))
+
+
+        self.autostart_chk = QtWidgets.QCheckBox("Запускать при входе в Windows"); self.autostart_chk.setChecked(is_autostart_enabled())
+        self.autostart_combo = ProfileCombo(self.store.names, "только окно")
+        self.autostart_combo.setToolTip("Профиль, который запускается при входе по очереди, с учётом нагрузки системы")
+        self.autostart_combo.set_current(autostart_profile())
+        self.apply_auto_btn = QtWidgets.QPushButton("Применить"); self.apply_auto_btn.setObjectName("Ghost")
+        self.apply_auto_btn.clicked.connect(self.on_apply_auto)
+
+        self.new_btn = QtWidgets.QPushButton("Новый профиль"); self.new_btn.setObjectName("Primary")
+        self.edit_btn = QtWidgets.QPushButton("Редактировать"); self.edit_btn.setObjectName("Ghost")
+        self.del_btn = QtWidgets.QPushButton("Удалить"); self.del_btn.setObjectName("Danger")
+        self.run_btn = QtWidgets.QPushButton("Запустить"); self.run_btn.setObjectName("Primary")
+        self.close_btn = QtWidgets.QPushButton("Закрыть программы"); self.close_btn.setObjectName("Ghost")
+        self.close_btn.setToolTip("Завершить всё, что запустил выбранный профиль")
+        self.report_btn = QtWidgets.QPushButton("Отчёт"); self.report_btn.setObjectName("Ghost")
+        self.report_btn.setToolTip("Сколько занимает запуск каждого элемента по последним замерам")
+
+        self.new_btn.clicked.connect(self.on_new)
+        self.edit_btn.clicked.connect(self.on_edit)
+        self.del_btn.clicked.connect(self.on_del)
+        self.run_btn.clicked.connect(self.on_run)
+        self.report_btn.clicked.connect(self.on_report)
+        self.close_btn.clicked.connect(self.on_close_profile)
+
+        footerA = QtWidgets.QHBoxLayout()
+        footerA.addWidget(self.autostart_chk); footerA.addWidget(self.autostart_combo); footerA.addStretch(1); footerA.addWidget(self.apply_auto_btn)
+        footerB = QtWidgets.QHBoxLayout()
+        footerB.addWidget(self.new_btn); footerB.addWidget(self.edit_btn); footerB.addWidget(self.del_btn); footerB.addStretch(1); footerB.addWidget(self.report_btn); footerB.addWidget(self.close_btn); footerB.addWidget(self.run_btn)
+
+
+        central = QtWidgets.QWidget(); self.setCentralWidget(central)
+        root = QtWidgets.QVBoxLayout(central); root.setContentsMargins(18,18,18,18); root.setSpacing(14)
+        root.addLayout(header)
+        root.addWidget(self.cards_view)
+        root.addLayout(footerA)
+        root.addLayout(footerB)
+
+        self.status = QtWidgets.QStatusBar(); self.setStatusBar(self.status)
+
+        self.apply_theme()
+        self.refresh_cards()
+        self._index_all()
+        self.usage_timer = QtCore.QTimer(self); self.usage_timer.setInterval(USAGE_INTERVAL)
+        self.usage_timer.timeout.connect(self.sample_usage); self.usage_timer.start()
+        self.prefetch = prefetcher(self.store, self.index.get)  # фоновый прогрев кэша по истории запусков
+        self.prefetch.start()
+
+
+    def _snapshot(self, name: Optional[str]) -> Dict:
+        prof = self.store.get(name) if name else None
+        return {"profiles": {name: prof}} if prof is not None else {"profiles": {}}
+
+    def _prefer_dark(self) -> bool:
+
+        pal = self.palette(); c = pal.window().color();
+        return (c.red()+c.green()+c.blue())/3 < 128
+
+    def apply_theme(self):
+        self.themes.apply(self.theme)
+        self.cards_delegate.theme = self.theme; self.cards_view.viewport().update()
+        self.theme_btn.setText("☀️" if self.theme.is_dark else "🌙")  # инвертируем иконку как переключатель
+
+    def toggle_theme(self):
+        self.theme = self.themes.registry.next(self.theme)
+        self.apply_theme()
+
+    def refresh_cards(self):
+        self.cards_model.set_rows([(*r, self.index.missing_count(r[0]), self.usage.get(r[0])) for r in self.store.summaries()])
+        if self.selected_name and self.cards_model.row_of(self.selected_name) < 0:
+            self.selected_name = None
+        self._select_card(self.selected_name)
+
+    def _card_row(self, name: str, prof: Dict) -> tuple:
+        return (name, len(prof.get("apps", [])), len(prof.get("urls", [])), prof.get("browser_path", "") or "",
+                self.index.missing_count(name), self.usage.get(name))
+
+    def _index_all(self):
+        profiles = lambda: ((n, p) for n in self.store.names() for p in [self.store.get(n)] if p is not None)
+        self.index.load(profiles)
+        self.search.load(profiles)
+
+    def apply_search(self):
+        text = self.search_edit.text()
+        matches = self.search.query(text)
+        self.cards_filter.set_matches(matches)
+        self.cards_view.placeholder = "Ничего не найдено" if matches is not None else "Пока нет профилей"
+        self.cards_view.viewport().update()
+        if matches is not None:
+            self.status.showMessage(f"Найдено профилей: {len(matches)}", 2000)
+        self._select_card(self.selected_name)
+
+    def on_index_changed(self, names):
+        for name in names:
+            self.cards_model.set_missing(name, self.index.missing_count(name))
+
+    def sample_usage(self):
+        usage = PROCESSES.sample()
+        for name in set(usage) | set(self.usage):
+            self.cards_model.set_usage(name, usage.get(name))
+        self.usage = usage
+
+    def _select_card(self, name: Optional[str]):
+        row = self.cards_model.row_of(name) if name else -1
+        idx = self.cards_filter.mapFromSource(self.cards_model.index(row)) if row >= 0 else QtCore.QModelIndex()
+        if not idx.isValid():  # нет такого профиля или он скрыт поиском
+            self.cards_view.clearSelection()
+            return
+        self.cards_view.setCurrentIndex(idx); self.cards_view.scrollTo(idx)
+
+    def on_card_clicked(self, name: str):
+        self.selected_name = name
+        self.status.showMessage(f"Выбрано: {name}", 2000)
+
+    def _save_profile(self, name: str, prof: Dict, old_name: Optional[str] = None):
+        self.store.put(name, prof, old_name=old_name)
+        if old_name and old_name != name:
+            self.cards_model.remove(old_name); self.index.remove_profile(old_name); self.search.remove(old_name)
+        self.index.set_profile(name, prof)
+        self.search.set(name, prof)
+        self.cards_model.upsert(self._card_row(name, prof))
+        if self.search_edit.text().strip():
+            self.cards_filter.set_matches(self.search.query(self.search_edit.text()))
+        self.selected_name = name
+        self._select_card(name)
+
+    def on_new(self):
+        dlg = ProfileEditor(self, None, None)
+        if dlg.exec() == (QtWidgets.QDialog.DialogCode.Accepted if PYQT6 else QtWidgets.QDialog.Accepted):
+            prof = dlg.get_profile()
+            if prof:
+                self._save_profile(prof["name"], {"apps": prof["apps"], "urls": prof["urls"], "browser_path": prof["browser_path"]})
+                self.status.showMessage(f"Профиль «{prof['name']}» сохранён", 3000)
+
+    def on_edit(self):
+        name = self.selected_name
+        if not name: return
+        dlg = ProfileEditor(self, name, self._snapshot(name))
+        if dlg.exec() == (QtWidgets.QDialog.DialogCode.Accepted if PYQT6 else QtWidgets.QDialog.Accepted):
+            prof = dlg.get_profile()
+            if prof:
+                old = self.store.get(name) or {}
+                self._save_profile(prof["name"], {**old, "apps": prof["apps"], "urls": prof["urls"], "browser_path": prof["browser_path"]},
+                                   old_name=name)
+                self.status.showMessage(f"Профиль «{prof['name']}» обновлён", 3000)
+
+    def on_del(self):
+        name = self.selected_name
+        if not name: return
+        reply = QtWidgets.QMessageBox.question(self, "Удалить профиль", f"Удалить профиль «{name}»?",
+                                               QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No)
+        if reply == QtWidgets.QMessageBox.StandardButton.Yes:
+            self.store.delete(name); self.cards_model.remove(name); self.index.remove_profile(name); self.search.remove(name)
+            LAUNCH_METRICS.forget(name)
+            self.selected_name = None
+            self.status.showMessage(f"Профиль «{name}» удалён", 3000)
+
+    def on_run(self):
+        if self.launch_thread is not None:
+            self.launch_thread.cancel(); self.status.showMessage("Отмена запуска…", 3000); return
+        name = self.selected_name
+        if not name:
+            self.status.showMessage("Сначала выберите профиль", 3000); return
+        self.run_profile(name)
+
+    def run_profile(self, name: str) -> bool:
+        if self.launch_thread is not None:
+            self.status.showMessage("Дождитесь окончания текущего запуска", 3000); return False
+        self.status.showMessage(f"Запуск профиля: {name}…")
+        th = LaunchThread(name, self._snapshot(name), self, lookup=self.index.get)
+        th.progress.connect(self.on_launch_progress)
+        th.completed.connect(self.on_launch_done)
+        th.finished.connect(th.deleteLater)
+        self.launch_thread = th
+        self.run_btn.setText("Остановить")
+        th.start()
+        return True
+
+    def on_close_profile(self):
+        name = self.selected_name
+        if not name or self.close_thread is not None: return
+        if not PROCESSES.alive(name):
+            self.status.showMessage(f"У профиля «{name}» нет запущенных программ", 3000); return
+        reply = QtWidgets.QMessageBox.question(self, "Закрыть программы", f"Закрыть всё, что запустил профиль «{name}»?\n"
+                                               "Программам будет предложено завершиться; несохранённые данные могут пропасть.",
+                                               QtWidgets.QMessageBox.StandardButton.Yes | QtWidgets.QMessageBox.StandardButton.No)
+        if reply != QtWidgets.QMessageBox.StandardButton.Yes:
+            return
+        th = CloseThread(name, self)
+        th.completed.connect(self.on_close_done)
+        th.finished.connect(th.deleteLater)
+        self.status.showMessage(f"Закрытие программ профиля: {name}…")
+        self.close_thread = th
+        th.start()
+
+    def on_close_done(self, name: str, closed: int, killed: int):
+        self.close_thread = None
+        self.sample_usage()
+        self.status.showMessage(f"{name}: закрыто {closed}" + (f", завершено принудительно {killed}" if killed else ""), 5000)
+
+    def on_report(self):
+        LaunchReport(LAUNCH_METRICS, self.selected_name, self).exec()
+
+    def on_ipc(self, req: Dict):
+        cmd = req.get("cmd")
+        if cmd == "show":
+            self.showNormal(); self.raise_(); self.activateWindow()
+        elif cmd == "run":
+            if self.launch_thread is not None or self.queued:
+                self.queued.append(req["profile"])
+                self.status.showMessage(f"Профиль «{req['profile']}» запустится после текущего запуска", 3000)
+            else:
+                self._run_selected(req["profile"])
+        elif cmd == "reload":
+            self.store.reload(force=True)
+            self.themes.registry = load_themes()
+            self.theme = self.themes.registry.get(self.theme.name) or self.theme
+            self.apply_theme(); self.refresh_cards(); self._index_all(); self.apply_search()
+            self.status.showMessage("Настройки перечитаны", 3000)
+
+    def _run_selected(self, name: str):
+        self.selected_name = name; self._select_card(name)
+        self.run_profile(name)
+
+    def on_launch_progress(self, item: LaunchItemResult, done: int, total: int):
+        target = Path(item.target).name or item.target
+        self.status.showMessage(f"Запуск профиля: {done}/{total} · {target}")
+
+    def on_launch_done(self, res: LaunchResult):
+        self.launch_thread = None
+        self.run_btn.setText("Запустить")
+        head = "Отменено" if res.cancelled else "Готово"
+        self.status.showMessage(f"{head}: {res.name} — запущено {len(res.started)}, ошибок {len(res.failed)}, "
+                                f"пропущено {len(res.skipped)} ({res.duration:.1f} с)", 5000)
+        self.sample_usage()
+        if self.queued:
+            self._run_selected(self.queued.pop(0))
+
+    def closeEvent(self, e):
+        if self.launch_thread is not None:
+            self.launch_thread.cancel(); self.launch_thread.wait()
+        if self.close_thread is not None:
+            self.close_thread.wait()
+        self.usage_timer.stop()
+        self.prefetch.stop()
+        self.index.close()
+        try:
+            self.store.flush()
+        except Exception as ex:
+            QtWidgets.QMessageBox.warning(self, APP_NAME, f"Не удалось сохранить профили: {ex}")
+        super().closeEvent(e)
+
+    def on_apply_auto(self):
+        if self.autostart_chk.isChecked():
+            ok = enable_autostart(self.autostart_combo.current()); self.status.showMessage("Автозапуск включён" if ok else "Не удалось включить автозапуск", 3000)
+            self.autostart_chk.setChecked(is_autostart_enabled())
+        else:
+            ok = disable_autostart(); self.status.showMessage("Автозапуск отключён" if ok else "Не удалось отключить автозапуск", 3000)
+            self.autostart_chk.setChecked(is_autostart_enabled())
+
+
+def run_gui(store=None, standalone: bool = False) -> int:
+    """standalone — отдельное окно без сервера команд (main.py --local или чужой --config)."""
+    if not standalone and ipc.send({"cmd": "show"}) is not None:
+        return 0  # окно уже открыто в другом процессе (запуск в обход main.py) — показали его
+    app = QtWidgets.QApplication(sys.argv)
+    w = MainWindow(store)
+    if not standalone:
+        server = ipc.Server(w.ipc.handle)
+        if server.start():  # повторные запуски main.py передают команды этому процессу
+            app.aboutToQuit.connect(server.stop)
+    w.show()
+    return app.exec()
@@ -0,0 +1,84 @@
+"""Массовый импорт в профиль: файлы из папки (по расширениям) и ссылки из экспорта закладок браузера.
+
+Оба импортёра — генераторы: элементы отдаются по мере чтения, так что тысячи файлов или ссылок
+не собираются в память целиком, а вызывающий код может показывать прогресс и прерываться.
+"""
+from __future__ import annotations
+import codecs
+import os
+from html.parser import HTMLParser
+from typing import Callable, Iterable, Iterator, List, Optional, Set
+
+DEFAULT_EXTENSIONS = ("exe", "lnk", "docx", "xlsx", "pptx", "pdf", "sln")
+URL_SCHEMES = ("http://", "https://", "ftp://", "file://")
+CHUNK = 64 * 1024
+
+Progress = Callable[[float], None]  # доля 0..1
+
+
+def parse_extensions(text: str) -> Optional[Set[str]]:
+    """"exe, .LNK docx" -> {"exe", "lnk", "docx"}; пустая строка или "*" — все файлы (None)."""
+    exts = {e.strip().lstrip("*").lstrip(".").lower() for e in text.replace(";", ",").replace(" ", ",").split(",")}
+    exts.discard("")
+    return exts or None
+
+
+def iter_folder(root: str, extensions: Optional[Iterable[str]] = DEFAULT_EXTENSIONS,
+                recursive: bool = True) -> Iterator[str]:
+    """Файлы папки с подходящими расширениями; скрытые файлы и ссылки на каталоги пропускаются."""
+    exts = {e.lower().lstrip(".") for e in extensions} if extensions is not None else None
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        dirs: List[str] = []
+        with it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            dirs.append(entry.path)
+                    elif entry.is_file() and (exts is None or os.path.splitext(entry.name)[1][1:].lower() in exts):
+                        yield entry.path
+                except OSError:
+                    continue
+        stack.extend(sorted(dirs, reverse=True))  # обходим подпапки по алфавиту
+
+
+class _BookmarkParser(HTMLParser):
+    """Netscape Bookmark File: ссылки — это <A HREF="…"> внутри <DT>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.found: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = (dict(attrs).get("href") or "").strip()
+            if href.lower().startswith(URL_SCHEMES):
+                self.found.append(href)
+
+
+def iter_bookmarks(path: str, progress: Optional[Progress] = None) -> Iterator[str]:
+    """Ссылки из экспорта закладок (Chrome, Edge, Firefox — формат Netscape HTML) в порядке файла."""
+    total = max(1, os.path.getsize(path))
+    parser = _BookmarkParser()
+    with open(path, "rb") as f:
+        # кодировку объявляет <META>, но на практике это всегда UTF-8
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            chunk = f.read(CHUNK)
+            parser.feed(decoder.decode(chunk, final=not chunk))
+            yield from parser.found
+            parser.found.clear()
+            if progress:
+                progress(min(1.0, f.tell() / total))
+            if not chunk:
+                break
+    parser.close()
+    yield from parser.found
+
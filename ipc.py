@@ -0,0 +1,156 @@
+"""Единственный резидентный экземпляр: повторные запуски пересылают команду через локальный сокет и сразу выходят.
+
+Unix — сокет AF_UNIX в XDG_RUNTIME_DIR (или во временном каталоге) с правами 0600; Windows — 127.0.0.1 на
+случайном порту, порт и одноразовый токен лежат в файле, доступном только текущему пользователю.
+Протокол — одна строка JSON в каждую сторону.
+"""
+from __future__ import annotations
+import json
+import os
+import secrets
+import socket
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+NAME = "windows-launcher-profiles"
+TIMEOUT = 2.0
+MAX_REQUEST = 64 * 1024
+USE_UNIX = hasattr(socket, "AF_UNIX")
+
+
+def _user() -> str:
+    if hasattr(os, "getuid"):
+        return str(os.getuid())
+    return os.environ.get("USERNAME", "user")
+
+
+def endpoint() -> Path:
+    base = Path(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir())
+    return base / f"{NAME}-{_user()}.{'sock' if USE_UNIX else 'port'}"
+
+
+def _readline(sock: socket.socket) -> bytes:
+    buf = b""
+    while b"\n" not in buf and len(buf) < MAX_REQUEST:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        buf += chunk
+    return buf.split(b"\n", 1)[0]
+
+
+def _connect(path: Path, timeout: float):
+    """(сокет, токен) резидентного экземпляра; OSError/ValueError, если его нет."""
+    if USE_UNIX:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            sock.close(); raise
+        return sock, ""
+    info = json.loads(path.read_text(encoding="utf-8"))
+    sock = socket.create_connection(("127.0.0.1", int(info["port"])), timeout=timeout)
+    return sock, str(info["token"])
+
+
+def send(request: Dict, timeout: float = TIMEOUT, path: Optional[Path] = None) -> Optional[Dict]:
+    """Отправить команду резидентному экземпляру. None — если его нет или он не ответил."""
+    try:
+        sock, token = _connect(path or endpoint(), timeout)
+    except (OSError, ValueError, KeyError):
+        return None
+    try:
+        with sock:
+            sock.sendall(json.dumps({**request, "token": token}, ensure_ascii=False).encode("utf-8") + b"\n")
+            reply = _readline(sock)
+        return json.loads(reply) if reply else None
+    except (OSError, ValueError):
+        return None
+
+
+class Server:
+    """Принимает команды в фоновом потоке и передаёт их в handler(request) -> reply."""
+
+    def __init__(self, handler: Callable[[Dict], Dict], path: Optional[Path] = None):
+        self.handler = handler
+        self.path = path or endpoint()
+        self._sock: Optional[socket.socket] = None
+        self._token = ""
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """False — если уже работает другой экземпляр (или слушать не удалось)."""
+        if send({"cmd": "ping"}, timeout=0.5, path=self.path) is not None:
+            return False
+        try:
+            if USE_UNIX:
+                self.path.unlink(missing_ok=True)  # остался от упавшего процесса
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                old = os.umask(0o177)
+                try:
+                    sock.bind(str(self.path))
+                finally:
+                    os.umask(old)
+            else:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.bind(("127.0.0.1", 0))
+                self._token = secrets.token_hex(16)
+                fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"port": sock.getsockname()[1], "token": self._token, "pid": os.getpid()}, f)
+            sock.listen(8)
+        except OSError:
+            return False
+        self._sock = sock
+        self._thread = threading.Thread(target=self._serve, name="ipc", daemon=True)
+        self._thread.start()
+        return True
+
+    def _serve(self):
+        while self._sock is not None:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            with conn:
+                try:
+                    conn.settimeout(TIMEOUT)
+                    reply = self._handle(_readline(conn))
+                    conn.sendall(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+                except OSError:
+                    pass
+
+    def _handle(self, raw: bytes) -> Dict:
+        try:
+            req = json.loads(raw)
+        except ValueError:
+            return {"ok": False, "message": "некорректный запрос"}
+        if not isinstance(req, dict) or (self._token and not secrets.compare_digest(str(req.pop("token", "")).encode(), self._token.encode())):
+            return {"ok": False, "message": "отказано"}
+        req.pop("token", None)
+        if req.get("cmd") == "ping":
+            return {"ok": True, "message": "pong", "pid": os.getpid()}
+        try:
+            return self.handler(req)
+        except Exception as e:
+            return {"ok": False, "message": str(e) or e.__class__.__name__}
+
+    def stop(self):
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)  # будит accept() в потоке сервера
+        except OSError:
+            pass
+        try:
+            sock.close()
+        except OSError:
+            pass
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError:
+            pass
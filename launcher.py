@@ -0,0 +1,436 @@
+"""Запуск профилей и работа с конфигурацией без Qt — общий код для GUI и командной строки."""
+from __future__ import annotations
+import os
+import re
+import shlex
+import sys
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import depends
+import metrics
+import shelllink
+import urldispatch
+from metrics import EXISTS, READY, RESOLVE, SPAWN, URLS, LaunchMetrics
+from processes import IF_RUNNING_SKIP, RUNNING, ProcessTracker, ProfileRun
+from shelllink import LnkCache, ShellLink
+from store import read_state, write_json_atomic
+
+APP_NAME = "Windows Launcher Profiles"
+CONFIG_NAME = "profiles.json"
+CONFIG_PATH = Path(__file__).with_name(CONFIG_NAME)
+LNK_CACHE = LnkCache(Path(__file__).with_name("lnk_cache.json"))
+LAUNCH_METRICS = LaunchMetrics(Path(__file__).with_name("launch_metrics.json"))
+PROCESSES = ProcessTracker(Path(__file__).with_name("processes.json"))
+MAIN_SCRIPT = Path(__file__).with_name("main.py")
+STARTUP_DIR = Path(os.environ.get("APPDATA", "")) / r"Microsoft\Windows\Start Menu\Programs\Startup"
+LAUNCH_WORKERS = 4
+
+STARTED, FAILED, SKIPPED = "started", "failed", "skipped"
+
+
+def load_state() -> Dict:
+    return read_state(CONFIG_PATH)
+
+
+def save_state(data: Dict) -> None:
+    write_json_atomic(CONFIG_PATH, data)
+
+
+def is_autostart_enabled() -> bool:
+    return (STARTUP_DIR / f"{APP_NAME}.lnk").exists() or (STARTUP_DIR / f"{APP_NAME}.bat").exists()
+
+
+def autostart_profile() -> Optional[str]:
+    """Профиль, который запускается при входе (`main.py autostart <профиль>`), или None — только окно."""
+    args = ""
+    lnk, bat = STARTUP_DIR / f"{APP_NAME}.lnk", STARTUP_DIR / f"{APP_NAME}.bat"
+    try:
+        if lnk.exists():
+            args = shelllink.read(str(lnk)).arguments
+        elif bat.exists():
+            args = bat.read_text(encoding="utf-8")
+    except Exception:
+        return None
+    m = re.search(r'\bautostart\s+"([^"]*)"', args)
+    return m.group(1) if m else None
+
+
+def enable_autostart(profile: Optional[str] = None) -> bool:
+    script = str(MAIN_SCRIPT.resolve())
+    args = f'"{script}"' + (f' autostart "{profile}"' if profile else "")
+    target = str(Path(sys.executable).with_name("pythonw.exe") if Path(sys.executable).name.lower()=="python.exe" else Path(sys.executable))
+    try:
+        STARTUP_DIR.mkdir(parents=True, exist_ok=True)
+        lnk_path = STARTUP_DIR / f"{APP_NAME}.lnk"
+        ps_args = args.replace("'", "''")
+        ps = rf"$ws = New-Object -ComObject WScript.Shell; $s = $ws.CreateShortcut('{lnk_path}'); $s.TargetPath = '{target}'; $s.Arguments = '{ps_args}'; $s.WorkingDirectory = '{MAIN_SCRIPT.resolve().parent}'; $s.IconLocation='{target},0'; $s.Save()"
+        subprocess.run(["powershell", "-NoProfile", "-Command", ps], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return True
+    except Exception:
+        try:
+            bat_path = STARTUP_DIR / f"{APP_NAME}.bat"
+            bat_path.write_text(f"start \"\" \"{target}\" {args}\n", encoding="utf-8")
+            return bat_path.exists()
+        except Exception:
+            return False
+
+
+def disable_autostart() -> bool:
+    ok = True
+    for p in [(STARTUP_DIR / f"{APP_NAME}.lnk"), (STARTUP_DIR / f"{APP_NAME}.bat")]:
+        try:
+            if p.exists():
+                p.unlink()
+        except Exception:
+            ok = False
+    return ok
+
+
+def _resolve_lnk_powershell(path: str) -> ShellLink:
+    ps = (rf"$s=(New-Object -ComObject WScript.Shell).CreateShortcut('{path}'); "
+          r"Write-Output $s.TargetPath; Write-Output $s.Arguments; Write-Output $s.WorkingDirectory")
+    out = subprocess.check_output(["powershell", "-NoProfile", "-Command", ps], text=True).splitlines()
+    out += [""] * (3 - len(out))
+    return ShellLink(target=out[0].strip(), arguments=out[1].strip(), working_dir=out[2].strip())
+
+
+def _resolve_shortcut(path: str) -> ShellLink:
+    p = Path(path)
+    if p.suffix.lower() != ".lnk":
+        return ShellLink(target=str(p))
+    link = LNK_CACHE.resolve(str(p), _resolve_lnk_powershell)
+    if link is None or not link.target:
+        return ShellLink(target=str(p))
+    return link
+
+
+def _resolve_lnk(path: str) -> str:
+    return _resolve_shortcut(path).target
+
+
+class ResolvedItem:
+    def __init__(self, link: ShellLink, exists: bool):
+        self.link = link
+        self.exists = exists
+
+
+# path -> ResolvedItem или None; так запуск берёт готовый результат из фонового индекса (pathindex.py)
+Lookup = Callable[[str], Optional[ResolvedItem]]
+
+
+def resolve_item(path: str) -> ResolvedItem:
+    with metrics.stage(RESOLVE, path):
+        link = _resolve_shortcut(path)
+    with metrics.stage(EXISTS, path):
+        return ResolvedItem(link, bool(link.target) and Path(link.target).exists())
+
+
+def lookup_item(path: str, lookup: Optional[Lookup] = None) -> ResolvedItem:
+    """Разрешённый элемент: из индекса, если он там есть и файл на месте, иначе — заново с диска."""
+    item = lookup(path) if lookup is not None else None
+    if item is not None and item.exists:
+        return item
+    # «нет файла» из индекса перепроверяем: папки могло не быть при индексации (флешка, сетевой диск, установка позже)
+    return resolve_item(path)
+
+
+def _command(exe: Path, arguments: str):
+    if not arguments:
+        return [str(exe)]
+    if sys.platform == "win32":
+        return subprocess.list2cmdline([str(exe)]) + " " + arguments
+    return [str(exe), *shlex.split(arguments)]
+
+
+def open_urls_with_browser(urls: List[str], browser_path: Optional[str], lookup: Optional[Lookup] = None) -> str:
+    browser = None
+    if browser_path:
+        item = lookup_item(browser_path, lookup)
+        browser = item.link.target if item.exists else None
+    with metrics.stage(URLS, browser or "webbrowser"):
+        return STARTED if urldispatch.open_urls(urls, browser) else SKIPPED
+
+
+def _start_item(path: str, lookup: Optional[Lookup] = None, run: Optional[ProfileRun] = None):
+    """STARTED/SKIPPED или (SKIPPED, причина): нет файла или программа уже работает."""
+    if not path:
+        return SKIPPED
+    item = lookup_item(path, lookup)
+    if not item.exists:
+        return SKIPPED, "нет файла"
+    link = item.link
+    p = Path(link.target)
+    if run is not None and p.suffix.lower() == ".exe":
+        reason = run.check(str(p), path, link.arguments)
+        if reason:
+            return SKIPPED, reason
+    with metrics.stage(SPAWN, path):
+        if p.suffix.lower() == ".exe":
+            cwd = link.working_dir if link.working_dir and Path(link.working_dir).is_dir() else None
+            proc = subprocess.Popen(_command(p, link.arguments), cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+            if run is not None:
+                run.spawned(path, proc.pid, str(p))
+        elif hasattr(os, "startfile"):
+            os.startfile(str(p))  # type: ignore[attr-defined]
+        else:
+            opener = "open" if sys.platform == "darwin" else "xdg-open"
+            subprocess.Popen([opener, str(p)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+    return STARTED
+
+
+def launch_item(path: str) -> str:
+    return run_task(0, "app", path, lambda: _start_item(path)).status
+
+
+class LaunchItemResult:
+    def __init__(self, index: int, kind: str, target: str, status: str, duration: float, error: str = "",
+                 stages: Optional[Dict[str, float]] = None):
+        self.index = index
+        self.kind = kind  # "urls" | "app"
+        self.target = target
+        self.status = status
+        self.duration = duration
+        self.error = error
+        self.stages = stages or {}  # этап (metrics.RESOLVE, SPAWN, …) -> секунды
+
+
+class LaunchResult:
+    def __init__(self, name: str, total: int):
+        self.name = name
+        self.total = total
+        self.items: List[LaunchItemResult] = []
+        self.cancelled = False
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, item: LaunchItemResult) -> int:
+        with self._lock:
+            self.items.append(item)
+            return len(self.items)
+
+    def _with(self, status: str) -> List[LaunchItemResult]:
+        return [i for i in self.items if i.status == status]
+
+    @property
+    def started(self) -> List[LaunchItemResult]:
+        return self._with(STARTED)
+
+    @property
+    def failed(self) -> List[LaunchItemResult]:
+        return self._with(FAILED)
+
+    @property
+    def skipped(self) -> List[LaunchItemResult]:
+        return self._with(SKIPPED)
+
+
+def profile_run(name: str, prof: Dict, tracker: Optional[ProcessTracker]) -> ProfileRun:
+    """Поведение для уже запущенных программ — ключ профиля "if_running": "skip" (по умолчанию), "focus" или "start"."""
+    return ProfileRun(tracker, name, prof.get("if_running") or IF_RUNNING_SKIP)
+
+
+def profile_tasks(prof: Dict, lookup: Optional[Lookup] = None, run: Optional[ProfileRun] = None) -> List[tuple]:
+    """(вид, цель, функция запуска) для каждого элемента: пачка URL и по одной задаче на программу.
+
+    Сайты, у которых есть свои зависимости (ключ "depends"), открываются отдельными задачами — целью будет сам адрес.
+    """
+    urls: List[str] = prof.get("urls", [])
+    browser_path: Optional[str] = prof.get("browser_path")
+    own = [u for u in urls if u in (prof.get("depends") or {})]
+    batch = [u for u in urls if u not in own] if own else urls
+    tasks = []
+    if batch:
+        tasks.append(("urls", browser_path or "webbrowser", lambda: open_urls_with_browser(batch, browser_path, lookup)))
+    for u in own:
+        tasks.append(("urls", u, lambda u=u: open_urls_with_browser([u], browser_path, lookup)))
+    for a in prof.get("apps", []):
+        tasks.append(("app", a, lambda a=a: _start_item(a, lookup, run)))
+    return tasks
+
+
+def run_task(index: int, kind: str, target: str, fn: Callable, cancel: Optional[threading.Event] = None) -> LaunchItemResult:
+    if cancel is not None and cancel.is_set():
+        return LaunchItemResult(index, kind, target, SKIPPED, 0.0, "cancelled")
+    s = time.perf_counter()
+    with metrics.collect() as stages:
+        try:
+            status, err = fn(), ""
+        except Exception as e:
+            status, err = FAILED, str(e) or e.__class__.__name__
+    if isinstance(status, tuple):
+        status, err = status
+    return LaunchItemResult(index, kind, target, status, time.perf_counter() - s, err, stages)
+
+
+class LaunchEngine:
+    """Запускает элементы профиля параллельно в ограниченном пуле потоков.
+
+    Если у профиля есть "depends" (depends.py), элементы идут графом: каждый стартует, как только его зависимости
+    запущены и прошли проверки готовности; независимые ветки — параллельно.
+    """
+
+    def __init__(self, max_workers: int = LAUNCH_WORKERS, lookup: Optional[Lookup] = None,
+                 metrics: Optional[LaunchMetrics] = None, tracker: Optional[ProcessTracker] = None,
+                 poll: float = depends.POLL):
+        self.max_workers = max(1, max_workers)
+        self.lookup = lookup
+        self.metrics = metrics
+        self.tracker = tracker
+        self.poll = poll
+
+    def tasks(self, name: str, prof: Dict) -> List[tuple]:
+        return profile_tasks(prof, self.lookup, profile_run(name, prof, self.tracker))
+
+    def run(self, name: str, state: Dict, progress: Optional[Callable] = None,
+            cancel: Optional[threading.Event] = None) -> LaunchResult:
+        prof = state.get("profiles", {}).get(name, {})
+        tasks = self.tasks(name, prof)
+        nodes = depends.depends_config(prof)
+        result = LaunchResult(name, len(tasks))
+        t0 = time.perf_counter()
+
+        def report(item: LaunchItemResult):
+            done = result.add(item)
+            if progress:
+                progress(item, done, result.total)
+
+        def job(index: int, kind: str, target: str, fn: Callable):
+            report(run_task(index, kind, target, fn, cancel))
+
+        if tasks:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks)), thread_name_prefix="launch") as ex:
+                if nodes:
+                    run_graph(ex, tasks, nodes, report, cancel, self.poll)
+                else:
+                    for i, t in enumerate(tasks):
+                        ex.submit(job, i, *t)
+        result.items.sort(key=lambda i: i.index)
+        result.cancelled = cancel is not None and cancel.is_set()
+        result.duration = time.perf_counter() - t0
+        if self.metrics is not None and tasks:
+            self.metrics.record(result)
+        return result
+
+
+def run_graph(ex: ThreadPoolExecutor, tasks: List[tuple], nodes: Dict[str, depends.Node],
+              report: Callable[[LaunchItemResult], None], cancel: Optional[threading.Event] = None,
+              poll: float = depends.POLL, order: Optional[List[int]] = None,
+              admit: Optional[Callable[[int, int], bool]] = None,
+              clock: Callable[[], float] = time.perf_counter, sleep: Callable[[float], None] = time.sleep):
+    """Запуск задач в порядке зависимостей: каждая стартует, как только её зависимости запущены и готовы.
+
+    Проверки готовности идут в своём пуле (по одной на ждущий элемент), чтобы медленный tcp не задерживал
+    остальные задачи; список процессов для проверок "process" снимается один раз на опрос. order — порядок,
+    в котором предлагаются готовые к старту задачи; admit(номер, сколько запущено) -> False откладывает старт
+    до следующего опроса (так автозапуск соблюдает свои задержки, паузы и пороги нагрузки).
+    """
+    keys = [depends.task_key(kind, target, nodes) for kind, target, _ in tasks]
+    index = {k: i for i, k in enumerate(keys)}
+    waiting = list(range(len(tasks)) if order is None else order)
+    ready, failed = set(), {}
+    running: Dict = {}  # future запуска -> номер задачи
+    probing: Dict[int, list] = {}  # номер задачи -> [результат запуска, когда запущен, future проверки, следующая не раньше]
+
+    def started(item: LaunchItemResult) -> bool:
+        # пропуск засчитывается зависимым, только если программа уже работает; нет файла или отмена — нет
+        return item.status == STARTED or (item.status == SKIPPED and item.error.startswith(RUNNING))
+
+    def finish(i: int, item: LaunchItemResult):
+        if started(item):
+            ready.add(keys[i])
+        else:
+            failed[keys[i]] = item.error or ("не запущено" if item.status == SKIPPED else item.status)
+        report(item)
+
+    workers = max(1, sum(1 for n in nodes.values() if n.probes))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ready") as checks:
+        while waiting or running or probing:
+            if cancel is not None and cancel.is_set():
+                for i in waiting:
+                    report(LaunchItemResult(i, *tasks[i][:2], SKIPPED, 0.0, "cancelled"))
+                for item, *_ in probing.values():
+                    report(item)  # программа уже запущена — просто больше не ждём её готовности
+                waiting, probing = [], {}
+            deferred = False
+            for i in list(waiting):
+                node = nodes.get(keys[i])
+                reason = depends.blocked_reason(node, index, failed)
+                if reason:
+                    waiting.remove(i)
+                    status = FAILED if node is not None and node.error else SKIPPED
+                    finish(i, LaunchItemResult(i, *tasks[i][:2], status, 0.0, reason))
+                elif node is None or all(d in ready for d in node.after):
+                    if admit is not None and not admit(i, len(running)):
+                        deferred = True
+                        continue
+                    waiting.remove(i)
+                    running[ex.submit(run_task, i, *tasks[i], cancel)] = i
+            if not running and not probing and not deferred:
+                for i in waiting:
+                    finish(i, LaunchItemResult(i, *tasks[i][:2], SKIPPED, 0.0, "цикл зависимостей"))
+                break
+            now = clock()
+            snapshot = depends.Snapshot()
+            for i, p in probing.items():
+                if p[2] is None and now >= p[3]:
+                    p[2], p[3] = checks.submit(nodes[keys[i]].pending, snapshot), now + poll
+            pending_checks = {p[2] for p in probing.values() if p[2] is not None}
+            if running or pending_checks:
+                timeout = poll if probing or deferred else None
+                done, _ = wait({*running, *pending_checks}, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                done = set()
+                sleep(poll)
+            for f in done:
+                i = running.pop(f, None)
+                if i is None:
+                    continue  # это проверка готовности — разберём ниже
+                item = f.result()
+                node = nodes.get(keys[i])
+                if node is not None and node.probes and started(item):
+                    probing[i] = [item, clock(), None, 0.0]  # «уже запущено» тоже ждём: он может ещё подниматься
+                else:
+                    finish(i, item)
+            for i, (item, since, check, _) in list(probing.items()):
+                if check is None or not check.done():
+                    continue
+                node = nodes[keys[i]]
+                try:
+                    pending = check.result()
+                except Exception:
+                    pending = node.probes
+                waited = clock() - since
+                if pending and waited < node.timeout:
+                    probing[i][2] = None
+                    continue
+                del probing[i]
+                item.stages[READY] = waited
+                item.duration += waited
+                if pending:
+                    item.status = FAILED
+                    item.error = f"не готово за {node.timeout:g} с: " + ", ".join(map(str, pending))
+                finish(i, item)
+
+
+def launch_profile(name: str, state: Dict) -> LaunchResult:
+    return LaunchEngine(metrics=LAUNCH_METRICS, tracker=PROCESSES).run(name, state)
+
+
+def validate_profile(prof: Dict) -> List[str]:
+    problems = []
+    for a in prof.get("apps", []):
+        if not a:
+            continue
+        item = resolve_item(a)
+        if not item.exists:
+            target = item.link.target
+            problems.append(f"нет файла: {a}" + (f" -> {target}" if target != a else ""))
+    bp = prof.get("browser_path")
+    if bp and not resolve_item(bp).exists:
+        problems.append(f"нет браузера: {bp}")
+    return problems + depends.problems(prof)
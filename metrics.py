@@ -0,0 +1,183 @@
+"""Замеры запуска: сколько занимает каждый этап (ярлык, проверка файла, старт процесса, открытие сайтов, готовность).
+
+Этапы отмечаются контекстом ``stage``: время попадает в ``hooks`` и в текущий ``collect`` потока.
+``LaunchMetrics`` хранит на диске последние ``WINDOW`` замеров на профиль, элемент и этап —
+из них строятся гистограммы и перцентили для отчёта и выгрузки в JSON/CSV.
+"""
+from __future__ import annotations
+import csv
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+from store import write_json_atomic
+
+RESOLVE, EXISTS, SPAWN, URLS = "resolve", "exists", "spawn", "urls"
+READY = "ready"  # ожидание проверок готовности (depends.py) после запуска
+TOTAL = "total"
+STAGES = (TOTAL, RESOLVE, EXISTS, SPAWN, URLS, READY)
+WINDOW = 100
+HISTORY = 500  # запусков на профиль: (время, длительность) — для прогноза следующего запуска (prefetch.py)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+FIELDS = ("profile", "target", "kind", "stage", "count", "failed", "skipped", "mean_ms", "p50_ms", "p95_ms",
+          "max_ms", "last_error", *(f"le_{b}ms" for b in BUCKETS_MS), "gt_5000ms")
+
+# (этап, цель, секунды, ошибка) — вызывается из потока запуска
+Hook = Callable[[str, str, float, str], None]
+hooks: List[Hook] = []
+_local = threading.local()
+
+
+@contextmanager
+def stage(name: str, target: str = "") -> Iterator[None]:
+    err = ""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        err = str(e) or e.__class__.__name__
+        raise
+    finally:
+        dt = time.perf_counter() - t0
+        stages = getattr(_local, "stages", None)
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + dt
+        for cb in list(hooks):
+            try:
+                cb(name, target, dt, err)
+            except Exception:
+                pass
+
+
+@contextmanager
+def collect() -> Iterator[Dict[str, float]]:
+    """Собрать этапы, пройденные в этом потоке, в словарь этап -> секунды."""
+    prev = getattr(_local, "stages", None)
+    _local.stages = stages = {}
+    try:
+        yield stages
+    finally:
+        _local.stages = prev
+
+
+def histogram(samples: List[float]) -> List[int]:
+    """Число замеров (мс) в корзинах ≤1, ≤2, …, ≤5000 и >5000."""
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for s in samples:
+        counts[next((i for i, b in enumerate(BUCKETS_MS) if s <= b), len(BUCKETS_MS))] += 1
+    return counts
+
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+def summarize(samples: List[float]) -> Dict:
+    return {"count": len(samples), "mean_ms": round(sum(samples) / len(samples), 2) if samples else 0.0,
+            "p50_ms": percentile(samples, 0.5), "p95_ms": percentile(samples, 0.95),
+            "max_ms": max(samples, default=0.0), "histogram": histogram(samples)}
+
+
+class LaunchMetrics:
+    """Скользящие окна замеров в JSON: профиль -> {"runs": [...], "history": [[время, мс], ...],
+    "items": {цель: {этап: [мс, ...]}}}.
+
+    Файл перечитывается при каждой записи, поэтому окно и командная строка не затирают замеры друг друга.
+    """
+
+    def __init__(self, path: Path, window: int = WINDOW):
+        self.path = path
+        self.window = window
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _push(self, samples: List[float], seconds: float):
+        samples.append(round(seconds * 1000, 2))
+        del samples[:-self.window]
+
+    def record(self, result) -> None:
+        """Добавить замеры одного запуска (LaunchResult); отменённые элементы не учитываются."""
+        with self._lock:
+            data = self.load()
+            prof = data.setdefault(result.name, {"runs": [], "items": {}})
+            if not result.cancelled:
+                self._push(prof["runs"], result.duration)
+            prof["last_run"] = time.time()
+            history = prof.setdefault("history", [])
+            history.append([round(prof["last_run"], 1), round(result.duration * 1000, 2)])
+            del history[:-HISTORY]
+            for item in result.items:
+                if item.error == "cancelled":
+                    continue
+                e = prof["items"].setdefault(item.target, {"kind": item.kind, "failed": 0, "skipped": 0,
+                                                           "last_error": "", "stages": {}})
+                if item.status in ("failed", "skipped"):
+                    e[item.status] += 1
+                if item.error:
+                    e["last_error"] = item.error
+                self._push(e["stages"].setdefault(TOTAL, []), item.duration)
+                for name, seconds in item.stages.items():
+                    self._push(e["stages"].setdefault(name, []), seconds)
+            try:
+                write_json_atomic(self.path, data)
+            except OSError:
+                pass
+
+    def forget(self, name: str):
+        with self._lock:
+            data = self.load()
+            if data.pop(name, None) is not None:
+                write_json_atomic(self.path, data)
+
+    def history(self) -> Dict[str, List[List[float]]]:
+        """Профиль -> [[unix-время запуска, длительность в мс], ...] в порядке запусков."""
+        return {name: prof.get("history", []) for name, prof in self.load().items()}
+
+    def profiles(self) -> List[str]:
+        return sorted(self.load(), key=str.casefold)
+
+    def rows(self, profile: Optional[str] = None) -> List[Dict]:
+        """Плоская таблица: строка на профиль (kind="profile") и на каждый этап каждого элемента."""
+        rows = []
+        for name, prof in sorted(self.load().items(), key=lambda kv: kv[0].casefold()):
+            if profile is not None and name != profile:
+                continue
+            base = {"profile": name, "failed": 0, "skipped": 0, "last_error": ""}
+            rows.append({**base, "target": "", "kind": "profile", "stage": TOTAL, **summarize(prof.get("runs", []))})
+            for target, e in prof.get("items", {}).items():
+                item = {**base, "target": target, "kind": e.get("kind", ""), "failed": e.get("failed", 0),
+                        "skipped": e.get("skipped", 0), "last_error": e.get("last_error", "")}
+                for st in sorted(e.get("stages", {}), key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+                    rows.append({**item, "stage": st, **summarize(e["stages"][st])})
+        return rows
+
+    def export_json(self, f: TextIO, profile: Optional[str] = None):
+        rows = self.rows(profile)
+        for r in rows:
+            r["histogram"] = dict(zip(FIELDS[-len(r["histogram"]):], r["histogram"]))
+        json.dump({"buckets_ms": BUCKETS_MS, "window": self.window, "rows": rows}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+    def export_csv(self, f: TextIO, profile: Optional[str] = None):
+        """f открыт с newline=""."""
+        w = csv.writer(f)
+        w.writerow(FIELDS)
+        for r in self.rows(profile):
+            w.writerow([r[k] for k in FIELDS[:-len(r["histogram"])]] + r["histogram"])
+
+    def export(self, path: Path, profile: Optional[str] = None):
+        """Выгрузка в файл; формат по расширению (.csv, иначе JSON)."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            (self.export_csv if path.suffix.lower() == ".csv" else self.export_json)(f, profile)
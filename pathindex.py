@@ -0,0 +1,150 @@
+"""Фоновый индекс путей профилей: ярлыки разрешены и файлы проверены заранее, а не в момент запуска."""
+from __future__ import annotations
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from launcher import ResolvedItem, resolve_item
+
+INDEX_WORKERS = 4
+
+
+def profile_paths(prof: Dict) -> List[str]:
+    paths = [a for a in prof.get("apps", []) if a]
+    if prof.get("browser_path"):
+        paths.append(prof["browser_path"])
+    return paths
+
+
+def _parent(path: str) -> str:
+    return os.path.dirname(os.path.normcase(os.path.abspath(path)))
+
+
+def watch_dir(path: str) -> Optional[str]:
+    """Каталог, изменение которого может «вернуть» path: его папка, а если её нет — ближайший существующий предок."""
+    d = _parent(path)
+    while not os.path.isdir(d):
+        up = os.path.dirname(d)
+        if up == d:
+            return None  # диска или сетевой папки нет вовсе
+        d = up
+    return d
+
+
+class PathIndex:
+    """path -> ResolvedItem для всех программ и браузеров всех профилей.
+
+    Разрешение идёт в пуле потоков; после каждой пачки вызываются ``listeners`` с именами
+    профилей, чьё состояние могло измениться (вызов приходит из рабочего потока).
+    Устаревшие записи обновляет ``invalidate_dir`` — его дёргает наблюдатель за файловой системой.
+    Для каждого пути запоминаются каталоги для наблюдения (см. watch_dir); они уходят вместе с последним
+    профилем, где путь встречался, и меняются, когда недостающая папка появляется.
+    """
+
+    def __init__(self, resolve: Callable[[str], ResolvedItem] = resolve_item, workers: int = INDEX_WORKERS):
+        self.resolve = resolve
+        self.listeners: List[Callable[[Set[str]], None]] = []
+        self._lock = threading.Lock()
+        self._entries: Dict[str, ResolvedItem] = {}
+        self._profiles: Dict[str, List[str]] = {}
+        self._owners: Dict[str, Set[str]] = {}
+        self._dirs: Dict[str, Set[str]] = {}  # path -> каталоги, за которыми следить ради него
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="index")
+
+    def get(self, path: str) -> Optional[ResolvedItem]:
+        return self._entries.get(path)
+
+    def set_profile(self, name: str, prof: Dict):
+        paths = profile_paths(prof)
+        with self._lock:
+            self._drop(name)
+            self._profiles[name] = paths
+            for p in paths:
+                self._owners.setdefault(p, set()).add(name)
+            fresh = [p for p in paths if p not in self._entries]
+        if fresh:
+            self.refresh(fresh)
+        else:
+            self._notify({name})
+
+    def remove_profile(self, name: str):
+        with self._lock:
+            self._drop(name)
+        self._notify(set())  # наблюдателю — убрать каталоги, которые больше никому не нужны
+
+    def _drop(self, name: str):
+        for p in self._profiles.pop(name, []):
+            owners = self._owners.get(p)
+            if owners is not None:
+                owners.discard(name)
+                if not owners:
+                    del self._owners[p]
+                    self._entries.pop(p, None)
+                    self._dirs.pop(p, None)
+
+    def load(self, profiles: Callable[[], Iterable[tuple]]):
+        """Заполнить индекс в фоне; profiles() отдаёт пары (имя, профиль)."""
+        def job():
+            for name, prof in profiles():
+                self.set_profile(name, prof)
+        self._pool.submit(job)
+
+    def refresh(self, paths: Iterable[str]):
+        paths = list(dict.fromkeys(paths))
+        if paths:
+            self._pool.submit(self._resolve_batch, paths)
+
+    def _resolve_batch(self, paths: List[str]):
+        changed: Set[str] = set()
+        moved = False
+        for p in paths:
+            try:
+                item = self.resolve(p)
+            except Exception:
+                continue
+            dirs = {d for d in map(watch_dir, {p, item.link.target} - {""}) if d}
+            with self._lock:
+                if p not in self._owners:
+                    continue  # профиль успели удалить
+                moved |= self._dirs.get(p) != dirs
+                self._dirs[p] = dirs
+                old = self._entries.get(p)
+                self._entries[p] = item
+                if old is None or old.exists != item.exists or old.link.target != item.link.target:
+                    changed |= self._owners[p]
+        if changed or moved:
+            self._notify(changed)
+
+    def _notify(self, names: Set[str]):
+        for cb in list(self.listeners):
+            try:
+                cb(names)
+            except Exception:
+                pass
+
+    def invalidate_dir(self, directory: str):
+        d = os.path.normcase(os.path.abspath(directory))
+        with self._lock:
+            stale = [p for p, dirs in self._dirs.items() if d in dirs]
+        self.refresh(stale)
+
+    def missing(self, name: str) -> List[str]:
+        with self._lock:
+            return [p for p in self._profiles.get(name, []) if p in self._entries and not self._entries[p].exists]
+
+    def missing_count(self, name: str) -> int:
+        """-1 — профиль ещё не проверен."""
+        with self._lock:
+            paths = self._profiles.get(name)
+            if paths is None or any(p not in self._entries for p in paths):
+                return -1
+            return sum(1 for p in paths if not self._entries[p].exists)
+
+    def dirs(self) -> Set[str]:
+        """Каталоги, за которыми стоит следить: где лежат элементы и цели ярлыков (или их ближайшие предки)."""
+        with self._lock:
+            return set().union(*self._dirs.values())
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
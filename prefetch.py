@@ -0,0 +1,311 @@
+"""Прогрев кэша ОС: по истории запусков угадываем, какой профиль запустят следующим, и заранее читаем его файлы.
+
+Прогноз — сумма прошлых запусков профиля, взвешенных по близости времени суток (с поправкой на будни/выходные)
+и по давности. Файлы прогреваются ``posix_fadvise(WILLNEED)`` (ядро читает их само, в фоне), где его нет —
+чтением по кускам. Работаем только когда система простаивает и не больше бюджета памяти.
+
+Попадания считаются по истории: прогрев засчитан, если профиль запустили в течение ``HORIZON`` секунд после него.
+На Linux доля файла в кэше измеряется через mincore(2) — до прогрева и (в bench.py prefetch) после; где измерить
+нечем (Windows), файл, прогретый меньше ``HORIZON`` секунд назад, повторно не читается.
+"""
+from __future__ import annotations
+import json
+import math
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from launcher import LAUNCH_METRICS, Lookup, lookup_item
+from scheduler import system_pressure
+from store import write_json_atomic
+
+HORIZON = 3600.0
+INTERVAL = 300.0
+BUDGET = 512 * 2**20
+TOP = 2
+MIN_SCORE = 0.2
+SIGMA_H = 0.5
+HALF_LIFE_DAYS = 14.0
+MAX_LOAD, MAX_IO = 0.5, 0.1
+HOT = 0.9  # файл считается уже прогретым, если в кэше не меньше этой доли страниц
+EVENTS = 500
+CHUNK = 1024 * 1024
+ADVISE = 128 * 1024  # ядро урезает один WILLNEED до read_ahead_kb устройства (обычно 128 КБ) — советуем окнами
+
+
+def _decay(age: float) -> float:
+    return 0.5 ** (age / 86400 / HALF_LIFE_DAYS)
+
+
+def predict(history: Dict[str, List[List[float]]], now: float, top: int = TOP,
+            min_score: float = MIN_SCORE) -> List[Tuple[str, float]]:
+    """[(профиль, оценка)] по убыванию; оценка ≈ вероятность, что профиль запустят в ближайшие HORIZON секунд.
+
+    Каждый прошлый запуск — «размытое» время суток (нормальное, SIGMA_H часов); берём его долю,
+    попадающую в окно [сейчас, сейчас + HORIZON], с весом по давности и по совпадению будни/выходные.
+    """
+    lt = time.localtime(now)
+    start = lt.tm_hour + lt.tm_min / 60
+    window = HORIZON / 3600
+    weekend = lt.tm_wday >= 5
+    first = min((run[0] for runs in history.values() for run in runs), default=now)
+    # сколько «дней» в истории с теми же весами — чтобы оценка не росла вместе с её длиной
+    norm = sum(_decay(k * 86400) * (1.0 if (time.localtime(now - k * 86400).tm_wday >= 5) == weekend else 0.5)
+               for k in range(int((now - first) // 86400) + 1))
+    scale = SIGMA_H * math.sqrt(2)
+    scores = []
+    for name, runs in history.items():
+        score = 0.0
+        for run in runs:
+            t = run[0]
+            if t > now:
+                continue
+            r = time.localtime(t)
+            x = (r.tm_hour + r.tm_min / 60 - start + 12) % 24 - 12  # время запуска относительно «сейчас», -12..12 ч
+            w = 0.5 * (math.erf((window - x) / scale) - math.erf(-x / scale)) * _decay(now - t)
+            if (r.tm_wday >= 5) != weekend:
+                w *= 0.5
+            score += w
+        score /= norm
+        if score >= min_score:
+            scores.append((name, round(score, 3)))
+    scores.sort(key=lambda s: -s[1])
+    return scores[:top]
+
+
+def profile_files(prof: Dict, lookup: Optional[Lookup] = None) -> List[str]:
+    """Существующие файлы профиля: цели ярлыков, документы, браузер."""
+    files = []
+    for path in [*prof.get("apps", []), prof.get("browser_path") or ""]:
+        if not path:
+            continue
+        try:
+            item = lookup_item(path, lookup)
+        except Exception:
+            continue
+        if item.exists and os.path.isfile(item.link.target):
+            files.append(item.link.target)
+    return list(dict.fromkeys(files))
+
+
+def mem_available() -> Optional[int]:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+if sys.platform.startswith("linux"):
+    import ctypes
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _libc.mmap.restype = ctypes.c_void_p
+    _libc.mmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long)
+    _libc.munmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+    _libc.mincore.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_char_p)
+    _PAGE = os.sysconf("SC_PAGE_SIZE")
+    _MAP_FAILED = ctypes.c_void_p(-1).value
+
+    def resident_fraction(path: str) -> Optional[float]:
+        """Доля страниц файла, уже лежащих в кэше (mincore)."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            size = os.fstat(fd).st_size
+            if size == 0:
+                return 1.0
+            addr = _libc.mmap(None, size, 1, 1, fd, 0)  # PROT_READ, MAP_SHARED
+            if addr in (None, _MAP_FAILED):
+                return None
+            try:
+                pages = (size + _PAGE - 1) // _PAGE
+                vec = ctypes.create_string_buffer(pages)
+                if _libc.mincore(addr, size, vec) != 0:
+                    return None
+                return sum(b & 1 for b in vec.raw) / pages
+            finally:
+                _libc.munmap(addr, size)
+        finally:
+            os.close(fd)
+else:
+    def resident_fraction(path: str) -> Optional[float]:
+        return None  # mincore есть только на Linux/BSD; там, где нечем измерить, — неизвестно
+
+
+def warm(path: str) -> int:
+    """Попросить ОС подгрузить файл в кэш; возвращает размер файла."""
+    with open(path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if hasattr(os, "posix_fadvise"):
+            for off in range(0, size, ADVISE):
+                os.posix_fadvise(f.fileno(), off, ADVISE, os.POSIX_FADV_WILLNEED)
+        else:
+            while f.read(CHUNK):
+                pass
+        return size
+
+
+def drop(path: str) -> bool:
+    """Выгрузить чистые страницы файла из кэша (для замеров холодного старта); False — не умеем."""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    with open(path, "rb", buffering=0) as f:
+        os.fsync(f.fileno())  # грязные страницы DONTNEED не выгружает
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return True
+
+
+class Prefetcher:
+    """Раз в ``interval`` секунд (в фоне) прогревает файлы профилей, которые вероятно скоро запустят.
+
+    history() -> {профиль: [[время, мс], ...]}, files(профиль) -> [путь, ...]; события прогрева лежат в ``path``.
+    """
+
+    def __init__(self, path: Path, history: Callable[[], Dict[str, List[List[float]]]],
+                 files: Callable[[str], List[str]], budget: int = BUDGET,
+                 probe: Callable[[], Tuple[float, float]] = system_pressure, clock: Callable[[], float] = time.time,
+                 max_load: float = MAX_LOAD, max_io: float = MAX_IO, top: int = TOP, min_score: float = MIN_SCORE):
+        self.path = path
+        self.history = history
+        self.files = files
+        self.budget = budget
+        self.probe = probe
+        self.clock = clock
+        self.max_load = max_load
+        self.max_io = max_io
+        self.top = top
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._warmed: Dict[str, float] = {}  # путь -> когда грели; нужен там, где resident_fraction не работает
+
+    def _load(self) -> List[Dict]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return data if isinstance(data, list) else []
+        except Exception:
+            return []
+
+    def _save(self, events: List[Dict]):
+        try:
+            write_json_atomic(self.path, events[-EVENTS:])
+        except OSError:
+            pass
+
+    def idle(self) -> bool:
+        load, io = self.probe()
+        return load <= self.max_load and io <= self.max_io
+
+    def plan(self, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Кого греть сейчас: прогноз без тех, кого уже грели за последние HORIZON секунд и ещё не запускали."""
+        now = self.clock() if now is None else now
+        history = self.history()
+        recent = {e["profile"] for e in self._load() if now - e["t"] < HORIZON
+                  and not any(run[0] >= e["t"] for run in history.get(e["profile"], []))}
+        return [(n, s) for n, s in predict(history, now, self.top, self.min_score) if n not in recent]
+
+    def run_once(self, force: bool = False, dry_run: bool = False) -> List[Dict]:
+        """Один проход; force — не ждать простоя. Возвращает записанные события."""
+        if not force and not self.idle():
+            return []
+        now = self.clock()
+        budget = self.budget
+        avail = mem_available()
+        if avail is not None:
+            budget = min(budget, avail // 4)  # чужой рабочий набор из памяти не вытесняем
+        events = []
+        for name, score in self.plan(now):
+            ev = {"t": now, "profile": name, "score": score, "files": 0, "bytes": 0, "hot": 0, "recent": 0,
+                  "skipped": 0, "resident_before": None}
+            fractions = []
+            for path in self.files(name):
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                frac = resident_fraction(path)
+                if frac is not None:
+                    fractions.append(frac)
+                if frac is not None and frac >= HOT:
+                    ev["hot"] += 1
+                    continue
+                if frac is None and now - self._warmed.get(path, -HORIZON) < HORIZON:
+                    ev["recent"] += 1
+                    continue
+                if size > budget:
+                    ev["skipped"] += 1
+                    continue
+                if not dry_run:
+                    try:
+                        warm(path)
+                    except OSError:
+                        continue
+                    self._warmed[path] = now
+                budget -= size
+                ev["files"] += 1; ev["bytes"] += size
+            if fractions:
+                ev["resident_before"] = round(sum(fractions) / len(fractions), 3)
+            events.append(ev)
+        if events and not dry_run:
+            with self._lock:
+                self._save(self._load() + events)
+        return events
+
+    def _loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.run_once()
+            except Exception:
+                pass  # прогрев — только оптимизация, окно из-за него падать не должно
+
+    def start(self, interval: float = INTERVAL):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, args=(interval,), name="prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def stats(self) -> Dict:
+        """Точность прогноза, доля угаданных запусков и сколько прогрев подгрузил (по истории и событиям прогрева).
+
+        Время запуска (LaunchResult.duration) — лишь время до возврата CreateProcess/Popen, кэш ОС на него почти
+        не влияет, поэтому «выигрыш в мс» отсюда не оценить; чтение из холодного и прогретого кэша меряет
+        bench.py prefetch. resident_before — какая доля файлов уже была в кэше до прогрева (только Linux).
+        """
+        events = self._load()
+        history = self.history()
+        launches = sorted((run[0], name) for name, runs in history.items() for run in runs)
+        by_profile: Dict[str, List[float]] = {}
+        for e in events:
+            by_profile.setdefault(e["profile"], []).append(e["t"])
+        hits = total = 0
+        first = min((e["t"] for e in events), default=None)
+        for t, name in launches:
+            if first is None or t < first:
+                continue
+            total += 1
+            hits += any(0 <= t - p <= HORIZON for p in by_profile.get(name, []))
+        used = sum(1 for e in events if any(0 <= t - e["t"] <= HORIZON for t, n in launches if n == e["profile"]))
+        residency = [e["resident_before"] for e in events if e.get("resident_before") is not None]
+        return {"prefetches": len(events), "useful": used, "precision": round(used / len(events), 3) if events else None,
+                "launches": total, "prefetched_launches": hits, "hit_rate": round(hits / total, 3) if total else None,
+                "files_warmed": sum(e["files"] for e in events), "bytes_warmed": sum(e["bytes"] for e in events),
+                "resident_before": round(sum(residency) / len(residency), 3) if residency else None}
+
+
+def for_store(store, lookup: Optional[Lookup] = None, **kw) -> Prefetcher:
+    """Прогрев по истории LAUNCH_METRICS для профилей из хранилища; события — в prefetch.json рядом с программой."""
+    return Prefetcher(Path(__file__).with_name("prefetch.json"), LAUNCH_METRICS.history,
+                      lambda name: profile_files(store.get(name) or {}, lookup), **kw)
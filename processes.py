@@ -0,0 +1,370 @@
+"""Процессы, запущенные профилями: PID записываются на диск, уже запущенные программы не стартуют повторно,
+группу можно закрыть целиком, а память и CPU замеряются только у своих процессов.
+
+Linux — /proc, Windows — kernel32/psapi через ctypes, остальные системы — ps(1).
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from store import write_json_atomic
+
+IF_RUNNING_SKIP, IF_RUNNING_FOCUS, IF_RUNNING_START = "skip", "focus", "start"
+CLOSE_TIMEOUT = 5.0
+RUNNING = "уже запущено"  # начало причины пропуска: программа работает, зависимые от неё элементы можно запускать
+
+
+class ProcInfo:
+    def __init__(self, pid: int, exe: str, start: float, rss: int, cpu: float):
+        self.pid = pid
+        self.exe = exe
+        self.start = start  # время старта в единицах ОС — отличает процесс от другого с тем же PID
+        self.rss = rss  # байты
+        self.cpu = cpu  # секунды процессорного времени
+
+
+def exe_key(exe: str) -> str:
+    """Путь программы для сравнения: абсолютный, в регистре файловой системы."""
+    return os.path.normcase(os.path.abspath(exe)) if exe else ""
+
+
+# --- Linux ---------------------------------------------------------------------------------------
+
+if sys.platform.startswith("linux"):
+    _TICKS = os.sysconf("SC_CLK_TCK")
+    _PAGE = os.sysconf("SC_PAGE_SIZE")
+
+    def list_processes() -> Dict[int, str]:
+        out = {}
+        for d in os.listdir("/proc"):
+            if d.isdigit():
+                try:
+                    out[int(d)] = os.readlink(f"/proc/{d}/exe").removesuffix(" (deleted)")
+                except OSError:
+                    pass  # чужой процесс или уже завершился
+        return out
+
+    def process_info(pid: int) -> Optional[ProcInfo]:
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read().rsplit(b")", 1)[1].split()
+            if stat[0] in (b"Z", b"X"):
+                return None
+            with open(f"/proc/{pid}/statm", "rb") as f:
+                rss = int(f.read().split()[1]) * _PAGE
+            try:
+                exe = os.readlink(f"/proc/{pid}/exe").removesuffix(" (deleted)")
+            except OSError:
+                exe = ""
+        except (OSError, IndexError, ValueError):
+            return None
+        # поля после имени: state(3) … utime(14) stime(15) … starttime(22)
+        return ProcInfo(pid, exe, float(stat[19]), rss, (int(stat[11]) + int(stat[12])) / _TICKS)
+
+    def terminate(pid: int, force: bool = False) -> bool:
+        try:
+            os.kill(pid, signal.SIGKILL if force else signal.SIGTERM)
+            return True
+        except OSError:
+            return False
+
+    def focus(pid: int) -> bool:
+        if not shutil.which("xdotool"):
+            return False
+        return subprocess.run(["xdotool", "search", "--onlyvisible", "--pid", str(pid), "windowactivate"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+# --- Windows -------------------------------------------------------------------------------------
+
+elif sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _u32 = ctypes.WinDLL("user32", use_last_error=True)
+    QUERY_LIMITED = 0x1000
+    STILL_ACTIVE = 259
+    NO_WINDOW = 0x08000000
+
+    class _MemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (n, ctypes.c_size_t) for n in ("PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                                           "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                                           "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+    def _filetime(ft: wintypes.FILETIME) -> int:
+        return (ft.dwHighDateTime << 32) | ft.dwLowDateTime
+
+    def _image(h) -> str:
+        buf = ctypes.create_unicode_buffer(32768)
+        size = wintypes.DWORD(len(buf))
+        return buf.value if _k32.QueryFullProcessImageNameW(h, 0, buf, ctypes.byref(size)) else ""
+
+    def list_processes() -> Dict[int, str]:
+        pids = (wintypes.DWORD * 8192)()
+        needed = wintypes.DWORD()
+        if not _k32.K32EnumProcesses(pids, ctypes.sizeof(pids), ctypes.byref(needed)):
+            return {}
+        out = {}
+        for pid in pids[:needed.value // ctypes.sizeof(wintypes.DWORD)]:
+            h = _k32.OpenProcess(QUERY_LIMITED, False, pid)
+            if h:
+                try:
+                    exe = _image(h)
+                    if exe:
+                        out[int(pid)] = exe
+                finally:
+                    _k32.CloseHandle(h)
+        return out
+
+    def process_info(pid: int) -> Optional[ProcInfo]:
+        h = _k32.OpenProcess(QUERY_LIMITED, False, pid)
+        if not h:
+            return None
+        try:
+            code = wintypes.DWORD()
+            if not _k32.GetExitCodeProcess(h, ctypes.byref(code)) or code.value != STILL_ACTIVE:
+                return None
+            created, exited, kernel, user = (wintypes.FILETIME() for _ in range(4))
+            _k32.GetProcessTimes(h, ctypes.byref(created), ctypes.byref(exited), ctypes.byref(kernel), ctypes.byref(user))
+            mem = _MemoryCounters(); mem.cb = ctypes.sizeof(mem)
+            _k32.K32GetProcessMemoryInfo(h, ctypes.byref(mem), mem.cb)
+            return ProcInfo(pid, _image(h), float(_filetime(created)), mem.WorkingSetSize,
+                            (_filetime(kernel) + _filetime(user)) / 1e7)
+        finally:
+            _k32.CloseHandle(h)
+
+    def terminate(pid: int, force: bool = False) -> bool:
+        # без /F taskkill посылает окнам WM_CLOSE — программа успевает сохранить данные
+        cmd = ["taskkill", "/PID", str(pid), "/T"] + (["/F"] if force else [])
+        return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              creationflags=NO_WINDOW).returncode == 0
+
+    def focus(pid: int) -> bool:
+        found = []
+
+        @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+        def each(hwnd, _):
+            owner = wintypes.DWORD()
+            _u32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+            if owner.value == pid and _u32.IsWindowVisible(hwnd):
+                found.append(hwnd)
+                return False
+            return True
+        _u32.EnumWindows(each, 0)
+        if not found:
+            return False
+        if _u32.IsIconic(found[0]):
+            _u32.ShowWindow(found[0], 9)  # SW_RESTORE
+        return bool(_u32.SetForegroundWindow(found[0]))
+
+# --- macOS и прочие: ps(1) -----------------------------------------------------------------------
+
+else:
+    def _ps(*args: str) -> List[str]:
+        try:
+            return subprocess.run(["ps", *args], capture_output=True, text=True, timeout=5).stdout.splitlines()
+        except (OSError, subprocess.SubprocessError):
+            return []
+
+    def _cputime(s: str) -> float:
+        days, _, hms = s.rpartition("-")
+        secs = 0.0
+        for part in hms.split(":"):
+            secs = secs * 60 + float(part)
+        return secs + (int(days) * 86400 if days else 0)
+
+    def list_processes() -> Dict[int, str]:
+        out = {}
+        for line in _ps("-axo", "pid=,comm="):
+            pid, _, exe = line.strip().partition(" ")
+            if pid.isdigit():
+                out[int(pid)] = exe.strip()
+        return out
+
+    def process_info(pid: int) -> Optional[ProcInfo]:
+        lines = _ps("-o", "stat=,rss=,time=,lstart=,comm=", "-p", str(pid))
+        try:
+            state, rss, cpu, *lstart, exe = lines[0].split(None, 8)
+            if state.startswith("Z"):
+                return None
+            start = time.mktime(time.strptime(" ".join(lstart), "%a %b %d %H:%M:%S %Y"))
+            return ProcInfo(pid, exe, start, int(rss) * 1024, _cputime(cpu))
+        except (IndexError, ValueError):
+            return None
+
+    def terminate(pid: int, force: bool = False) -> bool:
+        try:
+            os.kill(pid, signal.SIGKILL if force else signal.SIGTERM)
+            return True
+        except OSError:
+            return False
+
+    def focus(pid: int) -> bool:
+        if sys.platform != "darwin":
+            return False
+        script = f'tell application "System Events" to set frontmost of (first process whose unix id is {pid}) to true'
+        return subprocess.run(["osascript", "-e", script], stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode == 0
+
+
+# --- учёт по профилям ----------------------------------------------------------------------------
+
+class ProcessTracker:
+    """Профиль -> процессы, которые он запустил: {"pid", "exe", "start", "path"} в processes.json.
+
+    Завершившиеся процессы (и чужие, занявшие тот же PID) выбрасываются при каждом чтении.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cpu: Dict[Tuple[int, float], Tuple[float, float]] = {}  # (pid, start) -> (cpu, когда)
+
+    def _load(self) -> Dict[str, List[Dict]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _save(self, data: Dict[str, List[Dict]]):
+        try:
+            write_json_atomic(self.path, data)
+        except OSError:
+            pass
+
+    def add(self, name: str, path: str, pid: int, exe: str):
+        info = process_info(pid)
+        if info is None:
+            return  # успел завершиться (часто так делают «запускалки» вроде Office)
+        with self._lock:
+            data = self._load()
+            data.setdefault(name, []).append({"pid": pid, "exe": exe, "start": info.start, "path": path})
+            self._save(data)
+
+    def _alive(self, entries: List[Dict]) -> List[Tuple[Dict, ProcInfo]]:
+        out = []
+        for e in entries:
+            info = process_info(int(e.get("pid", 0)))
+            if info is not None and info.start == e.get("start"):
+                out.append((e, info))
+        return out
+
+    def alive(self, name: str) -> List[Tuple[Dict, ProcInfo]]:
+        """Живые процессы профиля; заодно вычищает из файла завершившиеся."""
+        with self._lock:
+            data = self._load()
+            entries = data.get(name, [])
+            alive = self._alive(entries)
+            if len(alive) != len(entries):
+                if alive:
+                    data[name] = [e for e, _ in alive]
+                else:
+                    data.pop(name, None)
+                self._save(data)
+        return alive
+
+    def names(self) -> List[str]:
+        return list(self._load())
+
+    def close(self, name: str, timeout: float = CLOSE_TIMEOUT, poll: float = 0.1) -> Tuple[int, int]:
+        """Закрыть все процессы профиля: сначала вежливо, через timeout — принудительно. (закрыто, убито)."""
+        alive = self.alive(name)
+        for _, info in alive:
+            terminate(info.pid)
+        deadline = time.monotonic() + timeout
+        left = alive
+        while left and time.monotonic() < deadline:
+            time.sleep(poll)
+            left = [(e, i) for e, i in left if (p := process_info(i.pid)) is not None and p.start == i.start]
+        for _, info in left:
+            terminate(info.pid, force=True)
+        self.alive(name)
+        return len(alive) - len(left), len(left)
+
+    def _measure(self, alive: List[Tuple[Dict, ProcInfo]], now: float) -> Tuple[int, int, float]:
+        rss, cpu = 0, 0.0
+        for _, info in alive:
+            rss += info.rss
+            prev = self._cpu.get((info.pid, info.start))
+            if prev is not None and now > prev[1]:
+                cpu += (info.cpu - prev[0]) / (now - prev[1])
+            self._cpu[(info.pid, info.start)] = (info.cpu, now)
+        return len(alive), rss, round(cpu * 100 / (os.cpu_count() or 1), 1)
+
+    def usage(self, name: str) -> Optional[Tuple[int, int, float]]:
+        """(число процессов, RSS в байтах, CPU в % от всех ядер с прошлого замера) или None — ничего не запущено."""
+        alive = self.alive(name)
+        return self._measure(alive, time.monotonic()) if alive else None
+
+    def sample(self) -> Dict[str, Tuple[int, int, float]]:
+        """usage() всех профилей, у которых что-то запущено; читаются только свои PID."""
+        out, seen = {}, set()
+        now = time.monotonic()
+        for name in self.names():
+            alive = self.alive(name)
+            if alive:
+                out[name] = self._measure(alive, now)
+                seen |= {(i.pid, i.start) for _, i in alive}
+        for k in [k for k in self._cpu if k not in seen]:
+            del self._cpu[k]
+        return out
+
+
+class ProfileRun:
+    """Один запуск профиля: список работающих программ снимается один раз, новые PID уходят в трекер."""
+
+    def __init__(self, tracker: Optional[ProcessTracker], name: str, policy: str = IF_RUNNING_SKIP):
+        self.tracker = tracker
+        self.name = name
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._running: Optional[Dict[str, int]] = None
+        self._mine: Optional[Dict[str, int]] = None
+
+    def running(self, exe: str) -> Optional[int]:
+        with self._lock:
+            if self._running is None:
+                self._running = {}
+                for pid, path in list_processes().items():
+                    self._running.setdefault(exe_key(path), pid)
+            return self._running.get(exe_key(exe))
+
+    def tracked(self, path: str) -> Optional[int]:
+        """PID живого процесса, запущенного этим профилем для элемента path."""
+        if self.tracker is None:
+            return None
+        with self._lock:
+            if self._mine is None:
+                self._mine = {}
+                for e, info in self.tracker.alive(self.name):
+                    self._mine.setdefault(str(e.get("path")), info.pid)
+            return self._mine.get(path)
+
+    def check(self, exe: str, path: str = "", arguments: str = "") -> Optional[str]:
+        """Причина не запускать exe (оно уже работает) или None.
+
+        Ярлык с аргументами (``code.exe C:\\proj2``) пропускается, только если жив процесс, запущенный профилем
+        для этого же элемента: тот же exe с другими аргументами — чаще всего другой проект или документ.
+        """
+        if self.policy == IF_RUNNING_START:
+            return None
+        pid = self.tracked(path) if arguments else self.running(exe)
+        if pid is None:
+            return None
+        if self.policy == IF_RUNNING_FOCUS and focus(pid):
+            return f"{RUNNING} (pid {pid}), окно выведено на передний план"
+        return f"{RUNNING} (pid {pid})"
+
+    def spawned(self, path: str, pid: int, exe: str):
+        if self.tracker is not None:
+            self.tracker.add(self.name, path, pid, exe)
@@ -0,0 +1,252 @@
+"""Постепенный запуск профиля при входе в систему: приоритеты, задержки и оглядка на нагрузку.
+
+Настройки лежат в самом профиле, в ключе ``schedule``::
+
+    "schedule": {
+        "max_concurrent": 2, "stagger": 1.0, "max_load": 0.8, "max_io": 0.5, "max_wait": 60,
+        "items": {"C:\\\\Tools\\\\ide.exe": {"priority": 0, "delay": 5}, "urls": {"priority": 9}}
+    }
+
+Ключ в ``items`` — путь программы из ``apps`` или ``"urls"`` для пачки сайтов.
+
+Шкала ``max_load`` зависит от системы (см. system_pressure): в Windows это доля занятости процессора, 0..1,
+поэтому по умолчанию 0.8; в Linux и macOS — средняя загрузка на ядро, которая бывает и больше 1, по умолчанию 1.0.
+``max_io`` — доля времени, когда диск занят, 0..1 везде.
+"""
+from __future__ import annotations
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import depends
+from launcher import LaunchResult, SKIPPED, LaunchItemResult, profile_run, profile_tasks, run_graph, run_task
+from metrics import LaunchMetrics
+from processes import ProcessTracker
+
+DEFAULTS = {"max_concurrent": 2, "stagger": 1.0, "max_load": 0.8 if sys.platform == "win32" else 1.0, "max_io": 0.5,
+            "max_wait": 60.0}
+POLL = 0.5
+
+
+SAMPLE = 0.2  # Windows: первый замер — разница счётчиков за столько секунд, дальше — с прошлого вызова
+
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _kernel32 = ctypes.WinDLL("kernel32")
+    _pdh = ctypes.WinDLL("pdh")
+    _PDH_FMT_DOUBLE = 0x200
+
+    class _CounterValue(ctypes.Structure):
+        _fields_ = [("CStatus", wintypes.DWORD), ("doubleValue", ctypes.c_double)]
+
+    _win_lock = threading.Lock()
+    _win: Dict = {}
+
+    def _cpu_times() -> Tuple[int, int]:
+        idle, kernel, user = wintypes.FILETIME(), wintypes.FILETIME(), wintypes.FILETIME()
+        if not _kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user)):
+            raise OSError("GetSystemTimes")
+        ft = (lambda f: f.dwHighDateTime << 32 | f.dwLowDateTime)
+        return ft(idle), ft(kernel) + ft(user)  # kernel уже включает простой
+
+    def _disk_counter():
+        query, counter = wintypes.HANDLE(), wintypes.HANDLE()
+        if _pdh.PdhOpenQueryW(None, None, ctypes.byref(query)) != 0:
+            raise OSError("PdhOpenQuery")
+        if _pdh.PdhAddEnglishCounterW(query, r"\PhysicalDisk(_Total)\% Idle Time", None, ctypes.byref(counter)) != 0:
+            _pdh.PdhCloseQuery(query)
+            raise OSError("PdhAddEnglishCounter")
+        _pdh.PdhCollectQueryData(query)
+        return query, counter
+
+    def _windows_pressure() -> Tuple[float, float]:
+        """(доля занятости CPU, доля времени занятости дисков) с прошлого вызова: GetSystemTimes и PDH."""
+        with _win_lock:
+            first = "cpu" not in _win
+            if first:
+                _win["cpu"] = _cpu_times()
+                try:
+                    _win["disk"] = _disk_counter()
+                except OSError:
+                    _win["disk"] = None
+                time.sleep(SAMPLE)
+            (idle0, total0), (idle1, total1) = _win["cpu"], _cpu_times()
+            _win["cpu"] = (idle1, total1)
+            load = 1.0 - (idle1 - idle0) / (total1 - total0) if total1 > total0 else 0.0
+            io = 0.0
+            if _win["disk"] is not None:
+                query, counter = _win["disk"]
+                value = _CounterValue()
+                if (_pdh.PdhCollectQueryData(query) == 0 and
+                        _pdh.PdhGetFormattedCounterValue(counter, _PDH_FMT_DOUBLE, None, ctypes.byref(value)) == 0):
+                    io = 1.0 - min(100.0, value.doubleValue) / 100
+        return max(0.0, load), max(0.0, io)
+
+
+def system_pressure() -> Tuple[float, float]:
+    """(загрузка CPU, доля времени, когда диск занят); 0.0 там, где замерить нечем.
+
+    Linux и macOS — средняя загрузка за минуту на ядро (бывает больше 1) и PSI /proc/pressure/io; Windows —
+    доля занятости CPU (GetSystemTimes, 0..1) и дисков (счётчик PDH «% Idle Time») с прошлого вызова.
+    """
+    if sys.platform == "win32":
+        try:
+            return _windows_pressure()
+        except Exception:
+            return 0.0, 0.0
+    load = 0.0
+    if hasattr(os, "getloadavg"):
+        try:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except OSError:
+            pass
+    io = 0.0
+    try:
+        # "some avg10=1.23 avg60=... avg300=... total=..."
+        fields = Path("/proc/pressure/io").read_text().splitlines()[0].split()
+        io = float(dict(f.split("=", 1) for f in fields[1:])["avg10"]) / 100
+    except Exception:
+        pass
+    return load, io
+
+
+def schedule_config(prof: Dict) -> Dict:
+    sched = prof.get("schedule") or {}
+    cfg = dict(DEFAULTS)
+    for k in DEFAULTS:
+        if k in sched:
+            try:
+                cfg[k] = type(DEFAULTS[k])(sched[k])
+            except (TypeError, ValueError):
+                pass
+    cfg["max_concurrent"] = max(1, cfg["max_concurrent"])
+    cfg["items"] = sched.get("items") or {}
+    return cfg
+
+
+class LoginScheduler:
+    """Запускает элементы по (delay, priority), не больше max_concurrent одновременно,
+    с паузой stagger между стартами и ожиданием (до max_wait) пока нагрузка выше порогов.
+
+    Если у профиля есть "depends", элемент к тому же ждёт, пока его зависимости запустятся и пройдут проверки
+    готовности (launcher.run_graph), — порядок (delay, priority) действует среди тех, кого уже можно запускать."""
+
+    def __init__(self, launch: Optional[Callable[[str, str], str]] = None,
+                 probe: Callable[[], Tuple[float, float]] = system_pressure,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 poll: float = POLL, metrics: Optional[LaunchMetrics] = None,
+                 tracker: Optional[ProcessTracker] = None):
+        self.launch = launch
+        self.probe = probe
+        self.clock = clock
+        self.sleep = sleep
+        self.poll = poll
+        self.metrics = metrics
+        self.tracker = tracker
+
+    def tasks(self, name: str, prof: Dict):
+        tasks = profile_tasks(prof, run=profile_run(name, prof, self.tracker))
+        if self.launch is None:
+            return tasks
+        return [(kind, target, lambda k=kind, t=target: self.launch(k, t)) for kind, target, _ in tasks]
+
+    def _cancelled(self, cancel: Optional[threading.Event]) -> bool:
+        return cancel is not None and cancel.is_set()
+
+    def _sleep_until(self, t: float, cancel: Optional[threading.Event]):
+        while not self._cancelled(cancel):
+            left = t - self.clock()
+            if left <= 0:
+                return
+            self.sleep(min(self.poll, left))
+
+    def _wait_for_quiet(self, cfg: Dict, cancel: Optional[threading.Event]):
+        since = self.clock()
+        while not self._cancelled(cancel) and self.clock() - since < cfg["max_wait"]:
+            load, io = self.probe()
+            if load <= cfg["max_load"] and io <= cfg["max_io"]:
+                return
+            self.sleep(self.poll)
+
+    def _admit(self, cfg: Dict, not_before: Dict[int, float]) -> Callable[[int, int], bool]:
+        """admit для run_graph: те же задержка, пауза stagger, лимит max_concurrent и ожидание простоя (до max_wait)."""
+        last_start: Optional[float] = None
+        busy_since: Optional[float] = None
+
+        def admit(i: int, running: int) -> bool:
+            nonlocal last_start, busy_since
+            now = self.clock()
+            if running >= cfg["max_concurrent"] or now < not_before[i]:
+                return False
+            if last_start is not None and now < last_start + cfg["stagger"]:
+                return False
+            load, io = self.probe()
+            if load > cfg["max_load"] or io > cfg["max_io"]:
+                busy_since = now if busy_since is None else busy_since
+                if now - busy_since < cfg["max_wait"]:
+                    return False
+            last_start, busy_since = now, None
+            return True
+        return admit
+
+    def run(self, name: str, prof: Dict, progress: Optional[Callable] = None,
+            cancel: Optional[threading.Event] = None) -> LaunchResult:
+        cfg = schedule_config(prof)
+        nodes = depends.depends_config(prof)
+        tasks = self.tasks(name, prof)
+        queue = []
+        for i, (kind, target, fn) in enumerate(tasks):
+            # у сайта со своими зависимостями настройки могут быть свои, иначе — общие для пачки "urls"
+            item_cfg = cfg["items"].get(target if kind == "app" or target in cfg["items"] else "urls") or {}
+            try:
+                delay, priority = float(item_cfg.get("delay", 0)), int(item_cfg.get("priority", 0))
+            except (TypeError, ValueError):
+                delay, priority = 0.0, 0
+            queue.append((delay, priority, i, kind, target, fn))
+        queue.sort(key=lambda q: q[:3])
+
+        result = LaunchResult(name, len(queue))
+        t0 = self.clock()
+        started = time.perf_counter()
+        last_start: Optional[float] = None
+        running = set()
+
+        def report(item: LaunchItemResult):
+            done = result.add(item)
+            if progress:
+                progress(item, done, result.total)
+
+        def job(index: int, kind: str, target: str, fn: Callable):
+            report(run_task(index, kind, target, fn, cancel))
+
+        with ThreadPoolExecutor(max_workers=cfg["max_concurrent"], thread_name_prefix="autostart") as ex:
+            if nodes:
+                run_graph(ex, tasks, nodes, report, cancel, self.poll, [q[2] for q in queue],
+                          self._admit(cfg, {q[2]: t0 + q[0] for q in queue}), self.clock, self.sleep)
+            else:
+                for delay, _, i, kind, target, fn in queue:
+                    not_before = t0 + delay if last_start is None else max(t0 + delay, last_start + cfg["stagger"])
+                    self._sleep_until(not_before, cancel)
+                    while len(running) >= cfg["max_concurrent"]:
+                        _, running = wait(running, return_when=FIRST_COMPLETED)
+                    self._wait_for_quiet(cfg, cancel)
+                    if self._cancelled(cancel):
+                        report(LaunchItemResult(i, kind, target, SKIPPED, 0.0, "cancelled"))
+                        continue
+                    last_start = self.clock()
+                    running.add(ex.submit(job, i, kind, target, fn))
+                wait(running)
+
+        result.items.sort(key=lambda i: i.index)
+        result.cancelled = self._cancelled(cancel)
+        result.duration = time.perf_counter() - started
+        if self.metrics is not None and queue:
+            self.metrics.record(result)
+        return result
@@ -0,0 +1,155 @@
+"""Поиск профилей по имени, путям программ и сайтам (хостам URL) по мере набора.
+
+Индекс двухуровневый: термин -> профили и триграмма -> термины. Одни и те же программы и сайты
+встречаются во многих профилях, поэтому триграммы считаются только для уникальных терминов, а
+сохранение или удаление профиля трогает лишь его собственные термины — индекс не перестраивается.
+"""
+from __future__ import annotations
+import functools
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+GRAM = 3
+# хост без схемы, логина, порта и пути; urlsplit на десятках тысяч адресов заметно медленнее
+HOST = re.compile(r"^\s*(?:[a-z][a-z0-9+.-]*://)?(?:[^@/?#]*@)?(?:www\.)?(\[[^\]]*\]|[^/:?#\s]+)", re.I)
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+@functools.lru_cache(maxsize=65536)
+def _path_terms(path: str) -> Tuple[str, ...]:
+    path = path.casefold()
+    return path, path.replace("\\", "/").rsplit("/", 1)[-1]  # имя файла — отдельно, «code.exe»
+
+
+@functools.lru_cache(maxsize=65536)
+def _host(url: str) -> str:
+    m = HOST.match(url)
+    return m.group(1).casefold() if m else ""
+
+
+def profile_terms(name: str, prof: Dict) -> Tuple[str, ...]:
+    """Что ищется: имя профиля, пути программ и браузера, хосты сайтов — всё в casefold."""
+    terms = [name.casefold()]
+    for path in [*prof.get("apps", []), prof.get("browser_path") or ""]:
+        if path:
+            terms.extend(_path_terms(path))
+    terms.extend(_host(url) for url in prof.get("urls", []))
+    return tuple(t for t in dict.fromkeys(terms) if t)
+
+
+class SearchIndex:
+    """Профили, каждое слово запроса в которых встречается как подстрока хотя бы одного термина."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._ready.set()
+        self._docs: Dict[str, Tuple[str, ...]] = {}
+        self._term_docs: Dict[str, Set[str]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._touched: Optional[Set[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _add(self, name: str, terms: Tuple[str, ...]):
+        self._docs[name] = terms
+        for t in terms:
+            docs = self._term_docs.get(t)
+            if docs is None:
+                docs = self._term_docs[t] = set()
+                for g in _grams(t):
+                    self._grams.setdefault(g, set()).add(t)
+            docs.add(name)
+
+    def _drop(self, name: str):
+        for t in self._docs.pop(name, ()):
+            docs = self._term_docs.get(t)
+            if docs is None:
+                continue
+            docs.discard(name)
+            if not docs:
+                del self._term_docs[t]
+                for g in _grams(t):
+                    terms = self._grams.get(g)
+                    if terms is not None:
+                        terms.discard(t)
+                        if not terms:
+                            del self._grams[g]
+
+    def set(self, name: str, prof: Dict):
+        terms = profile_terms(name, prof)
+        with self._lock:
+            if self._touched is not None:
+                self._touched.add(name)
+            if self._docs.get(name) == terms:
+                return
+            self._drop(name)
+            self._add(name, terms)
+
+    def remove(self, name: str):
+        with self._lock:
+            if self._touched is not None:
+                self._touched.add(name)
+            self._drop(name)
+
+    def load(self, profiles: Callable[[], Iterable[tuple]]):
+        """Заполнить индекс заново в фоновом потоке; запросы до окончания ждут его."""
+        with self._lock:
+            self._ready.clear()
+            self._touched = set()
+
+        def job():
+            try:
+                docs = [(name, profile_terms(name, prof)) for name, prof in profiles()]
+                with self._lock:
+                    keep = {name for name, _ in docs} | self._touched
+                    for name in [n for n in self._docs if n not in keep]:
+                        self._drop(name)
+                    for name, terms in docs:
+                        if name not in self._touched and self._docs.get(name) != terms:
+                            self._drop(name)
+                            self._add(name, terms)
+                    self._touched = None
+            finally:
+                self._ready.set()
+        threading.Thread(target=job, name="search-index", daemon=True).start()
+
+    def _terms(self, word: str) -> Iterable[str]:
+        if len(word) < GRAM:
+            return [t for t in self._term_docs if word in t]
+        postings = []
+        for g in _grams(word):
+            terms = self._grams.get(g)
+            if not terms:
+                return []
+            postings.append(terms)
+        postings.sort(key=len)
+        found = set(postings[0]).intersection(*postings[1:])
+        return [t for t in found if word in t]
+
+    def query(self, text: str) -> Optional[Set[str]]:
+        """Имена подходящих профилей; None — пустой запрос, показывать всё."""
+        words = text.casefold().split()
+        if not words:
+            return None
+        self._ready.wait()
+        result: Optional[Set[str]] = None
+        with self._lock:
+            for word in sorted(set(words), key=len, reverse=True):
+                docs: Set[str] = set()
+                for t in self._terms(word):
+                    docs |= self._term_docs[t]
+                result = docs if result is None else result & docs
+                if not result:
+                    break
+        return result or set()
+
+    def matches(self, name: str, text: str) -> List[str]:
+        """Термины профиля, на которые пришлось совпадение, — для подсказки на карточке."""
+        words = text.casefold().split()
+        return [t for t in self._docs.get(name, ()) if any(w in t for w in words)]
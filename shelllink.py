@@ -0,0 +1,207 @@
+"""Чтение ярлыков Windows (.lnk, формат MS-SHLLINK) без PowerShell и кэш результатов на диске."""
+from __future__ import annotations
+import json
+import os
+import re
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from store import write_json_atomic
+
+LINK_CLSID = bytes.fromhex("0114020000000000c000000000000046")
+HEADER_SIZE = 0x4C
+
+HAS_ID_LIST = 0x0001
+HAS_LINK_INFO = 0x0002
+HAS_NAME = 0x0004
+HAS_RELATIVE_PATH = 0x0008
+HAS_WORKING_DIR = 0x0010
+HAS_ARGUMENTS = 0x0020
+HAS_ICON_LOCATION = 0x0040
+IS_UNICODE = 0x0080
+HAS_EXP_STRING = 0x0200
+
+VOLUME_ID_AND_LOCAL_BASE_PATH = 0x1
+COMMON_NETWORK_RELATIVE_LINK = 0x2
+ENVIRONMENT_BLOCK = 0xA0000001
+
+ANSI = "mbcs" if sys.platform == "win32" else "cp1252"
+
+
+class ShellLinkError(ValueError):
+    pass
+
+
+class ShellLink:
+    def __init__(self, target: str = "", arguments: str = "", working_dir: str = "",
+                 relative_path: str = "", icon_location: str = "", name: str = ""):
+        self.target = target
+        self.arguments = arguments
+        self.working_dir = working_dir
+        self.relative_path = relative_path
+        self.icon_location = icon_location
+        self.name = name
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "ShellLink":
+        return cls(**{k: str(d.get(k) or "") for k in ("target", "arguments", "working_dir",
+                                                         "relative_path", "icon_location", "name")})
+
+
+def _cstr(data: bytes, off: int, unicode: bool = False) -> str:
+    if unicode:
+        end = off
+        while end + 1 < len(data) and data[end:end + 2] != b"\0\0":
+            end += 2
+        return data[off:end].decode("utf-16-le", errors="replace")
+    end = data.find(b"\0", off)
+    return data[off:end if end >= 0 else len(data)].decode(ANSI, errors="replace")
+
+
+def _u32(data: bytes, off: int) -> int:
+    if off + 4 > len(data):
+        raise ShellLinkError("неожиданный конец файла")
+    return struct.unpack_from("<I", data, off)[0]
+
+
+def _u16(data: bytes, off: int) -> int:
+    if off + 2 > len(data):
+        raise ShellLinkError("неожиданный конец файла")
+    return struct.unpack_from("<H", data, off)[0]
+
+
+def _link_info_target(info: bytes) -> str:
+    header_size = _u32(info, 4)
+    flags = _u32(info, 8)
+    local_off, net_off, suffix_off = _u32(info, 16), _u32(info, 20), _u32(info, 24)
+    unicode = header_size >= 0x24
+    suffix = _cstr(info, _u32(info, 32), True) if unicode else _cstr(info, suffix_off)
+    if flags & VOLUME_ID_AND_LOCAL_BASE_PATH:
+        base = _cstr(info, _u32(info, 28), True) if unicode else _cstr(info, local_off)
+        return base + suffix
+    if flags & COMMON_NETWORK_RELATIVE_LINK:
+        net = info[net_off:]
+        name_off = _u32(net, 8)
+        name = _cstr(net, _u32(net, 20), True) if name_off > 0x14 else _cstr(net, name_off)
+        return name.rstrip("\\") + ("\\" + suffix if suffix else "")
+    return ""
+
+
+def _expand_env(s: str) -> str:
+    return re.sub(r"%([^%]+)%", lambda m: os.environ.get(m.group(1), m.group(0)), s)
+
+
+def parse(data: bytes) -> ShellLink:
+    if len(data) < HEADER_SIZE or _u32(data, 0) != HEADER_SIZE or data[4:20] != LINK_CLSID:
+        raise ShellLinkError("не является файлом .lnk")
+    flags = _u32(data, 20)
+    off = HEADER_SIZE
+    if flags & HAS_ID_LIST:
+        off += 2 + _u16(data, off)
+    target = ""
+    if flags & HAS_LINK_INFO:
+        size = _u32(data, off)
+        if off + size > len(data):
+            raise ShellLinkError("неожиданный конец файла")
+        target = _link_info_target(data[off:off + size])
+        off += size
+
+    unicode = bool(flags & IS_UNICODE)
+    strings: Dict[int, str] = {}
+    for bit in (HAS_NAME, HAS_RELATIVE_PATH, HAS_WORKING_DIR, HAS_ARGUMENTS, HAS_ICON_LOCATION):
+        if flags & bit:
+            n = _u16(data, off); off += 2
+            width = 2 if unicode else 1
+            if off + n * width > len(data):
+                raise ShellLinkError("неожиданный конец файла")
+            raw = data[off:off + n * width]; off += n * width
+            strings[bit] = raw.decode("utf-16-le" if unicode else ANSI, errors="replace")
+
+    if not target and flags & HAS_EXP_STRING:
+        # ExtraData: блоки [size][signature]..., завершаются блоком размером < 4
+        while off + 8 <= len(data):
+            size, sig = _u32(data, off), _u32(data, off + 4)
+            if size < 4:
+                break
+            if off + size > len(data):
+                raise ShellLinkError("неожиданный конец файла")
+            if sig == ENVIRONMENT_BLOCK and size >= 0x314:
+                target = _expand_env(_cstr(data, off + 268, True) or _cstr(data, off + 8))
+                break
+            off += size
+
+    return ShellLink(target=target, arguments=strings.get(HAS_ARGUMENTS, ""),
+                     working_dir=strings.get(HAS_WORKING_DIR, ""),
+                     relative_path=strings.get(HAS_RELATIVE_PATH, ""),
+                     icon_location=strings.get(HAS_ICON_LOCATION, ""), name=strings.get(HAS_NAME, ""))
+
+
+def read(path: str) -> ShellLink:
+    p = Path(path)
+    link = parse(p.read_bytes())
+    if not link.target and link.relative_path:
+        link.target = os.path.normpath(str(p.parent / link.relative_path.replace("\\", os.sep)))
+    if not link.target:
+        raise ShellLinkError("ярлык не содержит пути к файлу")
+    return link
+
+
+class LnkCache:
+    """Кэш разрешённых ярлыков на диске: ключ — путь, mtime и размер файла .lnk."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        try:
+            write_json_atomic(self.path, self._entries)
+        except Exception:
+            pass
+
+    def get(self, path: str, st: os.stat_result) -> Optional[ShellLink]:
+        with self._lock:
+            e = self._load().get(path)
+        if e and e.get("mtime") == st.st_mtime_ns and e.get("size") == st.st_size:
+            return ShellLink.from_dict(e)
+        return None
+
+    def put(self, path: str, st: os.stat_result, link: ShellLink):
+        with self._lock:
+            self._load()[path] = {"mtime": st.st_mtime_ns, "size": st.st_size, **link.to_dict()}
+            self._save()
+
+    def resolve(self, path: str, fallback: Optional[Callable[[str], ShellLink]] = None) -> Optional[ShellLink]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        link = self.get(path, st)
+        if link is not None:
+            return link
+        try:
+            link = read(path)
+        except Exception:
+            if fallback is None:
+                return None
+            try:
+                link = fallback(path)
+            except Exception:
+                return None
+        self.put(path, st, link)
+        return link
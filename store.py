@@ -0,0 +1,294 @@
+"""Хранилище профилей: единый словарь в памяти, отложенная атомарная запись на диск."""
+from __future__ import annotations
+import atexit
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SAVE_DELAY = 0.5
+
+
+def read_state(path: Path) -> Dict:
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(data, dict) and isinstance(data.get("profiles", {}), dict):
+                data.setdefault("profiles", {})
+                return data
+        except Exception:
+            pass
+        # не затираем повреждённый файл молча — оставляем копию рядом
+        try:
+            shutil.copy2(path, path.with_name(path.name + ".bak"))
+        except Exception:
+            pass
+    return {"profiles": {}}
+
+
+def write_json_atomic(path: Path, data: Dict) -> os.stat_result:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return path.stat()
+
+
+class ProfileStore:
+    """Авторитетная копия profiles.json в памяти.
+
+    Изменения собираются в одну запись через ``delay`` секунд после последней правки;
+    файл перечитывается только если его mtime или размер изменились с прошлой загрузки.
+    """
+
+    def __init__(self, path: Path, delay: float = SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        self._lock = threading.RLock()
+        self._data: Dict = {"profiles": {}}
+        self._sig: Optional[Tuple[int, int]] = None
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self.reload(force=True)
+        atexit.register(self._flush_quietly)
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self, force: bool = False) -> bool:
+        with self._lock:
+            if self._dirty:
+                return False  # несохранённые правки важнее файла на диске
+            sig = self._signature()
+            if not force and sig == self._sig:
+                return False
+            self._data = read_state(self.path)
+            self._sig = sig
+            return True
+
+    @property
+    def state(self) -> Dict:
+        self.reload()
+        return self._data
+
+    @property
+    def profiles(self) -> Dict[str, Dict]:
+        return self.state["profiles"]
+
+    def names(self) -> List[str]:
+        return sorted(self.profiles)
+
+    def get(self, name: str) -> Optional[Dict]:
+        return self.profiles.get(name)
+
+    def summaries(self) -> List[Tuple[str, int, int, str]]:
+        profiles = self.profiles
+        return [(n, len(p.get("apps", [])), len(p.get("urls", [])), p.get("browser_path", "") or "")
+                for n, p in sorted(profiles.items())]
+
+    def put(self, name: str, prof: Dict, old_name: Optional[str] = None):
+        with self._lock:
+            profiles = self.profiles
+            if old_name and old_name != name:
+                profiles.pop(old_name, None)
+            profiles[name] = prof
+            self._schedule()
+
+    def delete(self, name: str) -> bool:
+        with self._lock:
+            if self.profiles.pop(name, None) is None:
+                return False
+            self._schedule()
+            return True
+
+    def _schedule(self):
+        self._dirty = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self._flush_quietly)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel(); self._timer = None
+            if not self._dirty:
+                return
+            st = write_json_atomic(self.path, self._data)
+            self._sig = (st.st_mtime_ns, st.st_size)
+            self._dirty = False
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception:
+            pass  # правки остаются в памяти и будут записаны при следующем flush()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    browser_path TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS profiles_name_nocase ON profiles(name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS apps (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (profile_id, pos)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS urls (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (profile_id, pos)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteProfileStore:
+    """Тот же интерфейс, что и у ProfileStore, но профили лежат в SQLite по строкам.
+
+    Каждое изменение — отдельная транзакция над одним профилем; список карточек
+    читается агрегирующим запросом, без загрузки всех приложений и ссылок.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def reload(self, force: bool = False) -> bool:
+        return False
+
+    def flush(self):
+        pass
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT name FROM profiles ORDER BY name")]
+
+    def summaries(self) -> List[Tuple[str, int, int, str]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT name,"
+                " (SELECT COUNT(*) FROM apps WHERE profile_id = p.id),"
+                " (SELECT COUNT(*) FROM urls WHERE profile_id = p.id),"
+                " browser_path FROM profiles p ORDER BY name").fetchall()
+
+    def _load(self, pid: int, browser_path: str, extra: str) -> Dict:
+        prof = json.loads(extra or "{}")
+        prof["apps"] = [r[0] for r in self._db.execute("SELECT path FROM apps WHERE profile_id = ? ORDER BY pos", (pid,))]
+        prof["urls"] = [r[0] for r in self._db.execute("SELECT url FROM urls WHERE profile_id = ? ORDER BY pos", (pid,))]
+        prof["browser_path"] = browser_path
+        return prof
+
+    def get(self, name: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute("SELECT id, browser_path, extra FROM profiles WHERE name = ?", (name,)).fetchone()
+            return self._load(*row) if row else None
+
+    @property
+    def state(self) -> Dict:
+        with self._lock:
+            rows = self._db.execute("SELECT name, id, browser_path, extra FROM profiles ORDER BY name").fetchall()
+            return {"profiles": {r[0]: self._load(*r[1:]) for r in rows}}
+
+    @property
+    def profiles(self) -> Dict[str, Dict]:
+        return self.state["profiles"]
+
+    def _write(self, name: str, prof: Dict):
+        extra = {k: v for k, v in prof.items() if k not in ("apps", "urls", "browser_path")}
+        self._db.execute(
+            "INSERT INTO profiles(name, browser_path, extra) VALUES (?, ?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET browser_path = excluded.browser_path, extra = excluded.extra",
+            (name, prof.get("browser_path") or "", json.dumps(extra, ensure_ascii=False)))
+        pid = self._db.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()[0]
+        self._db.execute("DELETE FROM apps WHERE profile_id = ?", (pid,))
+        self._db.execute("DELETE FROM urls WHERE profile_id = ?", (pid,))
+        self._db.executemany("INSERT INTO apps(profile_id, pos, path) VALUES (?, ?, ?)",
+                             [(pid, i, a) for i, a in enumerate(prof.get("apps", []))])
+        self._db.executemany("INSERT INTO urls(profile_id, pos, url) VALUES (?, ?, ?)",
+                             [(pid, i, u) for i, u in enumerate(prof.get("urls", []))])
+
+    def put(self, name: str, prof: Dict, old_name: Optional[str] = None):
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            if old_name and old_name != name:
+                self._db.execute("DELETE FROM profiles WHERE name = ?", (old_name,))
+            self._write(name, prof)
+
+    def delete(self, name: str) -> bool:
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            return self._db.execute("DELETE FROM profiles WHERE name = ?", (name,)).rowcount > 0
+
+    def import_json(self, path: Path, replace: bool = False) -> int:
+        profiles = read_state(path)["profiles"]
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            if replace:
+                self._db.execute("DELETE FROM profiles")
+            for name, prof in profiles.items():
+                self._write(name, prof)
+        return len(profiles)
+
+    def export_json(self, path: Path) -> int:
+        data = self.state
+        write_json_atomic(path, data)
+        return len(data["profiles"])
+
+
+def open_store(json_path: Path):
+    """SQLite, если рядом с profiles.json есть profiles.db, иначе JSON."""
+    db_path = json_path.with_suffix(".db")
+    if db_path.exists():
+        return SqliteProfileStore(db_path)
+    return ProfileStore(json_path)
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Перенос профилей между profiles.json и SQLite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="profiles.json -> profiles.db")
+    imp.add_argument("json"); imp.add_argument("db"); imp.add_argument("--replace", action="store_true")
+    exp = sub.add_parser("export", help="profiles.db -> profiles.json")
+    exp.add_argument("db"); exp.add_argument("json")
+    args = ap.parse_args()
+    st = SqliteProfileStore(Path(args.db))
+    if args.cmd == "import":
+        print(f"Импортировано профилей: {st.import_json(Path(args.json), args.replace)}")
+    else:
+        print(f"Экспортировано профилей: {st.export_json(Path(args.json))}")
@@ -0,0 +1,7 @@
+"""Модули программы лежат в корне репозитория рядом с main.py — делаем их импортируемыми из тестов."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,89 @@
+"""Собирает фикстуры .lnk для tests/test_shelllink.py по структурам MS-SHLLINK.
+
+Файлы лежат в репозитории; скрипт нужен только чтобы пересоздать их:  python tests/fixtures/make_lnk.py
+"""
+from __future__ import annotations
+import struct
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+CLSID = bytes.fromhex("0114020000000000c000000000000046")
+
+HAS_ID_LIST, HAS_LINK_INFO, HAS_NAME, HAS_RELATIVE_PATH = 0x1, 0x2, 0x4, 0x8
+HAS_WORKING_DIR, HAS_ARGUMENTS, IS_UNICODE, HAS_EXP_STRING = 0x10, 0x20, 0x80, 0x200
+
+
+def header(flags: int) -> bytes:
+    # HeaderSize, LinkCLSID, LinkFlags, FileAttributes, три FILETIME, FileSize, IconIndex, ShowCommand, HotKey, Reserved*
+    return struct.pack("<I16sIIQQQIiIHHII", 0x4C, CLSID, flags, 0x20, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0)
+
+
+def id_list() -> bytes:
+    item = b"\x1f\x50" + bytes(16)  # корневой элемент «Этот компьютер» — парсер его только пропускает
+    items = struct.pack("<H", len(item) + 2) + item + b"\0\0"
+    return struct.pack("<H", len(items)) + items
+
+
+def strings(*values: str) -> bytes:
+    return b"".join(struct.pack("<H", len(v)) + v.encode("utf-16-le") for v in values)
+
+
+def volume_id() -> bytes:
+    return struct.pack("<IIII", 0x11, 3, 0x1234ABCD, 0x10) + b"\0"
+
+
+def link_info_local(path: str) -> bytes:
+    vol = volume_id()
+    base = path.encode("cp1252") + b"\0"
+    head = 0x1C
+    body = vol + base + b"\0"
+    off_vol, off_base = head, head + len(vol)
+    off_suffix = off_base + len(base)
+    return struct.pack("<IIIIIII", head + len(body), head, 0x1, off_vol, off_base, 0, off_suffix) + body
+
+
+def link_info_unicode(path: str) -> bytes:
+    vol = volume_id()
+    ansi = b"?\0"  # так Windows пишет ANSI-путь, если в нём есть символы вне кодовой страницы
+    head = 0x24
+    off_vol = head
+    off_base = off_vol + len(vol)
+    off_suffix = off_base + len(ansi)
+    off_base_u = off_suffix + 1
+    base_u = path.encode("utf-16-le") + b"\0\0"
+    off_suffix_u = off_base_u + len(base_u)
+    body = vol + ansi + b"\0" + base_u + b"\0\0"
+    return struct.pack("<IIIIIIIII", head + len(body), head, 0x1, off_vol, off_base, 0, off_suffix,
+                       off_base_u, off_suffix_u) + body
+
+
+def link_info_network(share: str, suffix: str) -> bytes:
+    name = share.encode("cp1252") + b"\0"
+    net = struct.pack("<IIIII", 0x14 + len(name), 0, 0x14, 0, 0x20000) + name
+    head = 0x1C
+    off_net = head
+    off_suffix = off_net + len(net)
+    body = net + suffix.encode("cp1252") + b"\0"
+    return struct.pack("<IIIIIII", head + len(body), head, 0x2, 0, 0, off_net, off_suffix) + body
+
+
+def env_block(target: str) -> bytes:
+    ansi = target.encode("cp1252").ljust(260, b"\0")
+    uni = target.encode("utf-16-le").ljust(520, b"\0")
+    return struct.pack("<II", 0x314, 0xA0000001) + ansi + uni + struct.pack("<I", 0)
+
+
+FIXTURES = {
+    "local.lnk": header(HAS_ID_LIST | HAS_LINK_INFO | HAS_WORKING_DIR | HAS_ARGUMENTS | IS_UNICODE) + id_list()
+    + link_info_local(r"C:\Program Files\Editor\editor.exe") + strings(r"C:\Projects", "--new-window notes.txt"),
+    "unicode.lnk": header(HAS_LINK_INFO | HAS_NAME | IS_UNICODE)
+    + link_info_unicode(r"C:\Программы\Редактор\редактор.exe") + strings("Редактор"),
+    "network.lnk": header(HAS_LINK_INFO | IS_UNICODE) + link_info_network(r"\\fileserver\tools", r"bin\sync.exe"),
+    "env.lnk": header(HAS_EXP_STRING | IS_UNICODE) + env_block(r"%LNK_TEST_ROOT%\app\tool.exe"),
+    "relative.lnk": header(HAS_RELATIVE_PATH | HAS_ARGUMENTS | IS_UNICODE) + strings(r"..\bin\tool.exe", "-v"),
+}
+
+if __name__ == "__main__":
+    for name, data in FIXTURES.items():
+        (HERE / name).write_bytes(data)
+        print(name, len(data))
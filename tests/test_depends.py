@@ -0,0 +1,210 @@
+"""Запуск профиля с зависимостями: настоящие процессы-«стенды» (скрипты с #!) и заглушка браузера."""
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import depends
+from launcher import FAILED, SKIPPED, STARTED, LaunchEngine
+from processes import ProcessTracker
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="«программы» — скрипты с #!")
+
+SERVER = """#!{python}
+import socket, time
+time.sleep({delay})
+s = socket.socket(); s.bind(("127.0.0.1", {port})); s.listen()
+with open({log!r}, "w") as f:
+    f.write(repr(time.time()))
+time.sleep(30)
+"""
+
+BROWSER = """#!{python}
+import sys, time
+with open({log!r}, "a", encoding="utf-8") as f:
+    f.write("%r %s\\n" % (time.time(), " ".join(sys.argv[1:])))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def script(path, text: str) -> str:
+    path.write_text(text, encoding="utf-8")
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture
+def stand(tmp_path):
+    """(каталог, трекер, браузер, лог браузера); по завершении запущенные профилем процессы закрываются."""
+    log = tmp_path / "browser.log"
+    browser = script(tmp_path / "browser.exe", BROWSER.format(python=sys.executable, log=str(log)))
+    tracker = ProcessTracker(tmp_path / "processes.json")
+    yield tmp_path, tracker, browser, log
+    tracker.close("dev", 1.0)
+
+
+def opened(log) -> dict:
+    """Адрес -> когда заглушка браузера его получила."""
+    out = {}
+    for line in log.read_text(encoding="utf-8").splitlines() if log.exists() else []:
+        t, *urls = line.split()
+        out.update((u, float(t)) for u in urls)
+    return out
+
+
+def run(tracker, prof, cancel=None):
+    return LaunchEngine(tracker=tracker, poll=0.05).run("dev", {"profiles": {"dev": prof}}, cancel=cancel)
+
+
+def wait_for(cond, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_dependent_url_opens_after_port_listens(stand):
+    root, tracker, browser, log = stand
+    port = free_port()
+    listened = root / "listened"
+    server = script(root / "server.exe", SERVER.format(python=sys.executable, delay=0.8, port=port, log=str(listened)))
+    url = f"http://127.0.0.1:{port}/"
+    prof = {"apps": [server], "urls": ["https://docs.example.com/", url], "browser_path": browser,
+            "depends": {server: {"ready": {"tcp": port}, "timeout": 10}, url: {"after": [server]}}}
+    res = run(tracker, prof)
+    assert [i.status for i in res.items] == [STARTED, STARTED, STARTED], [i.error for i in res.items]
+    wait_for(lambda: url in opened(log) and "https://docs.example.com/" in opened(log))
+    at = opened(log)
+    listen = float(listened.read_text())
+    assert at[url] >= listen
+    assert at["https://docs.example.com/"] < listen  # сайты без зависимостей сервера не ждут
+    assert next(i for i in res.items if i.target == server).stages["ready"] >= 0.5
+
+
+def test_readiness_timeout_fails_item_and_skips_dependents(stand):
+    root, tracker, browser, log = stand
+    port = free_port()
+    silent = script(root / "silent.exe", "#!/bin/sh\nexec sleep 30\n")
+    app = script(root / "app.exe", "#!/bin/sh\n")
+    url = f"http://127.0.0.1:{port}/"
+    prof = {"apps": [silent, app], "urls": [url], "browser_path": browser,
+            "depends": {silent: {"ready": {"tcp": port}, "timeout": 0.5}, url: {"after": [silent]},
+                        app: {"after": [silent]}}}
+    t0 = time.perf_counter()
+    res = run(tracker, prof)
+    assert time.perf_counter() - t0 < 5
+    by = {i.target: i for i in res.items}
+    assert by[silent].status == FAILED
+    assert by[silent].error == f"не готово за 0.5 с: tcp 127.0.0.1:{port}"
+    assert by[silent].stages["ready"] >= 0.5
+    for dep in (url, app):
+        assert by[dep].status == SKIPPED
+        assert by[dep].error.startswith(f"не дождались «{silent}»")
+    assert not log.exists()
+
+
+def test_missing_dependency_skips_dependents(stand):
+    root, tracker, browser, log = stand
+    missing = str(root / "missing.exe")
+    app = script(root / "app.exe", "#!/bin/sh\n")
+    res = run(tracker, {"apps": [missing, app], "if_running": "start", "depends": {app: {"after": [missing]}}})
+    by = {i.target: i for i in res.items}
+    assert (by[missing].status, by[missing].error) == (SKIPPED, "нет файла")
+    assert (by[app].status, by[app].error) == (SKIPPED, f"не дождались «{missing}»: нет файла")
+
+
+def test_cancel_skips_waiting_items(stand):
+    root, tracker, browser, log = stand
+    port = free_port()
+    silent = script(root / "silent.exe", "#!/bin/sh\nexec sleep 30\n")
+    app = script(root / "app.exe", "#!/bin/sh\n")
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    res = run(tracker, {"apps": [silent, app], "depends": {silent: {"ready": {"tcp": port}, "timeout": 10},
+                                                           app: {"after": [silent]}}}, cancel)
+    by = {i.target: i for i in res.items}
+    assert res.cancelled
+    assert by[silent].status == STARTED
+    assert (by[app].status, by[app].error) == (SKIPPED, "cancelled")
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="процесс ищется через /proc")
+def test_already_running_dependency_unblocks_dependents(stand):
+    root, tracker, browser, log = stand
+    sleeper = root / "sleeper.exe"
+    shutil.copy(shutil.which("sleep"), sleeper)
+    app = script(root / "app.exe", "#!/bin/sh\n")
+    proc = subprocess.Popen([str(sleeper), "30"])
+    try:
+        wait_for(lambda: depends.Probe("process", str(sleeper)).check())
+        res = run(tracker, {"apps": [str(sleeper), app], "depends": {app: {"after": [str(sleeper)]}}})
+    finally:
+        proc.kill(); proc.wait()
+    by = {i.target: i for i in res.items}
+    assert by[str(sleeper)].status == SKIPPED and by[str(sleeper)].error.startswith("уже запущено")
+    assert by[app].status == STARTED
+
+
+def test_problems_reports_config_errors():
+    prof = {"apps": ["a.exe", "b.exe"], "urls": [],
+            "depends": {"a.exe": {"after": ["b.exe"]}, "b.exe": {"after": ["a.exe"], "ready": {"tcp": "x"}},
+                        "c.exe": {}}}
+    out = depends.problems(prof)
+    assert "depends: нет элемента «c.exe»" in out
+    assert any(p.startswith("depends: b.exe: неверный порт") for p in out)
+    assert "depends: цикл зависимостей: a.exe, b.exe" in out
+
+
+@pytest.mark.parametrize("spec, want", [
+    ({"tcp": 5432}, "tcp 127.0.0.1:5432"),
+    ({"tcp": "db:5432"}, "tcp db:5432"),
+    ({"file": "/tmp/ready"}, "file /tmp/ready"),
+    ({"process": "postgres"}, "process postgres"),
+])
+def test_parse_probe(spec, want):
+    assert str(depends.parse_probe(spec)) == want
+
+
+@pytest.mark.parametrize("spec", [{"tcp": "db"}, {"http": 80}, {"tcp": 1, "file": "x"}, "tcp:80", {"file": ""}])
+def test_parse_probe_rejects(spec):
+    with pytest.raises(ValueError):
+        depends.parse_probe(spec)
+
+
+def test_slow_probe_does_not_stall_other_branches(stand, monkeypatch):
+    root, tracker, browser, log = stand
+
+    def unreachable(*args, **kw):
+        time.sleep(1.5)  # как connect к хосту, который не отвечает
+        raise OSError("timed out")
+    monkeypatch.setattr(depends.socket, "create_connection", unreachable)
+    slow, fast, after_fast = (script(root / f"{n}.exe", "#!/bin/sh\n") for n in ("slow", "fast", "after"))
+    flag = root / "fast.ready"
+    threading.Timer(0.2, flag.touch).start()
+    prof = {"apps": [slow, fast, after_fast],
+            "depends": {slow: {"ready": {"tcp": "10.255.255.1:9"}, "timeout": 2},
+                        fast: {"ready": {"file": str(flag)}, "timeout": 5}, after_fast: {"after": [fast]}}}
+    at = {}
+    t0 = time.perf_counter()
+    res = LaunchEngine(tracker=tracker, poll=0.05).run(
+        "dev", {"profiles": {"dev": prof}}, lambda item, done, total: at.setdefault(item.target, time.perf_counter() - t0))
+    assert at[after_fast] < 1.0
+    assert {i.target: i.status for i in res.items} == {slow: FAILED, fast: STARTED, after_fast: STARTED}
+
+
+def test_process_probes_share_one_snapshot(monkeypatch):
+    calls = []
+    monkeypatch.setattr(depends, "list_processes", lambda: calls.append(1) or {1: "/usr/bin/postgres"})
+    node = depends.Node("x", [], [depends.parse_probe({"process": n}) for n in ("postgres", "redis", "nginx")], 10)
+    snapshot = depends.Snapshot()
+    assert [str(p) for p in node.pending(snapshot)] == ["process redis", "process nginx"]
+    node.pending(snapshot)
+    assert len(calls) == 1
@@ -0,0 +1,65 @@
+"""Фоновый индекс путей: «нет файла» снимается, когда папка появляется позже; лишние каталоги не наблюдаются."""
+import os
+import time
+
+from pathindex import PathIndex, watch_dir
+
+
+def wait_for(cond, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def norm(path) -> str:
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+def test_watch_dir_climbs_to_existing_ancestor(tmp_path):
+    assert watch_dir(str(tmp_path / "app.exe")) == norm(tmp_path)
+    assert watch_dir(str(tmp_path / "Vendor" / "Tool" / "app.exe")) == norm(tmp_path)
+    (tmp_path / "Vendor").mkdir()
+    assert watch_dir(str(tmp_path / "Vendor" / "Tool" / "app.exe")) == norm(tmp_path / "Vendor")
+
+
+def test_missing_folder_created_later(tmp_path):
+    app = tmp_path / "Vendor" / "app.exe"
+    index = PathIndex()
+    try:
+        index.set_profile("dev", {"apps": [str(app)]})
+        assert wait_for(lambda: index.missing_count("dev") == 1)
+        assert index.dirs() == {norm(tmp_path)}
+
+        app.parent.mkdir()
+        index.invalidate_dir(str(tmp_path))  # так его вызывает QFileSystemWatcher
+        assert wait_for(lambda: index.dirs() == {norm(app.parent)})
+        assert index.missing_count("dev") == 1
+
+        app.write_bytes(b"")
+        index.invalidate_dir(str(app.parent))
+        assert wait_for(lambda: index.missing_count("dev") == 0)
+    finally:
+        index.close()
+
+
+def test_dirs_are_pruned_with_profiles(tmp_path):
+    (tmp_path / "a").mkdir(); (tmp_path / "b").mkdir()
+    a, b = tmp_path / "a" / "a.exe", tmp_path / "b" / "b.exe"
+    a.write_bytes(b""); b.write_bytes(b"")
+    index = PathIndex()
+    notified = []
+    index.listeners.append(notified.append)
+    try:
+        index.set_profile("one", {"apps": [str(a)]})
+        index.set_profile("two", {"apps": [str(a), str(b)]})
+        assert wait_for(lambda: index.dirs() == {norm(a.parent), norm(b.parent)})
+        index.remove_profile("two")
+        assert index.dirs() == {norm(a.parent)}  # a ещё нужен профилю «one»
+        assert notified[-1] == set()
+        index.set_profile("one", {"apps": []})
+        assert index.dirs() == set()
+    finally:
+        index.close()
@@ -0,0 +1,48 @@
+"""Уже запущенные программы: политика "if_running" и учёт PID профиля в processes.json."""
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from processes import RUNNING, ProcessTracker, ProfileRun
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="процессы ищутся через /proc")
+
+
+@pytest.fixture
+def sleeper(tmp_path):
+    """Копия sleep под своим именем и работающий процесс из неё."""
+    exe = tmp_path / "code.exe"
+    shutil.copy(shutil.which("sleep"), exe)
+    proc = subprocess.Popen([str(exe), "30"])
+    time.sleep(0.1)
+    yield str(exe), proc
+    proc.kill(); proc.wait()
+
+
+def test_item_without_arguments_skips_any_running_copy(tmp_path, sleeper):
+    exe, proc = sleeper
+    run = ProfileRun(ProcessTracker(tmp_path / "processes.json"), "dev")
+    assert run.check(exe, exe) == f"{RUNNING} (pid {proc.pid})"
+
+
+def test_item_with_arguments_ignores_copies_started_elsewhere(tmp_path, sleeper):
+    exe, proc = sleeper
+    run = ProfileRun(ProcessTracker(tmp_path / "processes.json"), "dev")
+    assert run.check(exe, r"C:\Links\proj2.lnk", r"C:\proj2") is None
+
+
+def test_item_with_arguments_skips_its_own_process(tmp_path, sleeper):
+    exe, proc = sleeper
+    tracker = ProcessTracker(tmp_path / "processes.json")
+    tracker.add("dev", r"C:\Links\proj1.lnk", proc.pid, exe)
+    run = ProfileRun(tracker, "dev")
+    assert run.check(exe, r"C:\Links\proj1.lnk", r"C:\proj1") == f"{RUNNING} (pid {proc.pid})"
+    assert run.check(exe, r"C:\Links\proj2.lnk", r"C:\proj2") is None
+
+
+def test_start_policy_never_skips(tmp_path, sleeper):
+    exe, _ = sleeper
+    assert ProfileRun(ProcessTracker(tmp_path / "processes.json"), "dev", "start").check(exe, exe) is None
@@ -0,0 +1,179 @@
+"""LoginScheduler на подставных часах, пробе нагрузки и запуске: порядок, паузы, лимиты и отмена."""
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import scheduler
+from launcher import SKIPPED, STARTED
+from scheduler import LoginScheduler, schedule_config
+
+
+class Clock:
+    """Часы, которые идут только во время sleep()."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.events = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def at(self, t: float, fn):
+        """Выполнить fn, когда часы дойдут до t."""
+        self.events.append((t, fn))
+
+    def sleep(self, dt: float):
+        self.now += dt
+        for t, fn in [e for e in self.events if e[0] <= self.now]:
+            self.events.remove((t, fn)); fn()
+
+
+class InlineExecutor:
+    """Пул, выполняющий задачу прямо в submit() — время старта по подставным часам точное."""
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = ""):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        f = Future()
+        f.set_result(fn(*args))
+        return f
+
+
+@pytest.fixture
+def inline(monkeypatch):
+    monkeypatch.setattr(scheduler, "ThreadPoolExecutor", InlineExecutor)
+
+
+def make(clock, starts, probe=lambda: (0.0, 0.0), on_launch=None):
+    def launch(kind, target):
+        starts.append((target, clock()))
+        if on_launch:
+            on_launch(target)
+        return STARTED
+    return LoginScheduler(launch=launch, probe=probe, clock=clock, sleep=clock.sleep, poll=0.5)
+
+
+def profile(apps, **schedule):
+    return {"apps": apps, "schedule": schedule}
+
+
+def test_order_by_delay_then_priority(inline):
+    clock, starts = Clock(), []
+    prof = profile(["a", "b", "c", "d"], stagger=0,
+                   items={"a": {"delay": 5}, "b": {"priority": 9}, "c": {"priority": 1}})
+    res = make(clock, starts).run("p", prof)
+    assert [t for t, _ in starts] == ["d", "c", "b", "a"]
+    assert dict(starts)["a"] == 5.0
+    assert [i.target for i in res.items] == ["a", "b", "c", "d"]  # результаты — в порядке профиля
+    assert all(i.status == STARTED for i in res.items)
+
+
+def test_stagger_spaces_starts(inline):
+    clock, starts = Clock(), []
+    make(clock, starts).run("p", profile(["a", "b", "c"], stagger=2))
+    assert [t for _, t in starts] == [0.0, 2.0, 4.0]
+
+
+def test_delay_counts_from_start_not_previous_item(inline):
+    clock, starts = Clock(), []
+    make(clock, starts).run("p", profile(["a", "b"], stagger=1, items={"b": {"delay": 3}}))
+    assert dict(starts) == {"a": 0.0, "b": 3.0}
+
+
+def test_max_concurrent_cap():
+    lock = threading.Lock()
+    now = [0, 0]  # сейчас работают, максимум
+
+    def launch(kind, target):
+        with lock:
+            now[0] += 1; now[1] = max(now[1], now[0])
+        time.sleep(0.05)
+        with lock:
+            now[0] -= 1
+        return STARTED
+    res = LoginScheduler(launch=launch, probe=lambda: (0.0, 0.0), poll=0.01).run(
+        "p", profile([f"app{i}" for i in range(6)], stagger=0, max_concurrent=2))
+    assert now[1] == 2
+    assert len(res.started) == 6
+
+
+def test_max_wait_gives_up_on_busy_system(inline):
+    clock, starts, calls = Clock(), [], []
+
+    def busy():
+        calls.append(clock())
+        return 5.0, 0.9
+    res = make(clock, starts, probe=busy).run("p", profile(["a", "b"], stagger=0, max_wait=10))
+    assert [t for _, t in starts] == [10.0, 20.0]  # каждый ждал max_wait и всё равно запустился
+    assert len(res.started) == 2
+    assert len(calls) == 40
+
+
+def test_waits_until_quiet(inline):
+    clock, starts = Clock(), []
+    readings = iter([(3.0, 0.0), (0.1, 0.8), (0.1, 0.1)])
+    make(clock, starts, probe=lambda: next(readings, (0.0, 0.0))).run("p", profile(["a"], max_wait=60))
+    assert starts == [("a", 1.0)]
+
+
+def test_cancel_skips_the_rest(inline):
+    clock, starts = Clock(), []
+    cancel = threading.Event()
+    sched = make(clock, starts, on_launch=lambda target: cancel.set())
+    res = sched.run("p", profile(["a", "b", "c"], stagger=1), cancel=cancel)
+    assert [t for t, _ in starts] == ["a"]
+    assert res.cancelled
+    assert [(i.target, i.status, i.error) for i in res.items[1:]] == [("b", SKIPPED, "cancelled"),
+                                                                      ("c", SKIPPED, "cancelled")]
+
+
+def test_schedule_config_defaults_and_bad_values():
+    cfg = schedule_config({"schedule": {"max_concurrent": 0, "stagger": "x", "max_wait": "5"}})
+    assert cfg["max_concurrent"] == 1
+    assert cfg["stagger"] == scheduler.DEFAULTS["stagger"]
+    assert cfg["max_wait"] == 5.0
+    assert cfg["max_load"] == scheduler.DEFAULTS["max_load"]
+
+
+def test_depends_overrides_priority_and_waits_for_ready(inline, tmp_path):
+    clock, starts = Clock(), []
+    flag = tmp_path / "db.ready"
+    prof = profile(["api", "db", "tool"], stagger=1, items={"db": {"priority": 9}})
+    prof["depends"] = {"db": {"ready": {"file": str(flag)}, "timeout": 30}, "api": {"after": ["db"]}}
+    clock.at(4.0, flag.touch)  # db «поднимается» три секунды
+    res = make(clock, starts).run("p", prof)
+    assert [t for t, _ in starts] == ["tool", "db", "api"]  # api ждёт db, хоть у того и приоритет ниже
+    assert dict(starts)["db"] == 1.0
+    assert 4.0 <= dict(starts)["api"] < 5.0
+    assert res.items[1].stages["ready"] >= 3.0
+    assert all(i.status == STARTED for i in res.items)
+
+
+def test_depends_timeout_skips_dependents(inline, tmp_path):
+    clock, starts = Clock(), []
+    prof = profile(["api", "db"], stagger=0)
+    prof["depends"] = {"db": {"ready": {"file": str(tmp_path / "never")}, "timeout": 5}, "api": {"after": ["db"]}}
+    res = make(clock, starts).run("p", prof)
+    by = {i.target: i for i in res.items}
+    assert [t for t, _ in starts] == ["db"]
+    assert by["db"].error == f"не готово за 5 с: file {tmp_path / 'never'}"
+    assert (by["api"].status, by["api"].error.startswith("не дождались «db»")) == (SKIPPED, True)
+    assert 5.0 <= clock() < 6.0
+
+
+def test_depends_keeps_load_gate(inline):
+    clock, starts = Clock(), []
+    readings = iter([(3.0, 0.0)] * 4)
+    prof = profile(["api", "db"], stagger=0, max_wait=60)
+    prof["depends"] = {"api": {"after": ["db"]}}
+    make(clock, starts, probe=lambda: next(readings, (0.0, 0.0))).run("p", prof)
+    assert starts == [("db", 2.0), ("api", 2.0)]
@@ -0,0 +1,101 @@
+"""Поиск профилей по триграммам: короткие и кириллические запросы, регистр, правки профилей без перестройки."""
+import threading
+
+from search import SearchIndex, profile_terms
+
+PROFILES = {
+    "Работа": {"apps": [r"C:\Program Files\Microsoft VS Code\Code.exe"], "urls": ["https://Mail.Example.com/inbox"],
+               "browser_path": r"C:\Browsers\firefox.exe"},
+    "Дом": {"apps": [r"C:\Games\Steam.exe"], "urls": ["www.музыка.рф/плейлист", "http://user@news.example.org:8080/"]},
+    "ЁЖИК": {"apps": [], "urls": []},
+}
+
+
+def make(profiles=PROFILES):
+    index = SearchIndex()
+    for name, prof in profiles.items():
+        index.set(name, prof)
+    return index
+
+
+def test_profile_terms():
+    assert profile_terms("Дом", PROFILES["Дом"]) == (
+        "дом", r"c:\games\steam.exe", "steam.exe", "музыка.рф", "news.example.org")
+
+
+def test_empty_query_shows_all():
+    assert make().query("  ") is None
+
+
+def test_short_queries_match_substrings():
+    index = make()
+    assert index.query("дo") == set()  # латинская «o» — не кириллическая
+    assert index.query("до") == {"Дом"}
+    assert index.query("ё") == {"ЁЖИК"}
+    assert index.query("fi") == {"Работа"}
+
+
+def test_cyrillic_and_case_folding():
+    index = make()
+    assert index.query("РАБОТ") == {"Работа"}
+    assert index.query("МУЗЫКА") == {"Дом"}
+    assert index.query("ёжик") == {"ЁЖИК"}
+    assert index.query("code.EXE") == {"Работа"}
+    assert index.query("mail.example") == {"Работа"}
+
+
+def test_every_word_must_match():
+    index = make()
+    assert index.query("example") == {"Работа", "Дом"}
+    assert index.query("example steam") == {"Дом"}
+    assert index.query("example ёжик") == set()
+    assert index.query("inbox") == set()  # путь сайта не индексируется, только хост
+
+
+def test_add_rename_delete():
+    index = make()
+    index.set("Учёба", {"apps": [r"D:\Study\anki.exe"], "urls": ["https://moodle.example.edu/"]})
+    assert index.query("anki") == {"Учёба"}
+    assert index.query("example") == {"Работа", "Дом", "Учёба"}
+
+    index.remove("Учёба")  # переименование: старое имя уходит, новое добавляется
+    index.set("Курсы", {"apps": [r"D:\Study\anki.exe"], "urls": []})
+    assert index.query("учёба") == set()
+    assert index.query("курс anki") == {"Курсы"}
+    assert index.query("moodle") == set()
+
+    index.remove("Дом")
+    assert index.query("steam") == set()
+    assert index.query("example") == {"Работа"}
+    assert len(index) == 3
+
+
+def test_shared_terms_survive_one_profile_removal():
+    index = make({"a": {"apps": [r"C:\x\code.exe"]}, "b": {"apps": [r"C:\x\code.exe"]}})
+    index.remove("a")
+    assert index.query("code") == {"b"}
+    index.remove("b")
+    assert index.query("code") == set()
+    assert index._grams == {} and index._term_docs == {}  # лишних триграмм не остаётся
+
+
+def test_edits_during_background_load_win():
+    index = SearchIndex()
+    gate = threading.Event()
+
+    def profiles():
+        gate.wait(5)
+        return [("Дом", {"apps": [r"C:\Games\Steam.exe"]}), ("Старый", {"urls": ["old.example.com"]})]
+    index.load(profiles)
+    index.set("Дом", {"apps": [r"C:\Games\Epic.exe"]})  # сохранён, пока индекс грузился
+    index.remove("Старый")
+    gate.set()
+    assert index.query("epic") == {"Дом"}  # query ждёт окончания загрузки
+    assert index.query("steam") == set()
+    assert index.query("old") == set()
+
+
+def test_matches_hint():
+    index = make()
+    assert index.matches("Работа", "CODE mail") == [r"c:\program files\microsoft vs code\code.exe", "code.exe",
+                                                    "mail.example.com"]
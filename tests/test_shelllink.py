@@ -0,0 +1,119 @@
+"""Разбор .lnk без Windows: фикстуры собраны tests/fixtures/make_lnk.py по структурам MS-SHLLINK."""
+import os
+from pathlib import Path
+
+import pytest
+
+import shelllink
+from shelllink import LnkCache, ShellLink, ShellLinkError
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def fixture(name: str) -> str:
+    return str(FIXTURES / name)
+
+
+def test_local_path_with_id_list_and_strings():
+    link = shelllink.read(fixture("local.lnk"))
+    assert link.target == r"C:\Program Files\Editor\editor.exe"
+    assert link.arguments == "--new-window notes.txt"
+    assert link.working_dir == r"C:\Projects"
+
+
+def test_unicode_link_info():
+    link = shelllink.read(fixture("unicode.lnk"))
+    assert link.target == r"C:\Программы\Редактор\редактор.exe"
+    assert link.name == "Редактор"
+
+
+def test_network_share():
+    assert shelllink.read(fixture("network.lnk")).target == r"\\fileserver\tools\bin\sync.exe"
+
+
+def test_environment_block_fallback(monkeypatch):
+    monkeypatch.setenv("LNK_TEST_ROOT", r"D:\Data")
+    assert shelllink.read(fixture("env.lnk")).target == r"D:\Data\app\tool.exe"
+
+
+def test_environment_block_keeps_unknown_variables(monkeypatch):
+    monkeypatch.delenv("LNK_TEST_ROOT", raising=False)
+    assert shelllink.read(fixture("env.lnk")).target == r"%LNK_TEST_ROOT%\app\tool.exe"
+
+
+def test_relative_path_only_resolves_next_to_the_link():
+    link = shelllink.read(fixture("relative.lnk"))
+    assert link.relative_path == r"..\bin\tool.exe"
+    assert link.arguments == "-v"
+    assert link.target == os.path.normpath(str(FIXTURES.parent / "bin" / "tool.exe"))
+
+
+@pytest.mark.parametrize("name", ["local.lnk", "unicode.lnk", "network.lnk", "env.lnk"])
+def test_truncated_file_raises(name):
+    data = (FIXTURES / name).read_bytes()
+    for cut in range(0, len(data) - 4):
+        with pytest.raises(ShellLinkError):
+            link = shelllink.parse(data[:cut])
+            if not link.target:
+                raise ShellLinkError("пустой путь")  # так же, как read() для ярлыка без цели
+
+
+def test_not_a_link(tmp_path):
+    path = tmp_path / "notes.lnk"
+    path.write_text("просто текст, не ярлык", encoding="utf-8")
+    with pytest.raises(ShellLinkError):
+        shelllink.read(str(path))
+
+
+class FallbackSpy:
+    """Вместо PowerShell: считает вызовы и возвращает фиксированный результат."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, path: str) -> ShellLink:
+        self.calls.append(path)
+        return ShellLink(target=r"C:\Fallback\app.exe")
+
+
+def test_cache_hit_skips_parsing_and_fallback(tmp_path):
+    broken = tmp_path / "broken.lnk"
+    broken.write_bytes(b"not a shell link")
+    spy = FallbackSpy()
+    cache = LnkCache(tmp_path / "lnk_cache.json")
+    assert cache.resolve(str(broken), spy).target == r"C:\Fallback\app.exe"
+    assert cache.resolve(str(broken), spy).target == r"C:\Fallback\app.exe"
+    # кэш на диске переживает перезапуск
+    assert LnkCache(tmp_path / "lnk_cache.json").resolve(str(broken), spy).target == r"C:\Fallback\app.exe"
+    assert spy.calls == [str(broken)]
+
+
+def test_cache_miss_on_size_change(tmp_path):
+    broken = tmp_path / "broken.lnk"
+    broken.write_bytes(b"not a shell link")
+    spy = FallbackSpy()
+    cache = LnkCache(tmp_path / "lnk_cache.json")
+    cache.resolve(str(broken), spy)
+    broken.write_bytes(b"still not a shell link")
+    cache.resolve(str(broken), spy)
+    assert len(spy.calls) == 2
+
+
+def test_cache_miss_on_mtime_change(tmp_path):
+    broken = tmp_path / "broken.lnk"
+    broken.write_bytes(b"version 1")
+    spy = FallbackSpy()
+    cache = LnkCache(tmp_path / "lnk_cache.json")
+    cache.resolve(str(broken), spy)
+    st = broken.stat()
+    broken.write_bytes(b"version 2")  # тот же размер — отличается только время изменения
+    os.utime(broken, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    cache.resolve(str(broken), spy)
+    cache.resolve(str(broken), spy)
+    assert len(spy.calls) == 2
+
+
+def test_missing_file_is_not_cached(tmp_path):
+    spy = FallbackSpy()
+    assert LnkCache(tmp_path / "lnk_cache.json").resolve(str(tmp_path / "nope.lnk"), spy) is None
+    assert spy.calls == []
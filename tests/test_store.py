@@ -0,0 +1,161 @@
+"""Хранилище профилей: чтение с копией повреждённого файла, атомарная запись, отложенное сохранение и SQLite."""
+import json
+import os
+import time
+
+import pytest
+
+import store
+from store import ProfileStore, SqliteProfileStore, open_store, read_state, write_json_atomic
+
+PROFILES = {
+    "Работа": {"apps": [r"C:\Tools\ide.exe", r"C:\Tools\chat.lnk"], "urls": ["https://mail.example.com/"],
+               "browser_path": r"C:\Browsers\firefox.exe", "if_running": "focus",
+               "depends": {r"C:\Tools\chat.lnk": {"after": [r"C:\Tools\ide.exe"]}}},
+    "Дом": {"apps": [], "urls": ["music.example.com", "news.example.com"], "browser_path": ""},
+}
+
+
+def test_read_state_missing_file(tmp_path):
+    assert read_state(tmp_path / "profiles.json") == {"profiles": {}}
+    assert not (tmp_path / "profiles.json.bak").exists()
+
+
+@pytest.mark.parametrize("content", ["{not json", '{"profiles": []}', "[]"])
+def test_read_state_keeps_copy_of_bad_file(tmp_path, content):
+    path = tmp_path / "profiles.json"
+    path.write_text(content, encoding="utf-8")
+    assert read_state(path) == {"profiles": {}}
+    assert (tmp_path / "profiles.json.bak").read_text(encoding="utf-8") == content
+    assert path.read_text(encoding="utf-8") == content  # сам файл не трогаем
+
+
+def test_read_state_valid(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"autostart": "Работа"}, ensure_ascii=False), encoding="utf-8")
+    assert read_state(path) == {"autostart": "Работа", "profiles": {}}
+
+
+def test_write_json_atomic(tmp_path):
+    path = tmp_path / "profiles.json"
+    st = write_json_atomic(path, {"profiles": PROFILES})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"profiles": PROFILES}
+    assert (st.st_mtime_ns, st.st_size) == (path.stat().st_mtime_ns, path.stat().st_size)
+    assert os.listdir(tmp_path) == ["profiles.json"]
+
+
+def test_write_json_atomic_failure_keeps_old_file(tmp_path):
+    path = tmp_path / "profiles.json"
+    write_json_atomic(path, {"profiles": {}})
+    with pytest.raises(TypeError):
+        write_json_atomic(path, {"profiles": {"x": object()}})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"profiles": {}}
+    assert os.listdir(tmp_path) == ["profiles.json"]  # временный файл убран
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    calls = []
+    real = store.write_json_atomic
+
+    def counting(path, data):
+        calls.append(json.loads(json.dumps(data)))
+        return real(path, data)
+    monkeypatch.setattr(store, "write_json_atomic", counting)
+    return calls
+
+
+def test_edits_are_debounced_into_one_write(tmp_path, writes):
+    path = tmp_path / "profiles.json"
+    st = ProfileStore(path, delay=0.2)
+    st.put("Работа", PROFILES["Работа"])
+    st.put("Дом", PROFILES["Дом"])
+    st.delete("Дом")
+    assert writes == [] and not path.exists()
+    deadline = time.monotonic() + 5
+    while not writes and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.3)
+    assert writes == [{"profiles": {"Работа": PROFILES["Работа"]}}]
+    assert read_state(path)["profiles"] == {"Работа": PROFILES["Работа"]}
+
+
+def test_flush_writes_now_and_only_when_dirty(tmp_path, writes):
+    st = ProfileStore(tmp_path / "profiles.json", delay=60)
+    st.flush()
+    assert writes == []
+    st.put("Дом", PROFILES["Дом"])
+    st.flush()
+    st.flush()
+    assert len(writes) == 1
+
+
+def test_rename_keeps_one_profile(tmp_path):
+    st = ProfileStore(tmp_path / "profiles.json", delay=60)
+    st.put("Дом", PROFILES["Дом"])
+    st.put("Дача", PROFILES["Дом"], old_name="Дом")
+    assert st.names() == ["Дача"]
+
+
+def test_reload_only_when_file_changes(tmp_path):
+    path = tmp_path / "profiles.json"
+    write_json_atomic(path, {"profiles": {"Дом": PROFILES["Дом"]}})
+    st = ProfileStore(path, delay=60)
+    assert st.reload() is False  # подпись (mtime, размер) та же — файл не перечитываем
+    write_json_atomic(path, {"profiles": PROFILES})
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+    assert st.names() == sorted(PROFILES)  # state перечитал изменившийся файл сам
+
+
+def test_unsaved_edits_win_over_external_changes(tmp_path):
+    path = tmp_path / "profiles.json"
+    st = ProfileStore(path, delay=60)
+    st.put("Дом", PROFILES["Дом"])
+    write_json_atomic(path, {"profiles": {"Чужой": {}}})
+    assert st.reload() is False
+    assert st.names() == ["Дом"]
+    st.flush()
+    assert read_state(path)["profiles"] == {"Дом": PROFILES["Дом"]}
+
+
+def test_sqlite_import_export_round_trip(tmp_path):
+    src, dst = tmp_path / "profiles.json", tmp_path / "export.json"
+    write_json_atomic(src, {"profiles": PROFILES})
+    db = SqliteProfileStore(tmp_path / "profiles.db")
+    try:
+        assert db.import_json(src) == 2
+        assert db.get("Работа") == PROFILES["Работа"]  # порядок программ и доп. ключи сохранены
+        assert db.summaries() == [("Дом", 0, 2, ""), ("Работа", 2, 1, r"C:\Browsers\firefox.exe")]
+        assert db.export_json(dst) == 2
+        assert read_state(dst) == {"profiles": PROFILES}
+    finally:
+        db.close()
+
+
+def test_sqlite_import_replace_and_merge(tmp_path):
+    src = tmp_path / "profiles.json"
+    write_json_atomic(src, {"profiles": {"Дом": PROFILES["Дом"]}})
+    db = SqliteProfileStore(tmp_path / "profiles.db")
+    try:
+        db.put("Работа", PROFILES["Работа"])
+        db.import_json(src)
+        assert db.names() == ["Дом", "Работа"]
+        db.import_json(src, replace=True)
+        assert db.names() == ["Дом"]
+        db.put("Дача", db.get("Дом"), old_name="Дом")
+        assert db.names() == ["Дача"]
+        assert db.delete("Дача") and not db.delete("Дача")
+        assert db._db.execute("SELECT COUNT(*) FROM urls").fetchone()[0] == 0  # строки профиля ушли каскадом
+    finally:
+        db.close()
+
+
+def test_open_store_prefers_sqlite_next_to_json(tmp_path):
+    path = tmp_path / "profiles.json"
+    assert isinstance(open_store(path), ProfileStore)
+    SqliteProfileStore(tmp_path / "profiles.db").close()
+    db = open_store(path)
+    try:
+        assert isinstance(db, SqliteProfileStore)
+    finally:
+        db.close()
@@ -0,0 +1,127 @@
+"""Открытие сайтов пачками: нормализация, дедупликация, число запусков браузера и разбор его команды."""
+import shlex
+import sys
+
+import pytest
+
+import bench
+import urldispatch
+from urldispatch import chunk_urls, command_argv, normalize_url, open_urls, prepare_urls, split_windows_command
+
+# 60 адресов, 10 из них — повторы уже встречавшихся в другом написании
+URLS = [f"site{i}.example.com/page" for i in range(50)] + [f"HTTPS://SITE{i}.example.com:443/page" for i in range(10)]
+
+
+class Spy:
+    """Вместо Popen: запоминает командные строки."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, cmd, **kw):
+        self.calls.append(cmd)
+
+
+@pytest.mark.parametrize("url, want", [
+    ("example.com", "https://example.com/"),
+    ("https://EXAMPLE.com:443", "https://example.com/"),
+    ("http://example.com:8080/a?b#c", "http://example.com:8080/a?b#c"),
+    ("localhost:3000/x", "https://localhost:3000/x"),
+    ("  ", None),
+])
+def test_normalize_url(url, want):
+    assert normalize_url(url) == want
+
+
+def test_duplicates_collapse_to_unique_urls():
+    urls = prepare_urls(URLS)
+    assert len(urls) == 50
+    assert urls[0] == "https://site0.example.com/page"
+
+
+@pytest.mark.parametrize("limit", [urldispatch.CMDLINE_LIMIT, 400, 100])
+def test_one_invocation_per_chunk(limit):
+    browser = "/opt/browser/browser"
+    spy = Spy()
+    calls = open_urls(URLS, browser, popen=spy, limit=limit)
+    chunks = chunk_urls([browser], prepare_urls(URLS), limit)
+    assert calls == len(spy.calls) == len(chunks)
+    opened = [u for cmd in spy.calls for u in cmd[1:]]
+    assert opened == prepare_urls(URLS)
+    assert all(cmd[0] == browser for cmd in spy.calls)
+    if limit == urldispatch.CMDLINE_LIMIT:
+        assert calls == 1
+
+
+def test_chunks_fit_the_limit():
+    urls = prepare_urls(URLS)
+    for limit in (200, 500, 1000):
+        for chunk in chunk_urls(["browser"], urls, limit):
+            assert len(chunk) == 1 or urldispatch._cmdline_len(["browser", *chunk]) <= limit
+
+
+def test_popen_failure_falls_back_to_webbrowser(monkeypatch):
+    tabs = []
+    monkeypatch.setattr(urldispatch.webbrowser, "open_new_tab", tabs.append)
+
+    def broken(cmd, **kw):
+        raise FileNotFoundError(cmd[0])
+    assert open_urls(URLS, "/no/such/browser", popen=broken) == 50
+    assert tabs == prepare_urls(URLS)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="заглушка браузера — скрипт с #!")
+def test_real_processes_receive_every_url(tmp_path):
+    exe, log = bench.stub_browser(tmp_path)
+    procs = []
+
+    def popen(cmd, **kw):
+        p = urldispatch.subprocess.Popen(cmd, **kw); procs.append(p); return p
+    calls = open_urls(URLS, str(exe), popen=popen, limit=300)
+    for p in procs:
+        assert p.wait(10) == 0
+    counts = [int(x) for x in log.read_text(encoding="utf-8").split()]
+    assert calls == len(counts) == len(chunk_urls([str(exe)], prepare_urls(URLS), 300)) > 1
+    assert sum(counts) == 50
+
+
+@pytest.fixture
+def on_path(monkeypatch):
+    """Любая программа «найдена» в PATH под своим именем."""
+    monkeypatch.setattr(urldispatch.shutil, "which", lambda name: name)
+
+
+def test_desktop_exec_snap(on_path):
+    line = "env BAMF_DESKTOP_FILE_HINT=/var/lib/snapd/desktop/applications/firefox_firefox.desktop /snap/bin/firefox %u"
+    assert command_argv(shlex.split(line)) == (
+        "env", "BAMF_DESKTOP_FILE_HINT=/var/lib/snapd/desktop/applications/firefox_firefox.desktop", "/snap/bin/firefox")
+
+
+def test_desktop_exec_flatpak(on_path):
+    line = ("/usr/bin/flatpak run --branch=stable --arch=x86_64 --command=firefox --file-forwarding "
+            "org.mozilla.firefox @@u %u @@")
+    assert command_argv(shlex.split(line)) == (
+        "/usr/bin/flatpak", "run", "--branch=stable", "--arch=x86_64", "--command=firefox", "--file-forwarding",
+        "org.mozilla.firefox")
+
+
+def test_desktop_exec_plain_with_options(on_path):
+    assert command_argv(shlex.split("chromium --new-window %U")) == ("chromium", "--new-window")
+
+
+@pytest.mark.parametrize("command, want", [
+    (r'"C:\Program Files\Google\Chrome\Application\chrome.exe" --single-argument %1',
+     (r"C:\Program Files\Google\Chrome\Application\chrome.exe",)),
+    (r'"C:\Program Files\Mozilla Firefox\firefox.exe" -osint -url "%1"', (r"C:\Program Files\Mozilla Firefox\firefox.exe",)),
+    (r'"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe" --profile-directory=Default -- "%1"',
+     (r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe", "--profile-directory=Default", "--")),
+    (r"C:\Browsers\yandex.exe %1", (r"C:\Browsers\yandex.exe",)),
+])
+def test_windows_shell_open_command(on_path, command, want):
+    assert command_argv(split_windows_command(command)) == want
+
+
+def test_missing_executable(monkeypatch):
+    monkeypatch.setattr(urldispatch.shutil, "which", lambda name: None)
+    assert command_argv(["/no/such/browser", "%u"]) is None
+    assert command_argv(["%u"]) is None
@@ -0,0 +1,111 @@
+"""Темы оформления: палитры цветов и заранее собранные таблицы стилей Qt (без импорта Qt)."""
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+THEME_FIELDS = ("name", "base", "card", "border", "text", "subtext", "primary", "danger", "success", "shadow")
+
+
+class Theme:
+    def __init__(self, name: str, base: str, card: str, border: str, text: str, subtext: str,
+                 primary: str, danger: str, success: str, shadow_rgba: str):
+        self.name=name; self.base=base; self.card=card; self.border=border
+        self.text=text; self.subtext=subtext
+        self.primary=primary; self.danger=danger; self.success=success
+        self.shadow=shadow_rgba
+
+    @property
+    def is_dark(self) -> bool:
+        c = self.base.lstrip("#")
+        try:
+            return sum(int(c[i:i + 2], 16) for i in (0, 2, 4)) / 3 < 128
+        except ValueError:
+            return False
+
+    @classmethod
+    def from_dict(cls, d: Dict, parent: Optional["Theme"] = None) -> "Theme":
+        base = dict(parent.__dict__) if parent else {}
+        base.update({k: v for k, v in d.items() if k in THEME_FIELDS or k == "shadow_rgba"})
+        if "shadow_rgba" in base:
+            base["shadow"] = base.pop("shadow_rgba")
+        missing = [k for k in THEME_FIELDS if not base.get(k)]
+        if missing:
+            raise ValueError(f"тема {d.get('name')!r}: не заданы поля {', '.join(missing)}")
+        return cls(**{k: str(base[k]) for k in THEME_FIELDS if k != "shadow"}, shadow_rgba=str(base["shadow"]))
+
+LIGHT = Theme(
+    name="light",
+    base="#FFFFFF", card="#F5F5F5", border="#E6E6E6", text="#202020", subtext="#555555",
+    primary="#0078D7", danger="#E81123", success="#107C10", shadow_rgba="0,0,0,0.10"
+)
+DARK = Theme(
+    name="dark",
+    base="#1E1E1E", card="#2C2C2C", border="#3A3A3A", text="#E0E0E0", subtext="#A0A0A0",
+    primary="#2F7DD7", danger="#E81123", success="#2EA043", shadow_rgba="0,0,0,0.35"
+)
+
+CARD_QSS = """
+QLabel#Title { color: %(text)s; font-size: 20px; font-weight: 600; }
+QLabel#Meta { color: %(subtext)s; }
+"""
+
+BUTTONS_QSS = """
+QPushButton { padding: 8px 14px; border-radius: 10px; border: 0px; font-weight: 600; }
+QPushButton#Primary { background: %(primary)s; color: white; }
+QPushButton#Primary:hover { filter: brightness(1.05); }
+QPushButton#Danger { background: %(danger)s; color: white; }
+QPushButton#Ghost { background: %(card)s; color: %(text)s; border: 1px solid %(border)s; }
+QPushButton#Ghost:hover { border-color: %(primary)s; }
+QCheckBox, QLabel { color: %(text)s; }
+QStatusBar { color: %(text)s; background: %(base)s; }
+QMainWindow, QWidget { background: %(base)s; }
+QComboBox, QLineEdit, QListView { background: %(card)s; color: %(text)s; border: 1px solid %(border)s; border-radius: 8px; padding: 6px; }
+QListView::item { padding: 6px; }
+"""
+
+DIALOG_QSS = "QDialog { background: %(base)s; }\n"
+
+
+class ThemeRegistry:
+    """Встроенные и пользовательские темы; таблица стилей каждой темы собирается один раз."""
+
+    def __init__(self, themes: Optional[List[Theme]] = None):
+        self._themes: Dict[str, Theme] = {}
+        self._qss: Dict[str, str] = {}
+        for t in themes or (LIGHT, DARK):
+            self.add(t)
+
+    def add(self, theme: Theme):
+        self._themes[theme.name] = theme
+        self._qss.pop(theme.name, None)
+
+    def names(self) -> List[str]:
+        return list(self._themes)
+
+    def get(self, name: str) -> Optional[Theme]:
+        return self._themes.get(name)
+
+    def next(self, theme: Theme) -> Theme:
+        names = self.names()
+        i = names.index(theme.name) if theme.name in names else -1
+        return self._themes[names[(i + 1) % len(names)]]
+
+    def stylesheet(self, theme: Theme) -> str:
+        qss = self._qss.get(theme.name)
+        if qss is None:
+            d = theme.__dict__
+            qss = self._qss[theme.name] = (CARD_QSS % d) + (BUTTONS_QSS % d) + (DIALOG_QSS % d)
+        return qss
+
+    def load(self, path: Path) -> List[str]:
+        """Читает themes.json: список объектов с полями темы; "extends" наследует незаданные поля."""
+        if not path.exists():
+            return []
+        data = json.loads(path.read_text(encoding="utf-8"))
+        loaded = []
+        for d in (data.get("themes", []) if isinstance(data, dict) else data):
+            parent = self.get(d.get("extends", "")) if d.get("extends") else None
+            theme = Theme.from_dict(d, parent)
+            self.add(theme); loaded.append(theme.name)
+        return loaded
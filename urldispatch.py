@@ -0,0 +1,163 @@
+"""Открытие вкладок: URL нормализуются и дедуплицируются, браузер получает их пачками за минимум запусков."""
+from __future__ import annotations
+import functools
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import webbrowser
+from pathlib import Path
+from typing import Callable, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# CreateProcess ограничивает командную строку 32767 символами; в POSIX одна строка
+# аргумента не длиннее 128 КиБ, а общий ARG_MAX обычно 2 МиБ — берём с запасом.
+CMDLINE_LIMIT = 32000 if sys.platform == "win32" else 128 * 1024
+
+
+def normalize_url(url: str) -> Optional[str]:
+    u = (url or "").strip()
+    if not u:
+        return None
+    if not re.match(r"^[a-zA-Z][a-zA-Z0-9+.-]*:", u) or re.match(r"^[^/:]+:\d+(/|$)", u):
+        u = "https://" + u  # "example.com" или "localhost:8080/x"
+    parts = urlsplit(u)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return u
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        return u
+    netloc = host
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc += f":{port}"
+    if parts.username is not None:
+        netloc = parts.username + (f":{parts.password}" if parts.password is not None else "") + "@" + netloc
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, parts.fragment))
+
+
+def prepare_urls(urls: List[str]) -> List[str]:
+    """Нормализованные URL без повторов, в исходном порядке."""
+    return list(dict.fromkeys(n for n in map(normalize_url, urls) if n))
+
+
+def _cmdline_len(args: List[str]) -> int:
+    if sys.platform == "win32":
+        return len(subprocess.list2cmdline(args))
+    return sum(len(os.fsencode(a)) + 1 for a in args)
+
+
+def chunk_urls(cmd: List[str], urls: List[str], limit: int = CMDLINE_LIMIT) -> List[List[str]]:
+    """Делит URL на пачки так, чтобы `cmd + пачка` укладывалась в limit; каждый URL хотя бы в одной пачке."""
+    base = _cmdline_len(cmd)
+    chunks: List[List[str]] = []
+    cur: List[str] = []
+    size = base
+    for u in urls:
+        n = _cmdline_len([u]) + (1 if sys.platform == "win32" else 0)
+        if cur and size + n > limit:
+            chunks.append(cur); cur, size = [], base
+        cur.append(u); size += n
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+# коды полей .desktop (%u, %F…) и shell\open\command (%1, %L, %*) — вместо них браузер получит наши URL
+FIELD_CODE = re.compile(r"%[fFuUdDnNickvm0-9L*]")
+# ключи, с которыми браузер принимает ровно один адрес: Chrome/Edge --single-argument, Firefox -osint -url;
+# @@u … @@ — рамка flatpak вокруг кода поля
+SINGLE_URL_FLAGS = {"--single-argument", "-osint", "-url", "--url", "@@", "@@u", "@@U", "@@f", "@@F"}
+
+
+def command_argv(args: List[str]) -> Optional[tuple]:
+    """Команда браузера без кодов полей: к ней дописываются URL. None — исполняемый файл не найден."""
+    out = []
+    for a in args:
+        if a in SINGLE_URL_FLAGS or FIELD_CODE.fullmatch(a):
+            continue
+        a = FIELD_CODE.sub("", a).replace("%%", "%")
+        if a:
+            out.append(a)
+    if not out:
+        return None
+    exe = shutil.which(out[0]) or (out[0] if Path(out[0]).exists() else None)
+    return (exe, *out[1:]) if exe else None
+
+
+def split_windows_command(command: str) -> List[str]:
+    """'"C:\\...\\msedge.exe" --single-argument %1' -> аргументы; обратные слэши путей не трогаем, в отличие от shlex."""
+    return [quoted or bare for quoted, bare in re.findall(r'"([^"]*)"|(\S+)', command)]
+
+
+def _windows_default_browser() -> Optional[tuple]:
+    import winreg
+    key = r"Software\Microsoft\Windows\Shell\Associations\UrlAssociations\https\UserChoice"
+    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, key) as k:
+        prog_id = winreg.QueryValueEx(k, "ProgId")[0]
+    with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, rf"{prog_id}\shell\open\command") as k:
+        return command_argv(split_windows_command(winreg.QueryValueEx(k, "")[0]))
+
+
+def _xdg_default_browser() -> Optional[tuple]:
+    desktop = subprocess.run(["xdg-settings", "get", "default-web-browser"], capture_output=True, text=True,
+                             timeout=2).stdout.strip()
+    if not desktop:
+        return None
+    dirs = [os.environ.get("XDG_DATA_HOME", str(Path.home() / ".local/share"))]
+    dirs += os.environ.get("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")
+    for d in dirs:
+        f = Path(d) / "applications" / desktop
+        if f.is_file():
+            for line in f.read_text(encoding="utf-8", errors="replace").splitlines():
+                if line.startswith("Exec="):
+                    # snap: "env BAMF_DESKTOP_FILE_HINT=… /snap/bin/firefox %u", flatpak: "flatpak run … %U" — нужна вся команда
+                    return command_argv(shlex.split(line[5:]))
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def default_browser_command() -> Optional[tuple]:
+    """Команда браузера по умолчанию, принимающая несколько URL; определяется один раз за процесс."""
+    try:
+        if sys.platform == "win32":
+            return _windows_default_browser()
+        if sys.platform == "darwin":
+            return ("open",)
+        return _xdg_default_browser()
+    except Exception:
+        return None
+
+
+def open_urls(urls: List[str], browser: Optional[str] = None, popen: Optional[Callable] = None,
+              limit: int = CMDLINE_LIMIT) -> int:
+    """Открыть URL; browser — уже разрешённый путь к .exe или None (браузер по умолчанию).
+    Возвращает число запусков процессов / вызовов webbrowser."""
+    urls = prepare_urls(urls)
+    if not urls:
+        return 0
+    cmd = [browser] if browser else list(default_browser_command() or ())
+    calls = 0
+    popen = popen or subprocess.Popen
+    if cmd:
+        chunks = chunk_urls(cmd, urls, limit)
+        for i, chunk in enumerate(chunks):
+            try:
+                popen([*cmd, *chunk], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, close_fds=True)
+                calls += 1
+            except OSError:
+                urls = [u for c in chunks[i:] for u in c]
+                break
+        else:
+            return calls
+    for u in urls:
+        webbrowser.open_new_tab(u)
+        calls += 1
+    return calls